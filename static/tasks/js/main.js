@@ -433,6 +433,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeFormValidation();
     initializeNotifications();
     initializeMobileMenu();
+    initializeDashboardPanels();
 });
 
 /**
@@ -681,6 +682,47 @@ function initializeTaskStatusUpdates() {
     }
 }
 
+/**
+ * Lazily loaded dashboard panels
+ * Fetches every [data-panel-url] panel in parallel once the page shell is shown.
+ * HTML panels replace their placeholder; JSON panels (data-panel-type="json")
+ * are handed to the page through a 'panel:loaded' event. Panels carry ETags,
+ * so the browser revalidates them instead of downloading them again.
+ */
+function initializeDashboardPanels() {
+    const panels = document.querySelectorAll('[data-panel-url]');
+    
+    panels.forEach(panel => {
+        const isJson = panel.dataset.panelType === 'json';
+        
+        fetch(panel.dataset.panelUrl, {
+            headers: {
+                'Accept': isJson ? 'application/json' : 'text/html',
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            credentials: 'same-origin'
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Panel request failed with status ${response.status}`);
+            }
+            return isJson ? response.json() : response.text();
+        })
+        .then(content => {
+            if (!isJson) {
+                panel.innerHTML = content;
+            }
+            panel.dispatchEvent(new CustomEvent('panel:loaded', { detail: content }));
+        })
+        .catch(error => {
+            console.error('Error loading dashboard panel:', error);
+            if (!isJson) {
+                panel.innerHTML = '<div class="empty-state"><p>This section is temporarily unavailable. Refresh the page to try again.</p></div>';
+            }
+        });
+    });
+}
+
 /**
  * Form validation and submission
  * Handles client-side validation and AJAX form submission
@@ -1073,8 +1115,106 @@ function formatDate(date, format = 'short') {
     }
 }
 
+/**
+ * Typeahead suggestions for a search input
+ * Fetches matches from the input's data-suggest-url as the user types and lists
+ * them below the input; the form itself is only submitted on Enter.
+ * @param {HTMLInputElement} input - Search input with data-suggest-url
+ */
+function initializeSearchSuggestions(input) {
+    let list = input.parentElement.querySelector('.search-suggestions');
+    if (!list) {
+        list = document.createElement('ul');
+        list.className = 'search-suggestions';
+        list.hidden = true;
+        input.insertAdjacentElement('afterend', list);
+    }
+    
+    let controller = null;
+    let activeIndex = -1;
+    
+    function hide() {
+        list.hidden = true;
+        list.innerHTML = '';
+        activeIndex = -1;
+    }
+    
+    function render(suggestions) {
+        list.innerHTML = '';
+        activeIndex = -1;
+        suggestions.forEach(suggestion => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            const label = document.createElement('span');
+            const type = document.createElement('span');
+            link.href = suggestion.url;
+            label.textContent = suggestion.label;
+            type.className = 'suggestion-type';
+            type.textContent = suggestion.type;
+            link.append(label, type);
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        list.hidden = suggestions.length === 0;
+    }
+    
+    const fetchSuggestions = debounce(function() {
+        const query = input.value.trim();
+        if (!query) {
+            hide();
+            return;
+        }
+        
+        // Only the latest keystroke's response matters
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        
+        const url = `${input.dataset.suggestUrl}?q=${encodeURIComponent(query)}`;
+        fetch(url, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            credentials: 'same-origin',
+            signal: controller.signal
+        })
+        .then(response => response.json())
+        .then(data => render(data.suggestions))
+        .catch(error => {
+            if (error.name !== 'AbortError') {
+                console.error('Error fetching search suggestions:', error);
+            }
+        });
+    }, 150);
+    
+    input.addEventListener('input', fetchSuggestions);
+    
+    input.addEventListener('keydown', function(e) {
+        const links = list.querySelectorAll('a');
+        if (list.hidden || links.length === 0) {
+            return;
+        }
+        
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            activeIndex = (activeIndex + step + links.length) % links.length;
+            links.forEach((link, index) => link.classList.toggle('active', index === activeIndex));
+        } else if (e.key === 'Enter' && activeIndex >= 0) {
+            e.preventDefault();
+            window.location.href = links[activeIndex].href;
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+    
+    // Delay so a click on a suggestion lands before the list disappears
+    input.addEventListener('blur', () => setTimeout(hide, 200));
+}
+
 /**
  * Initialize search inputs with debouncing
+ * Inputs with a suggestion endpoint get typeahead suggestions instead of
+ * resubmitting the whole form on every pause in typing.
  */
 document.addEventListener('DOMContentLoaded', function() {
     // Find all search inputs with debounce attribute
@@ -1083,7 +1223,9 @@ document.addEventListener('DOMContentLoaded', function() {
     searchInputs.forEach(input => {
         const form = input.closest('form');
         
-        if (form) {
+        if (input.dataset.suggestUrl) {
+            initializeSearchSuggestions(input);
+        } else if (form) {
             // Create debounced handler
             const debouncedSubmit = debounce(function() {
                 form.submit();
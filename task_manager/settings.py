@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -57,8 +59,11 @@ MIDDLEWARE = [
     # Session middleware early in the stack
     'django.contrib.sessions.middleware.SessionMiddleware',
     
-    # Performance monitoring middleware before request processing
-    'tasks.middleware.PerformanceMonitoringMiddleware',
+    # Performance monitoring, request, audit and exception logging in one pass.
+    # Placed before request processing so timing and metrics cover the common,
+    # CSRF and auth middleware and requests they answer (e.g. APPEND_SLASH
+    # redirects); sinks read the user once the view is resolved.
+    'tasks.middleware.ObservabilityMiddleware',
     
     # Django's common middleware
     'django.middleware.common.CommonMiddleware',
@@ -66,25 +71,35 @@ MIDDLEWARE = [
     # CSRF protection
     'django.middleware.csrf.CsrfViewMiddleware',
     
-    # Authentication middleware (required before audit logging)
+    # Authentication middleware
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     
-    # Request logging middleware after authentication to access user information
-    'tasks.middleware.RequestLoggingMiddleware',
-    
-    # Audit logging after authentication to access user information
-    'tasks.middleware.AuditLoggingMiddleware',
+    # Per-request memo store for permission checks and view helpers
+    'tasks.middleware.RequestMemoMiddleware',
     
     # Django's message middleware
     'django.contrib.messages.middleware.MessageMiddleware',
     
     # Django's clickjacking protection
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    
-    # Exception logging middleware last to catch all exceptions
-    'tasks.middleware.ExceptionLoggingMiddleware',
 ]
 
+# Sinks run by ObservabilityMiddleware, one per logging concern
+OBSERVABILITY_SINKS = [
+    'tasks.observability.PerformanceSink',
+    'tasks.observability.RequestLogSink',
+    'tasks.observability.AuditSink',
+    'tasks.observability.ExceptionSink',
+]
+
+# Extra route sensitivity by URL name or namespace, merged over
+# tasks.sensitivity.ROUTE_SENSITIVITY; views in this project use @sensitive
+ROUTE_SENSITIVITY = {}
+
+# Serve the dashboard, task list and task detail pages from tasks.async_views.
+# Only worth enabling under ASGI (uvicorn task_manager.asgi:application)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
 ROOT_URLCONF = 'task_manager.urls'
 
 TEMPLATES = [
@@ -145,6 +160,21 @@ else:
         }
     }
 
+# Dashboard widgets (tasks.widgets) run concurrently on this many threads, each
+# with its own database connection. SQLite gains nothing from parallel
+# readers, so they run inline there. Timeout is per widget, in seconds.
+DASHBOARD_WIDGET_WORKERS = int(os.environ.get('DASHBOARD_WIDGET_WORKERS', 0 if USE_SQLITE else 4))
+DASHBOARD_WIDGET_TIMEOUT = float(os.environ.get('DASHBOARD_WIDGET_TIMEOUT', 2.0))
+
+# Paginate the task and project lists by cursor (tasks.pagination) instead of
+# page number, so deep pages cost the same as the first one
+KEYSET_PAGINATION = os.environ.get('KEYSET_PAGINATION', 'False') == 'True'
+
+# Search box typeahead (tasks.suggest): prefix indexes are kept in memory for
+# this many users per process; each request returns at most SUGGEST_LIMIT.
+SUGGEST_INDEX_MAX_USERS = int(os.environ.get('SUGGEST_INDEX_MAX_USERS', 500))
+SUGGEST_LIMIT = 8
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -375,6 +405,53 @@ LOGGING = {
     },
 }
 
+# Request log sampling (see tasks.observability.keep_request_log). Only this
+# fraction of fast, successful requests is logged; requests slower than
+# SLOW_REQUEST_THRESHOLD seconds or with status >= 400 are always logged in full.
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 0.1))
+SLOW_REQUEST_THRESHOLD = float(os.environ.get('SLOW_REQUEST_THRESHOLD', 1.0))
+
+# Per-request SQL profiling (see tasks.profiling). Query counts and DB time are
+# sent as X-Performance-* headers; a request that repeats one statement
+# DUPLICATE_QUERY_THRESHOLD or more extra times is logged as a likely N+1.
+QUERY_PROFILING = os.environ.get('QUERY_PROFILING', 'True') == 'True'
+DUPLICATE_QUERY_THRESHOLD = int(os.environ.get('DUPLICATE_QUERY_THRESHOLD', 10))
+
+# Request metrics (see tasks.metrics). Each worker flushes its histograms and
+# counters to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds; the staff-only
+# /metrics/ endpoint merges all workers. Exited workers are folded into one
+# archive file; call tasks.metrics.mark_process_dead(worker.pid) from
+# gunicorn's child_exit hook to do it as soon as a worker goes away. Test runs
+# keep metrics in memory so they never write to the shared directory.
+if sys.argv[1:2] == ['test']:
+    METRICS_DIR = None
+else:
+    METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'task_manager_metrics'))
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
+# Request body logging (see tasks.observability.BodyLoggingPolicy). Bodies are
+# never read just for logging; only bodies the view already read are logged,
+# truncated, for allow-listed path prefixes. An empty 'paths' disables it.
+REQUEST_BODY_LOGGING = {
+    'max_bytes': 1024,
+    'sample_rate': float(os.environ.get('REQUEST_BODY_LOG_SAMPLE_RATE', 0.1)),
+    'paths': [],
+    'content_types': ['application/json'],
+}
+
+# Asynchronous delivery for the request-path loggers (see tasks/log_handlers.py).
+# Records go through a bounded queue to a background thread; when it is full,
+# the drop policy ('drop_oldest' or 'drop_new') decides what is discarded.
+ASYNC_LOGGING = {
+    'enabled': os.environ.get('ASYNC_LOGGING', 'True') == 'True',
+    'loggers': ['tasks.request', 'performance', 'audit', 'security'],
+    'queue_size': int(os.environ.get('ASYNC_LOGGING_QUEUE_SIZE', 10000)),
+    'batch_size': 200,
+    'flush_interval': 0.5,  # seconds
+    'error_timeout': 1.0,  # seconds an ERROR record waits for queue space
+    'drop_policy': os.environ.get('ASYNC_LOGGING_DROP_POLICY', 'drop_oldest'),
+}
+
 # Ensure logs directory exists
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 if not os.path.exists(LOGS_DIR):
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+    
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        
+        from . import signals  # noqa: F401
+        from .profiling import install_query_profiling
+        connection_created.connect(install_query_profiling, dispatch_uid='tasks.query_profiling')
+        from .log_handlers import install_async_logging
+        install_async_logging()
@@ -0,0 +1,164 @@
+"""
+Native async versions of the read-heavy views, for ASGI deployments.
+
+With ``settings.ASYNC_VIEWS`` enabled, tasks.urls routes the dashboard, task
+list and task detail pages here instead of to their class-based counterparts
+in tasks.views. They render the same templates with the same context, share
+the same cache entries and apply the same permission checks:
+
+- the user comes from ``request.auser()``; the task list and detail queries
+  run through the async ORM (``aget``, ``acount``, ``aexists``, ``async
+  for``), materialized with the related objects the templates use
+- the dashboard is a shell whose panels are fetched from
+  AsyncDashboardPanelView; a panel's widgets are gathered concurrently with
+  per-widget timeouts (see tasks.widgets)
+- the cached sidebar and counter helpers of TaskManagerContextMixin run in a
+  single ``sync_to_async()`` step, since Django's cache API is synchronous
+- responses are TemplateResponses, which Django renders after the view
+  returns, as it does for any async view
+
+Under WSGI these views still work, but each request pays for an event loop;
+enable them only when serving task_manager.asgi with uvicorn.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.views.generic import View
+
+from .forms import TaskAttachmentForm, TaskCommentForm, TaskFilterForm
+from .models import Task
+from .pagination import KeysetPaginator
+from .utils import acheck_task_permission
+from .views import TASK_LIST_ORDERING, TaskManagerContextMixin, filter_tasks
+from .widgets import arun_widgets, get_panel_widgets, panel_response
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+class AsyncLoginRequiredMixin:
+    """LoginRequiredMixin for async views, resolving the user with auser()."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Templates and cached helpers read request.user synchronously
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncTaskManagerView(AsyncLoginRequiredMixin, TaskManagerContextMixin, View):
+    """Login check, cached shared context and rendering for the async views."""
+
+    template_name = None
+
+    async def get(self, request, *args, **kwargs):
+        user = request.user
+        context = await sync_to_async(self.get_cached_context)(user.id)
+        context.update(await self.get_context_data(user, context, **kwargs))
+        context['view'] = self
+        return TemplateResponse(request, self.template_name, context)
+
+    def get_cached_context(self, user_id):
+        """Everything served from the shared cache (runs in a sync thread)."""
+        context = self.get_shared_context(user_id)
+        context['task_stats'] = self.get_task_stats(user_id)
+        return context
+
+    async def get_context_data(self, user, cached, **kwargs):
+        return {}
+
+
+class AsyncDashboardView(AsyncTaskManagerView):
+    template_name = 'tasks/dashboard.html'
+
+
+class AsyncDashboardPanelView(AsyncLoginRequiredMixin, TaskManagerContextMixin, View):
+    """One dashboard panel, its widgets gathered concurrently (see tasks.widgets)."""
+
+    async def get(self, request, panel):
+        context = await arun_widgets(self, request.user, get_panel_widgets(panel))
+        # Fragment templates may touch lazy relations, so render in a sync thread
+        return await sync_to_async(panel_response)(request, panel, context)
+
+
+class AsyncTaskListView(AsyncTaskManagerView):
+    template_name = 'tasks/task/task_list.html'
+    paginate_by = 15
+
+    def get_cached_context(self, user_id):
+        context = super().get_cached_context(user_id)
+        # Validating the filter form queries its choices, so it runs here too
+        context['queryset'] = filter_tasks(self.request.user, self.request.GET)
+        return context
+
+    async def get_context_data(self, user, cached, **kwargs):
+        queryset = cached.pop('queryset').select_related('category', 'assigned_to')
+        params = self.request.GET
+        cursor_pagination = getattr(settings, 'KEYSET_PAGINATION', False) and not params.get('search')
+        if cursor_pagination:
+            paginator = KeysetPaginator(queryset, self.paginate_by, TASK_LIST_ORDERING)
+            page = await sync_to_async(paginator.get_page)(params.get('cursor'))
+        else:
+            paginator = Paginator(queryset, self.paginate_by)
+            # Prime the cached count so paging never evaluates it synchronously
+            paginator.count = await queryset.acount()
+            page = paginator.get_page(params.get('page'))
+            page.object_list = await _alist(page.object_list)
+
+        pagination_params = params.copy()
+        pagination_params.pop('cursor', None)
+        pagination_params.pop('page', None)
+        stats = cached['task_stats']
+        return {
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'cursor_pagination': cursor_pagination,
+            'pagination_query': pagination_params.urlencode(),
+            'object_list': page.object_list,
+            'tasks': page.object_list,
+            'filter_form': TaskFilterForm(self.request.GET),
+            'my_tasks_count': stats.assigned,
+            'created_tasks_count': stats.created,
+            'due_today_count': stats.due_today,
+            'overdue_count': stats.overdue,
+        }
+
+
+class AsyncTaskDetailView(AsyncTaskManagerView):
+    template_name = 'tasks/task/task_detail.html'
+
+    async def get_context_data(self, user, cached, pk=None, **kwargs):
+        try:
+            task = await Task.objects.select_related(
+                'project__owner', 'category', 'assigned_to', 'created_by'
+            ).aget(pk=pk)
+        except Task.DoesNotExist:
+            raise Http404("No task found matching the query")
+        if not await acheck_task_permission(user, task):
+            raise PermissionDenied
+
+        if task.category_id:
+            related = Q(project_id=task.project_id) | Q(category_id=task.category_id)
+        else:
+            related = Q(project_id=task.project_id)
+
+        return {
+            'object': task,
+            'task': task,
+            'comment_form': TaskCommentForm(),
+            'attachment_form': TaskAttachmentForm(),
+            'comments': await _alist(task.comments.select_related('user').order_by('-created_at')),
+            'attachments': await _alist(task.attachments.select_related('uploaded_by').order_by('-uploaded_at')),
+            'related_tasks': await _alist(
+                Task.objects.filter(related).exclude(id=task.id).select_related('project')[:5]
+            ),
+        }
@@ -0,0 +1,121 @@
+"""
+Project task board shared by the project detail page and its JSON endpoint.
+
+A board is built from two queries regardless of project size: one for the
+project's tasks, partitioned by status in Python, and one for its members.
+Per-member counts are tallied from the same task rows, so there are no
+per-member or per-column queries.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+
+from .choices import TaskStatus
+
+BOARD_STATUSES = [TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.REVIEW, TaskStatus.COMPLETED]
+
+
+@dataclass
+class BoardColumn:
+    """Tasks in one status column. Iterable, and exposes ``count`` for templates."""
+    status: str
+    label: str
+    tasks: list = field(default_factory=list)
+
+    @property
+    def count(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __bool__(self):
+        return bool(self.tasks)
+
+
+@dataclass
+class MemberStat:
+    user: object
+    task_count: int = 0
+    completed: int = 0
+
+
+@dataclass
+class ProjectBoard:
+    project: object
+    columns: dict
+    member_stats: list
+
+    @classmethod
+    def for_project(cls, project):
+        labels = dict(TaskStatus.CHOICES)
+        columns = {status: BoardColumn(status, labels[status]) for status in BOARD_STATUSES}
+        assigned = Counter()
+        completed = Counter()
+
+        tasks = project.tasks.select_related('assigned_to', 'category').order_by('deadline', '-created_at')
+        for task in tasks:
+            if task.status in columns:
+                columns[task.status].tasks.append(task)
+            if task.assigned_to_id:
+                assigned[task.assigned_to_id] += 1
+                if task.status == TaskStatus.COMPLETED:
+                    completed[task.assigned_to_id] += 1
+
+        member_stats = [
+            MemberStat(member, assigned[member.id], completed[member.id])
+            for member in project.members.all()
+        ]
+        return cls(project=project, columns=columns, member_stats=member_stats)
+
+    def column(self, status):
+        return self.columns[status]
+
+    def get_context(self):
+        """Template context using the keys the project detail templates expect."""
+        return {
+            'board': self,
+            'todo_tasks': self.column(TaskStatus.TODO),
+            'in_progress_tasks': self.column(TaskStatus.IN_PROGRESS),
+            'review_tasks': self.column(TaskStatus.REVIEW),
+            'completed_tasks': self.column(TaskStatus.COMPLETED),
+            'member_stats': self.member_stats,
+        }
+
+    def as_dict(self):
+        """JSON-serializable representation for the board endpoint."""
+        return {
+            'project': {'id': self.project.id, 'title': self.project.title},
+            'columns': [
+                {
+                    'status': column.status,
+                    'label': column.label,
+                    'count': column.count,
+                    'tasks': [_task_dict(task) for task in column],
+                }
+                for column in self.columns.values()
+            ],
+            'members': [
+                {
+                    'id': stat.user.id,
+                    'username': stat.user.username,
+                    'task_count': stat.task_count,
+                    'completed': stat.completed,
+                }
+                for stat in self.member_stats
+            ],
+        }
+
+
+def _task_dict(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'priority': task.priority,
+        'deadline': task.deadline.isoformat() if task.deadline else None,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+        'assigned_to': task.assigned_to.username if task.assigned_to else None,
+        'category': task.category.name if task.category else None,
+    }
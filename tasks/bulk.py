@@ -0,0 +1,94 @@
+"""
+Batch task status changes for the bulk status endpoint.
+
+Moving many cards on a board one request at a time costs a permission
+query and a full save() per task. update_task_statuses() applies a whole
+batch in one transaction with a fixed number of queries:
+
+- one SELECT loads the tasks with a TaskVisibility EXISTS flag, which
+  answers the permission check for every task at once
+- one bulk_update() writes status, completed_at and updated_at for the
+  tasks whose status actually changed
+
+bulk_update() emits no signals. A status change leaves visibility, the
+search index, the typeahead indexes and the category counts as they were,
+so the only derived data to refresh is the cached_view_data entries that
+depend on tasks (the dashboard counters); those are invalidated explicitly.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .choices import TaskStatus
+from .models import Task, TaskVisibility
+from .utils import invalidate_view_cache_dependents
+
+# Upper bound on the items accepted in one request
+MAX_BULK_STATUS_UPDATES = 200
+
+UPDATE_FIELDS = ['status', 'completed_at', 'updated_at']
+
+
+def _error(task_id, message):
+    return {'task_id': task_id, 'status': 'error', 'message': message}
+
+
+def _parse_item(item):
+    """(task_id, status) of one requested change, task_id None if unusable."""
+    if not isinstance(item, dict):
+        return None, None
+    try:
+        task_id = int(item.get('task_id'))
+    except (TypeError, ValueError):
+        task_id = None
+    return task_id, item.get('status')
+
+
+def update_task_statuses(user, changes):
+    """
+    Apply a list of ``{'task_id': ..., 'status': ...}`` changes on behalf of
+    user. Returns one result per item, in order; items that fail validation
+    or permission checks are reported and skipped, the rest are applied.
+    """
+    statuses = dict(TaskStatus.CHOICES)
+    parsed = [_parse_item(item) for item in changes]
+    task_ids = {task_id for task_id, _ in parsed if task_id is not None}
+    results = []
+
+    with transaction.atomic():
+        tasks = Task.objects.filter(pk__in=task_ids).annotate(
+            permitted=Exists(TaskVisibility.objects.filter(user_id=user.id, task_id=OuterRef('pk')))
+        ).only(
+            'id', 'status', 'completed_at', 'updated_at', 'assigned_to_id', 'created_by_id'
+        ).select_for_update()
+        tasks = {task.pk: task for task in tasks}
+
+        now = timezone.now()
+        changed = {}
+        for task_id, status in parsed:
+            task = tasks.get(task_id)
+            if task_id is None:
+                results.append(_error(None, 'Invalid task_id'))
+            elif status not in statuses:
+                results.append(_error(task_id, 'Invalid status'))
+            elif task is None:
+                results.append(_error(task_id, 'Task not found'))
+            elif not task.permitted:
+                results.append(_error(task_id, 'You do not have permission to update this task.'))
+            else:
+                if task.status != status:
+                    task.set_status(status, now)
+                    task.updated_at = now
+                    changed[task.pk] = task
+                results.append({
+                    'task_id': task_id,
+                    'status': 'success',
+                    'new_status': status,
+                    'status_display': statuses[status],
+                })
+
+        if changed:
+            Task.objects.bulk_update(changed.values(), UPDATE_FIELDS)
+            invalidate_view_cache_dependents(Task, changed.values())
+
+    return results
@@ -0,0 +1,161 @@
+"""
+Maintenance of the CategoryClosure table.
+
+Every category has a depth-0 row pointing at itself plus one row per ancestor,
+so subtree, ancestor and cycle checks are single indexed lookups on any
+database backend. Category.save() keeps the table current for single saves;
+bulk loads (``bulk_create``, fixtures loaded outside save()) should finish with
+``rebuild_category_closure()``.
+
+The category list page renders the whole tree from ``get_category_hierarchy()``,
+which is cached per cache generation; signal handlers move to a new generation
+whenever categories or task categorisation change.
+"""
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Category, CategoryClosure, Task
+from .utils import get_cache_generation, bump_cache_generation
+
+BATCH_SIZE = 1000
+HIERARCHY_GENERATION = 'category_hierarchy'
+
+
+def insert_category_node(category):
+    """Add closure rows for a newly created category."""
+    rows = [CategoryClosure(ancestor_id=category.pk, descendant_id=category.pk, depth=0)]
+    if category.parent_id:
+        ancestors = CategoryClosure.objects.filter(
+            descendant_id=category.parent_id
+        ).values_list('ancestor_id', 'depth')
+        rows.extend(
+            CategoryClosure(ancestor_id=ancestor_id, descendant_id=category.pk, depth=depth + 1)
+            for ancestor_id, depth in ancestors
+        )
+    CategoryClosure.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def move_category_subtree(category):
+    """Re-link a category and its whole subtree below its (new) parent."""
+    subtree = CategoryClosure.objects.filter(ancestor_id=category.pk)
+    subtree_rows = list(subtree.values_list('descendant_id', 'depth'))
+
+    with transaction.atomic():
+        # Detach the subtree from all of its former ancestors
+        CategoryClosure.objects.filter(
+            descendant_id__in=subtree.values('descendant_id')
+        ).exclude(
+            ancestor_id__in=subtree.values('descendant_id')
+        ).delete()
+
+        if category.parent_id:
+            ancestors = list(CategoryClosure.objects.filter(
+                descendant_id=category.parent_id
+            ).values_list('ancestor_id', 'depth'))
+            CategoryClosure.objects.bulk_create(
+                (
+                    CategoryClosure(
+                        ancestor_id=ancestor_id,
+                        descendant_id=descendant_id,
+                        depth=ancestor_depth + descendant_depth + 1,
+                    )
+                    for ancestor_id, ancestor_depth in ancestors
+                    for descendant_id, descendant_depth in subtree_rows
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+
+def build_closure_rows(parent_map):
+    """
+    Yield (ancestor_id, descendant_id, depth) tuples for a {category_id: parent_id}
+    mapping. Cycles in the mapping are cut at the first repeated node.
+    """
+    for category_id in parent_map:
+        seen = {category_id}
+        yield category_id, category_id, 0
+        depth, parent_id = 1, parent_map[category_id]
+        while parent_id is not None and parent_id not in seen:
+            yield parent_id, category_id, depth
+            seen.add(parent_id)
+            depth, parent_id = depth + 1, parent_map.get(parent_id)
+
+
+def rebuild_category_closure():
+    """Rebuild the whole closure table from Category.parent. Returns the row count."""
+    parent_map = dict(Category.objects.values_list('id', 'parent_id'))
+    rows = [
+        CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for ancestor_id, descendant_id, depth in build_closure_rows(parent_map)
+    ]
+    with transaction.atomic():
+        CategoryClosure.objects.all().delete()
+        CategoryClosure.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+@dataclass
+class CategoryNode:
+    """A category in the assembled hierarchy, with direct and rolled-up task counts."""
+    category: Category
+    depth: int = 0
+    children: list = field(default_factory=list)
+    direct_task_count: int = 0
+    total_task_count: int = 0
+
+    def walk(self):
+        """Yield this node and its descendants in display (pre-)order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def build_category_hierarchy():
+    """
+    Assemble the full category tree with task counts from two queries:
+    all categories, and task counts grouped by category.
+    """
+    task_counts = dict(
+        Task.objects.filter(category__isnull=False)
+        .values_list('category_id')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    nodes = {
+        category.id: CategoryNode(category, direct_task_count=task_counts.get(category.id, 0))
+        for category in Category.objects.all()
+    }
+
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.category.parent_id)
+        (parent.children if parent else roots).append(node)
+
+    def finalize(node, depth):
+        node.depth = depth
+        node.total_task_count = node.direct_task_count + sum(
+            finalize(child, depth + 1) for child in node.children
+        )
+        return node.total_task_count
+
+    for root in roots:
+        finalize(root, 0)
+    return roots
+
+
+def get_category_hierarchy():
+    """Cached category hierarchy, rebuilt whenever the category tree generation changes."""
+    cache_key = f"category_hierarchy:{get_cache_generation(HIERARCHY_GENERATION)}"
+    hierarchy = cache.get(cache_key)
+    if hierarchy is None:
+        hierarchy = build_category_hierarchy()
+        cache.set(cache_key, hierarchy, getattr(settings, 'CACHE_TTL', 60 * 15))
+    return hierarchy
+
+
+def invalidate_category_hierarchy():
+    bump_cache_generation(HIERARCHY_GENERATION)
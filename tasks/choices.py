@@ -28,4 +28,16 @@ class TaskPriority:
         (HIGH, 'High'),
         (URGENT, 'Urgent'),
     ]
+    
+    # Sort rank stored on Task.priority_rank: most urgent first
+    RANKS = {
+        URGENT: 0,
+        HIGH: 1,
+        MEDIUM: 2,
+        LOW: 3,
+    }
+    
+    @classmethod
+    def rank(cls, priority):
+        return cls.RANKS.get(priority, len(cls.RANKS))
 
@@ -2,6 +2,7 @@ from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.utils import timezone
+from django.urls import reverse_lazy
 from django.db import models
 from .models import Task, Project, Category, CustomUser, TaskComment, TaskAttachment
 from .choices import TaskStatus, TaskPriority
@@ -58,7 +59,11 @@ class CategoryForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['parent'].queryset = Category.objects.all()
+        parents = Category.objects.all()
+        if self.instance.pk:
+            # A category cannot be moved below itself or any of its descendants
+            parents = parents.exclude(ancestor_links__ancestor_id=self.instance.pk)
+        self.fields['parent'].queryset = parents
         self.fields['parent'].empty_label = "No parent category"
         self.fields['parent'].required = False
 
@@ -231,7 +236,9 @@ class TaskFilterForm(forms.Form):
         widget=forms.TextInput(attrs={
             'class': 'form-control',
             'placeholder': 'Search tasks...',
-            'data-debounce': 'true'
+            'data-debounce': 'true',
+            'data-suggest-url': reverse_lazy('tasks:task_suggest'),
+            'autocomplete': 'off',
         })
     )
 
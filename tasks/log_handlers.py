@@ -0,0 +1,316 @@
+"""
+Asynchronous, batched delivery for the request-path loggers.
+
+``install_async_logging()`` (called from TasksConfig.ready) takes over the
+loggers listed in ``settings.ASYNC_LOGGING['loggers']``: the handlers each one
+would have used, including those inherited from parent loggers, are moved
+behind a single ``AsyncLogHandler``. Emitting a record on the request thread
+then only formats its message and puts it on a bounded in-memory queue; a
+background listener thread drains the queue in batches and hands each record
+to the original handlers (rotating files, console, mail).
+
+When the queue is full the drop policy decides what is lost: ``drop_new``
+discards the incoming record, ``drop_oldest`` evicts the oldest queued record
+below ERROR. Records at ERROR or above are never dropped or evicted; if only
+errors are queued the incoming record is dropped instead. An incoming ERROR
+record that finds the queue full evicts the oldest record below ERROR under
+either policy; with nothing to evict it waits up to ``error_timeout``
+seconds for free space and is then written synchronously on the calling
+thread, so a stalled listener cannot hang a request.
+Drops are counted per logger, reported periodically through the ``performance``
+logger's handlers, and available from ``get_async_logging_stats()``.
+
+The listener thread does not survive ``fork()``. Servers that import the app
+before forking workers (``gunicorn --preload``, uWSGI without lazy-apps) would
+leave every worker without a consumer, so the pipeline re-creates its queue
+and restarts its listener in the child through ``os.register_at_fork``.
+
+AsyncLogHandler is a ``logging.handlers.QueueHandler``: its ``enqueue()``
+applies the drop policy. The listener is not a ``QueueListener``, which
+serves one fixed handler list and takes records one at a time. A single
+queue here carries records for several loggers, each with its own
+downstream handlers, and is drained in batches with one flush per handler
+per batch.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'loggers': ['tasks.request', 'performance', 'audit', 'security'],
+    'queue_size': 10000,
+    'batch_size': 200,
+    'flush_interval': 0.5,
+    'drop_policy': 'drop_oldest',
+    # How long (seconds) an ERROR record waits for queue space before it is
+    # written synchronously
+    'error_timeout': 1.0,
+    # How often (seconds) the listener reports newly dropped records
+    'report_interval': 60,
+}
+
+DROP_POLICIES = ('drop_new', 'drop_oldest')
+_STOP = object()
+
+
+class AsyncLogPipeline:
+    """Bounded queue plus the listener thread that drains it in batches."""
+
+    def __init__(self, queue_size=10000, batch_size=200, flush_interval=0.5,
+                 drop_policy='drop_oldest', report_interval=60, report_handlers=(),
+                 error_timeout=1.0):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r}; expected one of {DROP_POLICIES}")
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.report_interval = report_interval
+        self.report_handlers = list(report_handlers)
+        self.error_timeout = error_timeout
+        self.dropped = Counter()
+        self.processed = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='async-logging', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush everything still queued and stop the listener."""
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def after_fork(self):
+        """
+        Reset the pipeline in a forked child. The parent's listener thread is
+        gone and its queue and locks may be in any state; records queued
+        before the fork are the parent's to write.
+        """
+        running = self._thread is not None
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.dropped = Counter()
+        self.processed = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        if running:
+            self.start()
+
+    def enqueue(self, handlers, record):
+        item = (handlers, record)
+        try:
+            self.queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        if record.levelno >= logging.ERROR:
+            # Whatever the policy, an error takes the place of a lesser record
+            evicted = self._evict_oldest()
+            if evicted is not None:
+                self._count_drop(evicted[1])
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            try:
+                self.queue.put(item, timeout=self.error_timeout)
+            except queue.Full:
+                # The listener is stalled or gone; write it here rather than lose it
+                self._dispatch([item])
+        elif self.drop_policy == 'drop_oldest':
+            while True:
+                evicted = self._evict_oldest()
+                if evicted is None:
+                    # Only errors (or the shutdown marker) are queued; they stay
+                    self._count_drop(record)
+                    return
+                self._count_drop(evicted[1])
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    continue
+        else:
+            self._count_drop(record)
+
+    def _evict_oldest(self):
+        """Remove and return the oldest queued item below ERROR, or None."""
+        with self.queue.mutex:
+            for index, item in enumerate(self.queue.queue):
+                if item is not _STOP and item[1].levelno < logging.ERROR:
+                    del self.queue.queue[index]
+                    self.queue.not_full.notify()
+                    return item
+        return None
+
+    def _count_drop(self, record):
+        with self._lock:
+            self.dropped[record.name] += 1
+
+    @property
+    def total_dropped(self):
+        with self._lock:
+            return sum(self.dropped.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queue.qsize(),
+                'capacity': self.queue.maxsize,
+                'processed': self.processed,
+                'dropped': sum(self.dropped.values()),
+                'dropped_by_logger': dict(self.dropped),
+                'drop_policy': self.drop_policy,
+            }
+
+    def _run(self):
+        last_report = time.monotonic()
+        while True:
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stopping = any(item is _STOP for item in batch)
+            self._dispatch([item for item in batch if item is not _STOP])
+
+            if stopping or time.monotonic() - last_report >= self.report_interval:
+                self._report_drops()
+                last_report = time.monotonic()
+            if stopping:
+                # Anything enqueued after stop() was called still gets written
+                while True:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    if item is not _STOP:
+                        self._dispatch([item])
+
+    def _dispatch(self, batch):
+        touched = set()
+        for handlers, record in batch:
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                    touched.add(handler)
+        # One flush per handler per batch rather than relying on per-record flushes
+        for handler in touched:
+            handler.flush()
+        with self._lock:
+            self.processed += len(batch)
+
+    def _report_drops(self):
+        total = self.total_dropped
+        if total == self._reported or not self.report_handlers:
+            return
+        record = logging.LogRecord(
+            'performance', logging.WARNING, __file__, 0,
+            "Async logging dropped %d records under backpressure (%d total, policy %s)",
+            (total - self._reported, total, self.drop_policy), None,
+        )
+        self._reported = total
+        for handler in self.report_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_formatter = logging.Formatter()
+
+
+class AsyncLogHandler(logging.handlers.QueueHandler):
+    """QueueHandler that queues records for a fixed set of downstream handlers."""
+
+    def __init__(self, pipeline, handlers):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self.handlers = tuple(handlers)
+
+    def prepare(self, record):
+        """
+        Like QueueHandler.prepare(), resolve the message and render the
+        traceback so queued records hold no mutable args or frames. Unlike it,
+        the traceback stays in exc_text rather than being merged into msg, so
+        the downstream handlers' formatters still lay it out themselves.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # Through the pipeline, whose queue is replaced after a fork
+        self.pipeline.enqueue(self.handlers, record)
+
+
+def _effective_handlers(logger):
+    """Handlers a record logged on this logger reaches, following propagation."""
+    handlers = []
+    current = logger
+    while current:
+        handlers.extend(handler for handler in current.handlers if handler not in handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    return handlers
+
+
+_pipeline = None
+
+
+def install_async_logging():
+    """Move the configured loggers onto the async pipeline. Safe to call twice."""
+    global _pipeline
+    config = {**DEFAULT_CONFIG, **getattr(settings, 'ASYNC_LOGGING', {})}
+    if _pipeline is not None or not config['enabled']:
+        return _pipeline
+
+    _pipeline = AsyncLogPipeline(
+        queue_size=config['queue_size'],
+        batch_size=config['batch_size'],
+        flush_interval=config['flush_interval'],
+        drop_policy=config['drop_policy'],
+        report_interval=config['report_interval'],
+        error_timeout=config['error_timeout'],
+        report_handlers=_effective_handlers(logging.getLogger('performance')),
+    )
+    for name in config['loggers']:
+        logger = logging.getLogger(name)
+        handlers = _effective_handlers(logger)
+        if not handlers:
+            continue
+        logger.handlers = [AsyncLogHandler(_pipeline, handlers)]
+        logger.propagate = False
+
+    _pipeline.start()
+    atexit.register(_pipeline.stop)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_pipeline.after_fork)
+    return _pipeline
+
+
+def get_async_logging_stats():
+    """Queue depth, processed and dropped record counts, or None if not installed."""
+    return _pipeline.stats() if _pipeline is not None else None
@@ -0,0 +1,119 @@
+import time
+import statistics
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tasks.models import Category, CategoryClosure
+from tasks.category_tree import rebuild_category_closure
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark data once measurements are done."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks category tree operations (subtree, ancestors, cycle check, move) at several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nodes',
+            type=int,
+            nargs='+',
+            default=[10000, 100000],
+            help='Tree sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument(
+            '--branching',
+            type=int,
+            default=10,
+            help='Children per category (default: 10)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Repetitions per measured operation (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+
+        for size in options['nodes']:
+            try:
+                with transaction.atomic():
+                    self._benchmark(size, options['branching'])
+                    raise _Rollback()
+            except _Rollback:
+                pass
+
+    def _benchmark(self, size, branching):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{size} categories, branching factor {branching}"))
+
+        start_time = time.perf_counter()
+        levels = self._build_tree(size, branching)
+        self.stdout.write(f"  build categories:       {time.perf_counter() - start_time:8.2f}s")
+
+        start_time = time.perf_counter()
+        rows = rebuild_category_closure()
+        self.stdout.write(f"  rebuild closure:        {time.perf_counter() - start_time:8.2f}s ({rows} rows)")
+
+        root = levels[0][0]
+        middle = levels[len(levels) // 2][0]
+        leaf = levels[-1][-1]
+
+        self._measure("subtree count (root)", lambda: CategoryClosure.objects.filter(ancestor=root).count())
+        self._measure("subtree fetch (middle)", middle.get_all_children)
+        self._measure("ancestors (leaf)", leaf.get_ancestors)
+        self._measure("descendant check", lambda: leaf.is_descendant_of(root))
+
+        def cycle_check():
+            root.parent_id = leaf.id
+            try:
+                root.clean()
+            except Exception:
+                pass
+            finally:
+                root.parent_id = None
+        self._measure("cycle check", cycle_check)
+
+        def insert_leaf():
+            Category.objects.create(name="benchmark leaf", parent=leaf)
+        self._measure("insert leaf", insert_leaf)
+
+        # Move a middle subtree back and forth between two roots
+        original_parent = middle.parent
+        other_root = Category.objects.create(name="benchmark root")
+
+        def move_subtree():
+            middle.parent = other_root if middle.parent_id != other_root.id else original_parent
+            middle.save()
+        self._measure("move middle subtree", move_subtree, repeat=min(self.repeat, 4))
+
+    def _build_tree(self, size, branching):
+        levels = [Category.objects.bulk_create([Category(name="benchmark 0")])]
+        created = 1
+        while created < size:
+            level = []
+            for parent in levels[-1]:
+                for _ in range(branching):
+                    if created >= size:
+                        break
+                    level.append(Category(name=f"benchmark {created}", parent=parent))
+                    created += 1
+            levels.append(Category.objects.bulk_create(level, batch_size=1000))
+        return levels
+
+    def _measure(self, label, func, repeat=None):
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat or self.repeat):
+                start_time = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start_time)
+        per_call = len(queries) / len(timings)
+        self.stdout.write(
+            f"  {label + ':':<24}{statistics.median(timings) * 1000:8.2f}ms median, "
+            f"{per_call:.0f} queries/call"
+        )
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from tasks.middleware import ObservabilityMiddleware
+from tasks.observability import DEFAULT_SINKS
+
+
+class Command(BaseCommand):
+    help = 'Measures the per-request overhead of ObservabilityMiddleware, in total and per sink'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5000,
+            help='Requests per measurement round (default: 5000)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Measurement rounds; the median round is reported (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        self.requests = options['requests']
+        self.rounds = options['rounds']
+        self.factory = RequestFactory()
+        # A plain page view and a JSON API write
+        self.request_specs = [
+            ('GET', '/tasks/?status=todo', b'', 'text/plain'),
+            ('POST', '/tasks/1/update-status/', b'{"status": "completed"}', 'application/json'),
+        ]
+
+        self.stdout.write(
+            f"{self.requests} requests x {self.rounds} rounds, "
+            f"log sample rate {getattr(settings, 'REQUEST_LOG_SAMPLE_RATE', 1.0)}"
+        )
+        baseline = self._measure(None)
+        self.stdout.write(f"  {'view only:':<34}{baseline * 1e6:8.1f}us/request")
+
+        configured = getattr(settings, 'OBSERVABILITY_SINKS', DEFAULT_SINKS)
+        rows = [('all configured sinks', configured)] + [(path.rsplit('.', 1)[-1], [path]) for path in configured]
+        rows.append(('no sinks (middleware only)', []))
+        for label, sinks in rows:
+            overhead = self._measure(sinks) - baseline
+            self.stdout.write(f"  {label + ':':<34}{overhead * 1e6:8.1f}us/request overhead")
+
+    def _measure(self, sinks):
+        middleware = None
+
+        def view(request):
+            # Django calls process_view between request start and the view
+            if middleware is not None:
+                middleware.process_view(request, view, (), {})
+            return HttpResponse('ok')
+
+        if sinks is not None:
+            middleware = ObservabilityMiddleware(view, sinks=sinks)
+        handler = middleware or view
+
+        timings = []
+        for _ in range(self.rounds):
+            requests = [self._build_request(index) for index in range(self.requests)]
+            start_time = time.perf_counter()
+            for request in requests:
+                handler(request)
+            timings.append((time.perf_counter() - start_time) / self.requests)
+        return statistics.median(timings)
+
+    def _build_request(self, index):
+        method, path, body, content_type = self.request_specs[index % len(self.request_specs)]
+        request = self.factory.generic(method, path, body, content_type=content_type)
+        request.user = AnonymousUser()
+        return request
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+
+from tasks.search import rebuild_task_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text task search index from tasks and project titles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tasks to reindex per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        count = rebuild_task_search(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt search index for {count} tasks in {time.time() - start_time:.2f} seconds"
+        ))
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+
+from tasks.visibility import rebuild_task_visibility
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the TaskVisibility access index from tasks, projects and memberships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tasks to resync per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        count = rebuild_task_visibility(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt visibility for {count} tasks in {time.time() - start_time:.2f} seconds"
+        ))
@@ -0,0 +1,363 @@
+"""
+In-process request metrics with cross-worker aggregation.
+
+Each worker records request latencies into HDR-style histograms keyed by the
+resolved URL name and status class (2xx, 4xx, ...), plus counters for
+requests, SQL queries and DB time. Histogram buckets are log-linear: every
+power of two between 1ms and ~65s is split into SUB_BUCKETS equal steps, so
+relative error stays below 1/SUB_BUCKETS at any latency.
+
+A background thread in each worker writes a snapshot of its totals to
+``METRICS_DIR/worker-<pid>-<start>.json`` every METRICS_FLUSH_INTERVAL
+seconds (atomically, via rename); requests only update memory. The start
+time in the name keeps a new worker that reuses a PID from overwriting the
+snapshot of the one that exited. The metrics endpoint merges every snapshot
+in the directory, so the output covers all gunicorn workers regardless of
+which one serves the scrape.
+
+Snapshots of exited workers are folded into ``archive.json`` and deleted,
+so counters never go backwards and the directory holds one file per live
+worker. collect() does this for any PID no longer running on the host;
+mark_process_dead() does it immediately and can be called from gunicorn's
+``child_exit`` hook, like the prometheus_client function of the same name.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, archiving is best effort
+    fcntl = None
+
+from django.conf import settings
+
+from .utils import get_cache_stats
+
+SUB_BUCKETS = 4
+MIN_LATENCY = 0.001
+MAX_EXPONENT = 16
+
+ARCHIVE_FILENAME = 'archive.json'
+LOCK_FILENAME = '.lock'
+
+
+def _bucket_bounds():
+    bounds = []
+    for exponent in range(MAX_EXPONENT):
+        low = MIN_LATENCY * 2 ** exponent
+        step = low / SUB_BUCKETS
+        bounds.extend(round(low + step * index, 6) for index in range(SUB_BUCKETS))
+    bounds.append(round(MIN_LATENCY * 2 ** MAX_EXPONENT, 6))
+    return bounds
+
+
+BUCKET_BOUNDS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """Fixed log-linear bucket histogram. counts[i] holds values <= BUCKET_BOUNDS[i]."""
+
+    def __init__(self, counts=None, total=0.0, count=0):
+        # The extra slot is the +Inf bucket
+        self.counts = counts or [0] * (len(BUCKET_BOUNDS) + 1)
+        self.sum = total
+        self.count = count
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th quantile (0 < q <= 1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else float('inf')
+        return float('inf')
+
+    def as_dict(self):
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(list(data['counts']), data['sum'], data['count'])
+
+
+def status_class(status_code):
+    return f"{status_code // 100}xx"
+
+
+class MetricsRegistry:
+    """Per-process metrics, flushed to a file-backed store for aggregation."""
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._reset()
+
+    def _reset(self):
+        self.histograms = {}
+        self.counters = {}
+        self.worker_id = f"{os.getpid()}-{int(time.time() * 1000)}"
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def observe_request(self, url_name, status_code, duration, db_queries=0, db_time=0.0):
+        labels = (url_name, status_class(status_code))
+        with self._lock:
+            histogram = self.histograms.get(labels)
+            if histogram is None:
+                histogram = self.histograms[labels] = LatencyHistogram()
+            histogram.observe(duration)
+            for name, value in (('requests', 1), ('db_queries', db_queries), ('db_time', db_time)):
+                key = (name,) + labels
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def start(self):
+        """Start the thread that flushes every flush_interval seconds."""
+        with self._lock:
+            if self._thread is not None or not self.directory:
+                return
+            self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write a final snapshot."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def after_fork(self):
+        """
+        Start afresh in a forked child. The parent's totals are already in
+        the parent's snapshot and its flush thread is gone.
+        """
+        running = self._thread is not None
+        self._reset()
+        if running:
+            self.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                # Full or unwritable directory; try again on the next tick
+                continue
+
+    def snapshot(self):
+        with self._lock:
+            return _as_snapshot(self.histograms, self.counters, get_cache_stats())
+
+    def flush(self):
+        """Atomically write this worker's totals to the shared directory."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        _write_snapshot(self.directory, f"worker-{self.worker_id}.json", self.snapshot())
+
+    def collect(self):
+        """Merged snapshots of every worker (or just this one without a store)."""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        dead = {
+            pid for pid in map(_worker_pid, os.listdir(self.directory))
+            if pid is not None and not _pid_alive(pid)
+        }
+        for pid in dead:
+            mark_process_dead(pid, self.directory)
+        with _locked(self.directory, shared=True):
+            filenames = [
+                filename for filename in sorted(os.listdir(self.directory))
+                if filename == ARCHIVE_FILENAME or _worker_pid(filename) is not None
+            ]
+            return _read_snapshots(self.directory, filenames)
+
+
+def _as_snapshot(histograms, counters, cache_stats):
+    return {
+        'histograms': [
+            {'labels': list(labels), **histogram.as_dict()}
+            for labels, histogram in histograms.items()
+        ],
+        'counters': [{'key': list(key), 'value': value} for key, value in counters.items()],
+        'cache': cache_stats,
+    }
+
+
+def _write_snapshot(directory, filename, snapshot):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    with os.fdopen(fd, 'w') as tmp_file:
+        json.dump(snapshot, tmp_file)
+    os.replace(tmp_path, os.path.join(directory, filename))
+
+
+def _read_snapshots(directory, filenames):
+    snapshots = []
+    for filename in filenames:
+        try:
+            with open(os.path.join(directory, filename)) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _worker_pid(filename):
+    """PID from a worker-<pid>-<start>.json name, None for other files."""
+    if not (filename.startswith('worker-') and filename.endswith('.json')):
+        return None
+    pid = filename[len('worker-'):-len('.json')].split('-')[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else, or the platform cannot tell
+        return True
+    return True
+
+
+@contextmanager
+def _locked(directory, shared=False):
+    """Serialise archiving against readers through a lock file in directory."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILENAME), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def mark_process_dead(pid, directory=None):
+    """
+    Fold the snapshots of exited worker pid into the archive and delete them.
+    Totals are preserved; only the per-worker files go away.
+    """
+    directory = directory or getattr(settings, 'METRICS_DIR', None)
+    if not directory or not os.path.isdir(directory):
+        return
+    with _locked(directory):
+        filenames = [
+            filename for filename in os.listdir(directory) if _worker_pid(filename) == pid
+        ]
+        if not filenames:
+            return
+        snapshots = _read_snapshots(directory, [ARCHIVE_FILENAME] + filenames)
+        _write_snapshot(directory, ARCHIVE_FILENAME, _as_snapshot(*merge_snapshots(snapshots)))
+        for filename in filenames:
+            os.remove(os.path.join(directory, filename))
+
+
+def merge_snapshots(snapshots):
+    histograms, counters, cache_stats = {}, {}, {}
+    for snapshot in snapshots:
+        for data in snapshot['histograms']:
+            labels = tuple(data['labels'])
+            histogram = LatencyHistogram.from_dict(data)
+            if labels in histograms:
+                histograms[labels].merge(histogram)
+            else:
+                histograms[labels] = histogram
+        for data in snapshot['counters']:
+            key = tuple(data['key'])
+            counters[key] = counters.get(key, 0) + data['value']
+        for name, stats in snapshot.get('cache', {}).items():
+            merged = cache_stats.setdefault(name, {})
+            for event, value in stats.items():
+                merged[event] = merged.get(event, 0) + value
+    return histograms, counters, cache_stats
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+COUNTER_HELP = {
+    'requests': ('taskmanager_requests_total', 'Requests served.'),
+    'db_queries': ('taskmanager_db_queries_total', 'SQL queries executed while serving requests.'),
+    'db_time': ('taskmanager_db_seconds_total', 'Time spent in SQL queries while serving requests.'),
+}
+CACHE_EVENTS = ('hits', 'misses', 'stale', 'recomputes')
+
+
+def render_prometheus(snapshots):
+    """Render merged snapshots in the Prometheus text exposition format."""
+    histograms, counters, cache_stats = merge_snapshots(snapshots)
+    lines = [
+        '# HELP taskmanager_request_duration_seconds Request latency by URL name and status class.',
+        '# TYPE taskmanager_request_duration_seconds histogram',
+    ]
+    for (url_name, status), histogram in sorted(histograms.items()):
+        labels = _labels(view=url_name, status=status)
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS, histogram.counts):
+            cumulative += count
+            lines.append(f'taskmanager_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'taskmanager_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'taskmanager_request_duration_seconds_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'taskmanager_request_duration_seconds_count{{{labels}}} {histogram.count}')
+
+    for name, (metric, help_text) in COUNTER_HELP.items():
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for key, value in sorted(counters.items()):
+            if key[0] == name:
+                lines.append(f'{metric}{{{_labels(view=key[1], status=key[2])}}} {value}')
+
+    lines.append('# HELP taskmanager_cache_events_total Cache lookups by cached method and outcome.')
+    lines.append('# TYPE taskmanager_cache_events_total counter')
+    for method, stats in sorted(cache_stats.items()):
+        for event in CACHE_EVENTS:
+            lines.append(f'taskmanager_cache_events_total{{{_labels(method=method, event=event)}}} {stats.get(event, 0)}')
+    return '\n'.join(lines) + '\n'
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(
+            directory=getattr(settings, 'METRICS_DIR', None),
+            flush_interval=getattr(settings, 'METRICS_FLUSH_INTERVAL', 5.0),
+        )
+        _registry.start()
+        atexit.register(_registry.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_registry.after_fork)
+    return _registry
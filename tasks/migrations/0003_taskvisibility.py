@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-18 03:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_task_visibility(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Project = apps.get_model('tasks', 'Project')
+    TaskVisibility = apps.get_model('tasks', 'TaskVisibility')
+
+    members = {}
+    for project_id, user_id in Project.members.through.objects.values_list('project_id', 'customuser_id'):
+        members.setdefault(project_id, set()).add(user_id)
+
+    rows = []
+    tasks = Task.objects.values_list('id', 'created_by_id', 'assigned_to_id', 'project_id', 'project__owner_id')
+    for task_id, created_by_id, assigned_to_id, project_id, owner_id in tasks.iterator():
+        user_ids = {created_by_id, assigned_to_id, owner_id} | members.get(project_id, set())
+        rows.extend(TaskVisibility(user_id=user_id, task_id=task_id) for user_id in user_ids if user_id)
+    TaskVisibility.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_taskattachment_options_alter_category_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='tasks.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_visibility', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Task visibility',
+                'verbose_name_plural': 'Task visibility',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskvisibility',
+            constraint=models.UniqueConstraint(fields=('user', 'task'), name='unique_task_visibility'),
+        ),
+        migrations.RunPython(populate_task_visibility, migrations.RunPython.noop),
+    ]
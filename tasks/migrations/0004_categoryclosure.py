@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 03:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_category_closure(apps, schema_editor):
+    Category = apps.get_model('tasks', 'Category')
+    CategoryClosure = apps.get_model('tasks', 'CategoryClosure')
+
+    parent_map = dict(Category.objects.values_list('id', 'parent_id'))
+    rows = []
+    for category_id in parent_map:
+        seen = {category_id}
+        rows.append(CategoryClosure(ancestor_id=category_id, descendant_id=category_id, depth=0))
+        depth, parent_id = 1, parent_map[category_id]
+        while parent_id is not None and parent_id not in seen:
+            rows.append(CategoryClosure(ancestor_id=parent_id, descendant_id=category_id, depth=depth))
+            seen.add(parent_id)
+            depth, parent_id = depth + 1, parent_map.get(parent_id)
+    CategoryClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_taskvisibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='tasks.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='tasks.category')),
+            ],
+            options={
+                'verbose_name': 'Category closure',
+                'verbose_name_plural': 'Category closure',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='tasks_categ_descend_e2b135_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categoryclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_category_closure'),
+        ),
+        migrations.RunPython(populate_category_closure, migrations.RunPython.noop),
+    ]
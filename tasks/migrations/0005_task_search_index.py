@@ -0,0 +1,52 @@
+# Full-text search index for tasks (see tasks.search). The index is not a
+# Django model: its DDL depends on the database vendor.
+
+from django.db import migrations
+
+
+def create_task_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE tasks_task_search ("
+            "task_id bigint PRIMARY KEY REFERENCES tasks_task (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX tasks_task_search_document_gin ON tasks_task_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO tasks_task_search (task_id, document) "
+            "SELECT t.id, "
+            "setweight(to_tsvector('simple', coalesce(t.title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(p.title, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(t.description, '')), 'C') "
+            "FROM tasks_task t LEFT JOIN tasks_project p ON p.id = t.project_id"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tasks_task_search USING fts5("
+            "title, project_title, description, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            "INSERT INTO tasks_task_search (rowid, title, project_title, description) "
+            "SELECT t.id, t.title, p.title, t.description "
+            "FROM tasks_task t LEFT JOIN tasks_project p ON p.id = t.project_id"
+        )
+
+
+def drop_task_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_task_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_categoryclosure'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_task_search_index, drop_task_search_index),
+    ]
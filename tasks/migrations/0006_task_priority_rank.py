@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:11
+
+import django.db.models.lookups
+from django.db import migrations, models
+
+# TaskPriority.RANKS at the time of this migration
+PRIORITY_RANKS = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+def populate_priority_rank(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    for priority, rank in PRIORITY_RANKS.items():
+        Task.objects.filter(priority=priority).update(priority_rank=rank)
+    Task.objects.exclude(priority__in=PRIORITY_RANKS).update(priority_rank=len(PRIORITY_RANKS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['priority_rank', 'deadline'], 'verbose_name': 'Task', 'verbose_name_plural': 'Tasks'},
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=2, editable=False),
+        ),
+        migrations.RunPython(populate_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(models.F('priority_rank'), django.db.models.lookups.IsNull(models.F('deadline'), True), models.F('deadline'), models.OrderBy(models.F('created_at'), descending=True), models.F('id'), name='task_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(models.F('status'), models.F('priority_rank'), django.db.models.lookups.IsNull(models.F('deadline'), True), models.F('deadline'), models.OrderBy(models.F('created_at'), descending=True), models.F('id'), name='task_status_list_order_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.lookups import IsNull
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -57,90 +60,99 @@ class Category(models.Model):
     
     def get_absolute_url(self):
         return reverse('category_detail', kwargs={'pk': self.pk})
-    @cached_property(timeout=3600)  # Cache for 1 hour
+    
     def get_all_children(self):
         """
-        Get all child categories recursively, using an efficient query approach.
-        This version uses a single query with a recursive CTE when using PostgreSQL,
-        or falls back to a more efficient version of the recursive approach.
+        Get all descendant categories, nearest first.
+        Resolved with one indexed lookup on the CategoryClosure table.
         """
-        from django.db import connection
-        
-        # Check if using PostgreSQL to use recursive CTE
-        if connection.vendor == 'postgresql':
-            from django.db import connection
-            
-            # Use raw SQL for efficient recursive CTE
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    WITH RECURSIVE category_tree AS (
-                        SELECT id, parent_id FROM tasks_category WHERE id = %s
-                        UNION ALL
-                        SELECT c.id, c.parent_id FROM tasks_category c
-                        JOIN category_tree ct ON ct.id = c.parent_id
-                    )
-                    SELECT id FROM category_tree WHERE id != %s
-                """, [self.id, self.id])
-                
-                # Get all child IDs from the query result
-                child_ids = [row[0] for row in cursor.fetchall()]
-                
-                # Return categories by ID
-                if child_ids:
-                    return list(Category.objects.filter(id__in=child_ids))
-                return []
-        else:
-            # Optimized version for non-PostgreSQL databases
-            # This approach reduces queries by using prefetch_related
-            all_categories = Category.objects.prefetch_related('children')
-            
-            # Use a more efficient recursive approach with a set to track processed IDs
-            def get_children_recursive(category_id, processed_ids=None):
-                if processed_ids is None:
-                    processed_ids = set()
-                
-                # Get direct children from the prefetched categories
-                direct_children = [c for c in all_categories if c.parent_id == category_id and c.id not in processed_ids]
-                
-                result = []
-                for child in direct_children:
-                    processed_ids.add(child.id)
-                    result.append(child)
-                    # Get grandchildren recursively
-                    grandchildren = get_children_recursive(child.id, processed_ids)
-                    result.extend(grandchildren)
-                
-                return result
-            
-            return get_children_recursive(self.id)
-        return children
+        return list(Category.objects.filter(
+            ancestor_links__ancestor_id=self.pk, ancestor_links__depth__gt=0
+        ).order_by('ancestor_links__depth', 'name'))
+    
+    def get_ancestors(self):
+        """Get all ancestor categories, from the root down to the direct parent."""
+        return list(Category.objects.filter(
+            descendant_links__descendant_id=self.pk, descendant_links__depth__gt=0
+        ).order_by('-descendant_links__depth'))
+    
+    def is_descendant_of(self, other):
+        """Check whether this category lies in the subtree of ``other``."""
+        return CategoryClosure.objects.filter(
+            ancestor_id=other.pk, descendant_id=self.pk, depth__gt=0
+        ).exists()
+    
+    @cached_property(timeout=1800)  # Cache for 30 minutes
+    def all_tasks_count(self):
+        """Get the count of all tasks in this category and its subcategories."""
+        return Task.objects.filter(category__ancestor_links__ancestor_id=self.pk).count()
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Store initial parent_id for cache invalidation on parent change
-        if self.pk:
-            self._initial_parent_id = self.parent_id
+        # Store initial parent_id for closure maintenance and cache invalidation on parent change
+        # (read from __dict__ so a deferred parent field does not trigger a query)
+        self._initial_parent_id = self.__dict__.get('parent_id') if self.pk else None
     
     def clean(self):
         """Prevent circular dependencies in category hierarchy."""
-        if self.parent:
-            # Check if self is not being set as a parent of itself
-            if self.parent.id == self.id:
-                raise models.ValidationError(_("A category cannot be a parent of itself."))
-            
-            # Check if self is not being set as a parent of its ancestors
-            parent = self.parent
-            while parent:
-                if parent.parent and parent.parent.id == self.id:
-                    raise models.ValidationError(_("Circular reference detected in category hierarchy."))
-                parent = parent.parent
+        if not self.parent_id or not self.pk:
+            return
+        
+        # Check if self is not being set as a parent of itself
+        if self.parent_id == self.pk:
+            raise ValidationError(_("A category cannot be a parent of itself."))
+        
+        # Check if the new parent lies inside this category's own subtree
+        if CategoryClosure.objects.filter(ancestor_id=self.pk, descendant_id=self.parent_id).exists():
+            raise ValidationError(_("Circular reference detected in category hierarchy."))
+    
     def save(self, *args, **kwargs):
+        from .category_tree import insert_category_node, move_category_subtree
+        
         self.clean()
-        super().save(*args, **kwargs)
+        is_new = self._state.adding
+        parent_changed = not is_new and self.parent_id != self._initial_parent_id
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                insert_category_node(self)
+            elif parent_changed:
+                move_category_subtree(self)
+        
+        self._initial_parent_id = self.parent_id
     
     @property
     def task_count(self):
         return self.tasks.count()
+
+
+class CategoryClosure(models.Model):
+    """
+    Closure table for the category tree: one row per (ancestor, descendant)
+    pair, including a depth-0 row linking each category to itself.
+    
+    Maintained by Category.save() through tasks.category_tree; rows are
+    removed with their categories by cascading deletes.
+    """
+    ancestor = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+    
+    class Meta:
+        verbose_name = _('Category closure')
+        verbose_name_plural = _('Category closure')
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_category_closure'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+    
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
 class Project(models.Model):
     title = models.CharField(max_length=200, db_index=True, help_text=_("Project title"))
     description = models.TextField(blank=True, null=True, help_text=_("Project description"))
@@ -168,6 +180,14 @@ class Project(models.Model):
             models.Index(fields=['end_date']),
             models.Index(fields=['is_archived']),
         ]
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Store initial owner_id so visibility is only resynced on ownership change
+        # (read from __dict__ so a deferred owner field does not trigger a query)
+        self._initial_owner_id = self.__dict__.get('owner_id') if self.pk else None
+        # Likewise the search index only needs the project's tasks on a rename
+        self._initial_title = self.__dict__.get('title') if self.pk else None
+    
     def __str__(self):
         return self.title
     
@@ -179,30 +199,11 @@ class Project(models.Model):
         """Get the count of tasks in this category with caching."""
         return self.tasks.count()
     
-    @cached_property(timeout=1800)  # Cache for 30 minutes
-    def all_tasks_count(self):
-        """
-        Get the count of all tasks in this category and its subcategories.
-        Uses optimal query approach to minimize database hits.
-        """
-        # Get IDs of all children categories
-        children = self.get_all_children()
-        child_ids = [child.id for child in children]
-        
-        # Include the current category
-        category_ids = [self.id] + child_ids
-        
-        # Count tasks in all categories with a single query
-        return Task.objects.filter(category_id__in=category_ids).count()
-    
     def invalidate_caches(self):
         """Invalidate all cached properties for this instance."""
         from .utils import invalidate_model_cache
         invalidate_model_cache(self)
-        
-        # Also invalidate parent's caches since they depend on children
-        if self.parent:
-            self.parent.invalidate_caches()
+    
     @property
     def completed_task_count(self):
         return self.tasks.filter(status=TaskStatus.COMPLETED).count()
@@ -231,22 +232,25 @@ class Project(models.Model):
         """Save the model and invalidate relevant caches."""
         self.clean()
         
-        # Check if this is an update to an existing record
-        is_update = self.pk is not None
-        
         # Save the model
         super().save(*args, **kwargs)
+        self._initial_owner_id = self.owner_id
+        self._initial_title = self.title
         
         # Invalidate caches
         self.invalidate_caches()
-        
-        # If parent changed, invalidate old parent's cache too
-        if is_update and 'parent_id' in kwargs.get('update_fields', []) and self._initial_parent_id:
-            try:
-                old_parent = Category.objects.get(pk=self._initial_parent_id)
-                old_parent.invalidate_caches()
-            except (Category.DoesNotExist, AttributeError):
-                pass
+
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Restrict to tasks the user may see, using the TaskVisibility index.
+        A single indexed join replaces the owner/member/creator/assignee OR query,
+        and no DISTINCT is needed because (user, task) pairs are unique.
+        """
+        return self.filter(visibility__user=user)
+
+
 class Task(models.Model):
     title = models.CharField(max_length=200, db_index=True, help_text=_("Task title"))
     description = models.TextField(blank=True, null=True, help_text=_("Task description"))
@@ -255,6 +259,9 @@ class Task(models.Model):
                              default=TaskStatus.TODO, help_text=_("Current status"))
     priority = models.CharField(max_length=20, db_index=True, choices=TaskPriority.CHOICES,
                               default=TaskPriority.MEDIUM, help_text=_("Task priority"))
+    # Maintained from priority by save(), so lists sort by an indexed integer
+    priority_rank = models.PositiveSmallIntegerField(default=TaskPriority.rank(TaskPriority.MEDIUM),
+                                                     editable=False)
     
     project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, 
                               related_name='tasks', help_text=_("Project this task belongs to"))
@@ -276,10 +283,12 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Task')
         verbose_name_plural = _('Tasks')
-        ordering = ['-priority', 'deadline']
+        ordering = ['priority_rank', 'deadline']
         indexes = [
             models.Index(fields=['created_by']),
             models.Index(fields=['assigned_to']),
@@ -287,6 +296,18 @@ class Task(models.Model):
             models.Index(fields=['status', 'priority']),
             models.Index(fields=['deadline', 'status']),
             models.Index(fields=['completed_at']),
+            # The task list sort key (tasks.views.TASK_LIST_ORDERING) as
+            # KeysetPaginator orders it, deadline IS NULL putting NULLs last,
+            # unfiltered and within a status
+            models.Index(
+                F('priority_rank'), IsNull(F('deadline'), True), F('deadline'), F('created_at').desc(), F('id'),
+                name='task_list_order_idx',
+            ),
+            models.Index(
+                F('status'), F('priority_rank'), IsNull(F('deadline'), True), F('deadline'),
+                F('created_at').desc(), F('id'),
+                name='task_status_list_order_idx',
+            ),
         ]
     def __str__(self):
         return self.title
@@ -299,6 +320,14 @@ class Task(models.Model):
         self.completed_at = timezone.now()
         self.save()
     
+    def set_status(self, status, now=None):
+        """Change the status, stamping or clearing completed_at; the caller saves."""
+        if status == TaskStatus.COMPLETED and self.status != TaskStatus.COMPLETED:
+            self.completed_at = now or timezone.now()
+        elif status != TaskStatus.COMPLETED and self.status == TaskStatus.COMPLETED:
+            self.completed_at = None
+        self.status = status
+    
     @property
     def is_overdue(self):
         if not self.deadline or self.status == TaskStatus.COMPLETED:
@@ -331,7 +360,33 @@ class Task(models.Model):
     
     def save(self, *args, **kwargs):
         self.clean()
+        self.priority_rank = TaskPriority.rank(self.priority)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
         super().save(*args, **kwargs)
+class TaskVisibility(models.Model):
+    """
+    Materialized access index: one row per (user, task) pair the user may see.
+    
+    A user sees a task if they created it, are assigned to it, or own or are a
+    member of its project. Rows are maintained by the signal handlers in
+    tasks.signals via tasks.visibility.sync_task_visibility.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='task_visibility')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='visibility')
+    
+    class Meta:
+        verbose_name = _('Task visibility')
+        verbose_name_plural = _('Task visibility')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task'], name='unique_task_visibility'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} -> {self.task_id}"
+
+
 class TaskComment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
@@ -0,0 +1,442 @@
+"""
+Request observability shared by ObservabilityMiddleware and its sinks.
+
+The middleware does the per-request work every concern needs exactly once:
+one timer, one client IP extraction and one route classification (a cached
+lookup per resolved view function, see tasks.sensitivity). Each logging
+concern is a sink listed in
+``settings.OBSERVABILITY_SINKS``; sinks receive the shared RequestContext at
+request start, view dispatch, uncaught exceptions and response time.
+
+The middleware runs before CommonMiddleware, so the request timer and the
+latency histograms include the session, common, CSRF and auth middleware,
+and requests those answer without reaching a view are still seen. The user
+is not known at request start: sinks read it from view dispatch on.
+
+- PerformanceSink: SQL profiling, slow/N+1 warnings, metrics, X-Performance headers
+- RequestLogSink: sampled request/response records and security-route records
+- AuditSink: authentication attempts, sensitive access and data modifications
+- ExceptionSink: uncaught exception logging and the JSON/HTML error response
+"""
+import logging
+import random
+import time
+import traceback
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import BadRequest, PermissionDenied, SuspiciousOperation
+from django.http import Http404, HttpResponseServerError, JsonResponse
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .metrics import get_registry as get_metrics_registry
+from .profiling import profile_queries
+
+# Configure loggers
+request_logger = logging.getLogger('tasks.request')
+security_logger = logging.getLogger('security')
+performance_logger = logging.getLogger('performance')
+audit_logger = logging.getLogger('audit')
+error_logger = logging.getLogger('error')
+
+DEFAULT_SINKS = [
+    'tasks.observability.PerformanceSink',
+    'tasks.observability.RequestLogSink',
+    'tasks.observability.AuditSink',
+    'tasks.observability.ExceptionSink',
+]
+
+# Let Django turn these into their 4xx responses instead of a 500
+CLIENT_ERRORS = (Http404, PermissionDenied, SuspiciousOperation, BadRequest)
+
+
+def get_client_ip(request):
+    """Get client IP address from request."""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        # Get first IP in case of proxy chain
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def declared_content_length(request):
+    """The Content-Length header as an int; 0 if missing or malformed, as Django treats it."""
+    try:
+        return max(int(request.META.get('CONTENT_LENGTH') or 0), 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+class RequestContext:
+    """Per-request values computed once and shared by every sink."""
+
+    __slots__ = ('request', 'id', 'start', 'client_ip', 'route_classes', 'processing_time')
+
+    def __init__(self, request):
+        self.request = request
+        self.id = str(uuid.uuid4())
+        self.start = time.perf_counter()
+        self.client_ip = get_client_ip(request)
+        # Sensitivity classes of the resolved route, set before view_started
+        self.route_classes = frozenset()
+        self.processing_time = None
+
+    def finish(self):
+        self.processing_time = time.perf_counter() - self.start
+
+    def user_info(self):
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return {'authenticated': True, 'id': user.id, 'username': user.username}
+        return {'authenticated': False, 'id': None, 'username': None}
+
+
+def load_sinks(paths=None):
+    paths = paths if paths is not None else getattr(settings, 'OBSERVABILITY_SINKS', DEFAULT_SINKS)
+    return [import_string(path)() if isinstance(path, str) else path for path in paths]
+
+
+def keep_request_log(request, status_code, processing_time):
+    """
+    Tail-based sampling decision for a request's log records, made once per
+    request. Errors (status >= 400) and slow requests are always kept;
+    other requests are kept with probability REQUEST_LOG_SAMPLE_RATE.
+    """
+    keep = getattr(request, 'log_sampled', None)
+    if keep is None:
+        sample_rate = getattr(settings, 'REQUEST_LOG_SAMPLE_RATE', 1.0)
+        keep = (
+            status_code >= 400
+            or processing_time > getattr(settings, 'SLOW_REQUEST_THRESHOLD', 1.0)
+            or sample_rate >= 1
+            or random.random() < sample_rate
+        )
+        request.log_sampled = keep
+    return keep
+
+
+class BodyLoggingPolicy:
+    """
+    Decides whether a request body may be logged and how much of it.
+
+    Bodies are only logged for allow-listed path prefixes and content types,
+    never for security-sensitive routes, and only for a sampled fraction of
+    requests. The logged value is the first max_bytes of the raw body, decoded
+    without parsing, and only if the view already read the body into memory.
+    """
+
+    def __init__(self, max_bytes=1024, sample_rate=1.0, paths=(), content_types=('application/json',)):
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.paths = tuple(paths)
+        self.content_types = tuple(content_types)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(**getattr(settings, 'REQUEST_BODY_LOGGING', {}))
+
+    def should_log(self, request, route_classes=frozenset()):
+        if not self.paths or not self.max_bytes or 'security' in route_classes:
+            return False
+        if request.content_type not in self.content_types:
+            return False
+        if not request.path.startswith(self.paths):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def capture(self, request):
+        body = getattr(request, '_body', None)
+        if body is None:
+            # The view streamed or ignored the body; don't read it just for logging
+            return {'body_read': False}
+        return {
+            'body': body[:self.max_bytes].decode('utf-8', errors='replace'),
+            'body_truncated': len(body) > self.max_bytes,
+        }
+
+
+class ObservabilitySink:
+    """Base sink; override the hooks a concern needs."""
+
+    def request_started(self, context):
+        pass
+
+    def view_started(self, context, view_func):
+        pass
+
+    def exception_raised(self, context, exception):
+        """Return a response to handle the exception, or None."""
+        return None
+
+    def request_finished(self, context, response):
+        pass
+
+
+class PerformanceSink(ObservabilitySink):
+    """
+    - Profiles SQL queries (count, DB time, slowest and repeated statements)
+    - Logs slow requests and likely N+1 query patterns
+    - Records latency histograms for the metrics endpoint
+    - Adds processing time and performance metrics headers to responses
+    """
+
+    def __init__(self):
+        self.slow_request_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD', 1.0)
+        self.duplicate_query_threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 10)
+        self.query_profiling = getattr(settings, 'QUERY_PROFILING', True)
+
+    def request_started(self, context):
+        request = context.request
+        request.performance_stats = {}
+        if self.query_profiling:
+            request._query_profiling = profile_queries()
+            request.query_profiler = request._query_profiling.__enter__()
+
+    def request_finished(self, context, response):
+        request = context.request
+        processing_time = context.processing_time
+        profiling = getattr(request, '_query_profiling', None)
+        profiler = getattr(request, 'query_profiler', None)
+        if profiling is not None:
+            profiling.__exit__(None, None, None)
+            del request._query_profiling
+            request.performance_stats.update(profiler.as_stats())
+        stats = request.performance_stats
+
+        response['X-Processing-Time'] = f"{processing_time:.4f}s"
+
+        slow = processing_time > self.slow_request_threshold
+        repeated = profiler is not None and profiler.duplicate_count >= self.duplicate_query_threshold
+        if slow or repeated:
+            log_extra = {
+                'request_id': context.id,
+                'method': request.method,
+                'path': request.path,
+                'processing_time': processing_time,
+                **stats,
+            }
+            if profiler is not None:
+                log_extra.update(profiler.as_log_data())
+            if slow:
+                performance_logger.warning(
+                    f"Slow request detected: {request.method} {request.path} took {processing_time:.4f}s",
+                    extra=dict(log_extra, threshold=self.slow_request_threshold)
+                )
+            # Repeated statements are the usual sign of an N+1 query
+            if repeated:
+                performance_logger.warning(
+                    f"Repeated queries detected: {request.method} {request.path} ran "
+                    f"{profiler.duplicate_count} duplicate queries out of {profiler.count}",
+                    extra=log_extra
+                )
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        get_metrics_registry().observe_request(
+            resolver_match.view_name if resolver_match else 'unresolved',
+            response.status_code,
+            processing_time,
+            db_queries=stats.get('db_queries', 0),
+            db_time=stats.get('db_time', 0.0),
+        )
+
+        for key, value in stats.items():
+            header = f'X-Performance-{key.replace("_", "-")}'
+            # Timings are floats in seconds; counts are reported as-is
+            response[header] = f"{value:.4f}s" if isinstance(value, float) else str(value)
+
+
+class RequestLogSink(ObservabilitySink):
+    """
+    Logs requests and responses, with tail-based sampling.
+
+    The request-start record (method, path, query, client IP, user, headers
+    excluding credentials, declared body size) is built at request time, with
+    the user filled in at view dispatch, but only emitted if
+    keep_request_log() keeps the request. Requests to
+    security-sensitive routes are always logged to the security logger.
+    """
+
+    EXCLUDED_HEADERS = ('authorization', 'cookie', 'proxy-authorization')
+
+    def __init__(self):
+        self.body_policy = BodyLoggingPolicy.from_settings()
+
+    def request_started(self, context):
+        request = context.request
+        request.id = context.id
+        log_data = {
+            'request_id': context.id,
+            'method': request.method,
+            'path': request.path,
+            'query_params': dict(request.GET),
+            'client_ip': context.client_ip,
+            'user': context.user_info(),
+        }
+
+        # Never read the body here: that would buffer it in memory and break
+        # streaming uploads. The declared size is enough for the start record;
+        # a truncated copy is logged at response time if the view read it.
+        if request.method not in ('GET', 'HEAD'):
+            log_data['body_size'] = declared_content_length(request)
+
+        # Log request headers (excluding sensitive ones)
+        headers = {}
+        for key, value in request.META.items():
+            if key.startswith('HTTP_'):
+                header_name = key[5:].lower().replace('_', '-')
+                if header_name not in self.EXCLUDED_HEADERS:
+                    headers[header_name] = value
+        log_data['headers'] = headers
+
+        request._log_data = log_data
+        if request_logger.isEnabledFor(logging.INFO):
+            request._log_start_record = request_logger.makeRecord(
+                request_logger.name, logging.INFO, __file__, 0,
+                f"Request {context.id}: {request.method} {request.path}", (), None,
+                extra={'data': log_data},
+            )
+
+    def view_started(self, context, view_func):
+        request = context.request
+        # Authenticated by now; the start record shares this dict
+        request._log_data['user'] = context.user_info()
+        if request.method not in ('GET', 'HEAD'):
+            request._log_body = self.body_policy.should_log(request, context.route_classes)
+
+        if 'security' in context.route_classes:
+            security_logger.info(f"Security-sensitive request {context.id}: {request.method} {request.path}",
+                                 extra={'data': request._log_data})
+
+    def request_finished(self, context, response):
+        request = context.request
+        if not keep_request_log(request, response.status_code, context.processing_time):
+            return
+
+        start_record = getattr(request, '_log_start_record', None)
+        if start_record is not None:
+            request_logger.handle(start_record)
+
+        performance_logger.info(
+            f"Request {context.id} completed in {context.processing_time:.4f}s",
+            extra={
+                'request_id': context.id,
+                'method': request.method,
+                'path': request.path,
+                'status_code': response.status_code,
+                'processing_time': context.processing_time,
+            }
+        )
+
+        log_data = {
+            'request_id': context.id,
+            'method': request.method,
+            'path': request.path,
+            'status_code': response.status_code,
+        }
+        if getattr(request, '_log_body', False):
+            log_data.update(self.body_policy.capture(request))
+
+        # Log error responses with more detail
+        if response.status_code >= 400:
+            log_level = logging.WARNING if response.status_code < 500 else logging.ERROR
+            request_logger.log(log_level, f"Error response {response.status_code} for request {context.id}",
+                               extra={'data': log_data})
+        else:
+            request_logger.info(f"Response {response.status_code} for request {context.id}",
+                                extra={'data': log_data})
+
+
+class AuditSink(ObservabilitySink):
+    """
+    - Logs user authentication events
+    - Logs sensitive data access
+    - Logs modification actions (POST, PUT, DELETE, PATCH)
+    """
+
+    def view_started(self, context, view_func):
+        request = context.request
+        classes = context.route_classes
+
+        if 'login' in classes and request.method == 'POST':
+            username = request.POST.get('username', 'unknown')
+            audit_logger.info(f"Login attempt for user '{username}'", extra={
+                'event_type': 'auth_attempt',
+                'username': username,
+                'client_ip': context.client_ip,
+                'request_id': context.id,
+            })
+            return
+
+        if not request.user.is_authenticated:
+            return
+
+        if 'audit_sensitive' in classes:
+            event_type, message = 'sensitive_access', f"Sensitive data access: {request.path}"
+        elif 'sensitive_operation' in classes or request.method in ('POST', 'PUT', 'DELETE', 'PATCH'):
+            event_type, message = 'data_modification', f"Data modification: {request.method} {request.path}"
+        else:
+            return
+
+        audit_logger.info(message, extra={
+            'event_type': event_type,
+            'user_id': request.user.id,
+            'username': request.user.username,
+            'path': request.path,
+            'method': request.method,
+            'client_ip': context.client_ip,
+            'request_id': context.id,
+        })
+
+
+class ExceptionSink(ObservabilitySink):
+    """
+    - Logs detailed information about uncaught exceptions
+    - Returns an error response based on request type (HTML or API)
+    - Leaves 404/403/400 exceptions to Django's own handlers
+    """
+
+    def exception_raised(self, context, exception):
+        if isinstance(exception, CLIENT_ERRORS):
+            return None
+
+        request = context.request
+        error_id = str(uuid.uuid4())
+        error_message = str(exception)
+        error_class = exception.__class__.__name__
+
+        user = getattr(request, 'user', None)
+        log_data = {
+            'error_id': error_id,
+            'error_class': error_class,
+            'error_message': error_message,
+            'request_id': context.id,
+            'method': request.method,
+            'path': request.path,
+            'user_id': user.id if user is not None and user.is_authenticated else None,
+            'traceback': traceback.format_exc(),
+        }
+        error_logger.error(
+            f"Uncaught exception ({error_class}): {error_message}",
+            extra={'data': log_data},
+            exc_info=True
+        )
+
+        if request.headers.get('Accept', '').lower() == 'application/json' or \
+           request.headers.get('Content-Type', '').lower() == 'application/json':
+            # API request - return JSON error response
+            return JsonResponse({
+                'error': True,
+                'error_id': error_id,
+                'message': 'An unexpected error occurred. Our team has been notified.',
+                'status_code': 500
+            }, status=500)
+
+        if settings.DEBUG:
+            # In debug mode, let Django's default error handler display the error
+            return None
+        html = render_to_string('tasks/error/500.html', {
+            'error_id': error_id,
+            'request_path': request.path,
+        })
+        return HttpResponseServerError(html)
@@ -0,0 +1,230 @@
+"""
+Keyset (cursor) pagination for the task and project lists.
+
+Offset pagination counts the whole filtered queryset on every page and
+skips ``OFFSET n`` rows, so deep pages get slower. KeysetPaginator instead
+seeks past the sort key of the last row shown: each page is one
+``WHERE (key) > (cursor) ORDER BY key LIMIT per_page + 1`` query, the same
+cost on page 500 as on page 1. The sort key must end in a unique column
+(normally ``id``) so the order is total.
+
+Cursors are signed, so they are opaque to clients and cannot be forged
+into arbitrary filters; an invalid or stale cursor serves the first page,
+as Paginator.get_page() does for a bad page number. The count is optional:
+pass a number, a callable, or nothing, and templates hide it when it is
+None. estimated_count() gives PostgreSQL's planner estimate for free.
+
+With ``settings.KEYSET_PAGINATION`` enabled, views using
+KeysetPaginationMixin paginate with ``?cursor=`` instead of ``?page=``.
+"""
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.lookups import IsNull
+
+CURSOR_SALT = 'tasks.pagination.cursor'
+
+
+def estimated_count(queryset):
+    """The planner's row estimate on PostgreSQL, None elsewhere."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.explain(format='json'))
+    return plan[0]['Plan']['Plan Rows']
+
+
+class SortKey:
+    """One column of a keyset ordering; NULLs always sort last."""
+
+    def __init__(self, spec, model):
+        self.descending = spec.startswith('-')
+        self.name = spec.lstrip('-')
+        try:
+            self.field = model._meta.get_field(self.name)
+        except FieldDoesNotExist:
+            # An annotation, e.g. a computed rank
+            self.field = None
+        self.nullable = self.field is not None and self.field.null
+
+    def order_by(self, forward):
+        """
+        ORDER BY expressions for this key. A nullable column is ordered by
+        ``col IS NULL`` first rather than with NULLS LAST, which SQLite cannot
+        index; an index on the same expressions serves it on every backend.
+        """
+        column = F(self.name).desc() if self.descending == forward else F(self.name).asc()
+        if not self.nullable:
+            return [column]
+        # False before True: NULLs last going forward, first going backward
+        is_null = IsNull(F(self.name), True)
+        return [is_null.asc() if forward else is_null.desc(), column]
+
+    def beyond(self, value, forward):
+        """Rows strictly after value (before it, going backward)."""
+        if value is None:
+            # NULLs are last: nothing follows them, every value precedes them
+            return Q(pk__in=[]) if forward else Q(**{f'{self.name}__isnull': False})
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q(**{f'{self.name}__{lookup}': value})
+        if forward and self.nullable:
+            condition |= Q(**{f'{self.name}__isnull': True})
+        return condition
+
+    def equal(self, value):
+        if value is None:
+            return Q(**{f'{self.name}__isnull': True})
+        return Q(**{self.name: value})
+
+    def dump(self, value):
+        # Dates and datetimes travel as ISO strings, parsed back by load()
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def load(self, value):
+        if value is None or self.field is None:
+            return value
+        return self.field.to_python(value)
+
+
+def order_by_keyset(queryset, ordering, *leading):
+    """Order a queryset by a keyset sort key, with NULLs last as KeysetPaginator expects."""
+    keys = [SortKey(spec, queryset.model) for spec in ordering]
+    return queryset.order_by(*leading, *(expression for key in keys for expression in key.order_by(True)))
+
+
+class KeysetPage(Sequence):
+    """One page of a KeysetPaginator, with cursors to its neighbours."""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginates a queryset by seeking on a sort key, e.g. ('-created_at', '-id')."""
+
+    def __init__(self, queryset, per_page, ordering, count=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = [SortKey(spec, queryset.model) for spec in ordering]
+        self._count = count
+
+    @property
+    def count(self):
+        """The total number of objects if known or estimable, otherwise None."""
+        if callable(self._count):
+            self._count = self._count()
+        return self._count
+
+    def _encode(self, obj, forward):
+        values = [key.dump(getattr(obj, key.name)) for key in self.keys]
+        return signing.dumps([values, forward], salt=CURSOR_SALT, compress=True)
+
+    def _decode(self, cursor):
+        values, forward = signing.loads(cursor, salt=CURSOR_SALT)
+        if len(values) != len(self.keys):
+            raise ValueError("Cursor does not match the ordering")
+        return [key.load(value) for key, value in zip(self.keys, values)], bool(forward)
+
+    def _seek(self, values, forward):
+        """(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ..., bounded by k1 >= v1"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for key, value in zip(self.keys, values):
+            condition |= equal & key.beyond(value, forward)
+            equal &= key.equal(value)
+        first, value = self.keys[0], values[0]
+        if not first.nullable:
+            # Redundant, but a plain range on the leading key lets the database
+            # seek into the index instead of filtering it from the start
+            lookup = 'lte' if first.descending == forward else 'gte'
+            condition &= Q(**{f'{first.name}__{lookup}': value})
+        return condition
+
+    def get_page(self, cursor=None):
+        values, forward = None, True
+        if cursor:
+            try:
+                values, forward = self._decode(cursor)
+            except (signing.BadSignature, ValueError, TypeError):
+                values, forward = None, True
+
+        queryset = self.queryset.order_by(*(
+            expression for key in self.keys for expression in key.order_by(forward)
+        ))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        # Moving forward we came from a page before this one, and vice versa
+        has_next = more if forward else True
+        has_previous = values is not None if forward else more
+        return KeysetPage(
+            rows, self,
+            next_cursor=self._encode(rows[-1], True) if rows and has_next else None,
+            previous_cursor=self._encode(rows[0], False) if rows and has_previous else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView pagination by cursor when settings.KEYSET_PAGINATION is on.
+
+    Views set ``keyset_ordering`` to the sort key of their queryset and may
+    override get_keyset_count().
+    """
+    keyset_ordering = None
+    cursor_kwarg = 'cursor'
+
+    def use_keyset_pagination(self):
+        return getattr(settings, 'KEYSET_PAGINATION', False) and self.keyset_ordering is not None
+
+    def get_keyset_count(self, queryset):
+        return lambda: estimated_count(queryset)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(
+            queryset, page_size, self.keyset_ordering, count=self.get_keyset_count(queryset)
+        )
+        page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = self.use_keyset_pagination()
+        # The current filters, for cursor links to carry along
+        params = self.request.GET.copy()
+        params.pop(self.cursor_kwarg, None)
+        params.pop('page', None)
+        context['pagination_query'] = params.urlencode()
+        return context
@@ -0,0 +1,130 @@
+"""
+Per-request SQL query profiling.
+
+ObservabilityMiddleware's PerformanceSink activates a QueryProfiler for the
+duration of each request. The profiler records the query count, total
+database time, the slowest statements and how often each statement
+fingerprint ran, so N+1 patterns show up as fingerprints executed many times
+within one request.
+
+Every connection carries one permanent execute wrapper that forwards to the
+profiler active in the current context. Connections are thread-local while
+the active profiler is a context variable, so queries the async ORM runs in
+sync_to_async threads are attributed to the request that awaited them.
+"""
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+# Collapse IN (%s, %s, ...) lists and whitespace so that the same statement
+# with a different number of parameters shares one fingerprint
+_IN_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize a parameterized SQL statement for duplicate detection."""
+    return _WHITESPACE_RE.sub(' ', _IN_LIST_RE.sub('(%s...)', sql)).strip()
+
+
+class QueryProfiler:
+    """execute_wrapper that accumulates query statistics; safe to share between threads."""
+
+    def __init__(self, keep_slowest=5):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+        self._slowest = []
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - start_time)
+
+    def record(self, sql, duration):
+        key = fingerprint(sql)
+        with self._lock:
+            self.count += 1
+            self.total_time += duration
+            self.fingerprints[key] += 1
+            entry = (duration, self.count, sql)
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """The slowest statements as (seconds, sql), slowest first."""
+        return [(duration, sql) for duration, _, sql in sorted(self._slowest, reverse=True)]
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first."""
+        return {sql: count for sql, count in self.fingerprints.most_common() if count > 1}
+
+    @property
+    def duplicate_count(self):
+        """Number of executions beyond the first for every repeated fingerprint."""
+        return sum(count - 1 for count in self.duplicates.values())
+
+    def as_stats(self):
+        """Summary for request.performance_stats."""
+        return {
+            'db_queries': self.count,
+            'db_time': self.total_time,
+            'db_duplicate_queries': self.duplicate_count,
+        }
+
+    def as_log_data(self, max_sql_length=300):
+        """Details for the slow-request and N+1 log records."""
+        return {
+            'slowest_queries': [
+                {'time': round(duration, 6), 'sql': sql[:max_sql_length]}
+                for duration, sql in self.slowest
+            ],
+            'duplicate_queries': [
+                {'count': count, 'sql': sql[:max_sql_length]}
+                for sql, count in list(self.duplicates.items())[:self.keep_slowest]
+            ],
+        }
+
+
+_active_profiler = ContextVar('query_profiler', default=None)
+
+
+def _profiling_wrapper(execute, sql, params, many, context):
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return execute(sql, params, many, context)
+    return profiler(execute, sql, params, many, context)
+
+
+def install_query_profiling(connection, **kwargs):
+    """Attach the forwarding wrapper to a connection; a connection_created receiver."""
+    if _profiling_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_profiling_wrapper)
+
+
+@contextmanager
+def profile_queries(keep_slowest=5):
+    """Profile every query run within the block, including in sync_to_async threads."""
+    profiler = QueryProfiler(keep_slowest)
+    # Connections opened before the receiver was connected, e.g. in tests
+    for connection in connections.all(initialized_only=True):
+        install_query_profiling(connection)
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
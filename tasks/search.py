@@ -0,0 +1,142 @@
+"""
+Full-text index for task search.
+
+filter_tasks() matches the search box against task titles, descriptions and
+project titles through a full-text index instead of three leading-wildcard
+LIKEs, which scan every visible task:
+
+- PostgreSQL: tasks_task_search holds one weighted tsvector per task (title
+  A, project title B, description C) under a GIN index, matched with
+  ``to_tsquery`` prefix terms and ranked with ``ts_rank``
+- SQLite: tasks_task_search is an FTS5 table keyed by task id with 2 and 3
+  character prefix indexes, matched with prefix queries and ranked with
+  ``bm25`` using the same relative weights
+
+Every word of the query must match the start of a word in the task, so
+"dep prod" finds "Deploy to production". Other database vendors keep the
+LIKE search. The signal handlers in tasks.signals keep the index in sync on
+task saves and deletes and project renames; code that bypasses signals
+(``QuerySet.update()`` of searched fields, raw SQL) must call
+``sync_task_search`` itself, or run the rebuild_search_index command.
+"""
+import re
+
+from django.db import connection, connections, transaction
+from django.db.models import FloatField, Q, Value
+
+from .models import Task
+
+SEARCH_TABLE = 'tasks_task_search'
+SEARCH_VENDORS = ('postgresql', 'sqlite')
+
+# Longer queries add little precision but cost a doclist per term
+MAX_TERMS = 8
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+# Title, project title and description, weighted A, B and C
+_TSVECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'C')"
+)
+
+# (join and match conditions, rank); the rank is higher for better matches
+# on both backends (bm25 is negative, best first)
+_SEARCH_SQL = {
+    'postgresql': (
+        [f"{SEARCH_TABLE}.task_id = tasks_task.id", f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s)"],
+        f"ts_rank({SEARCH_TABLE}.document, to_tsquery('simple', %s))",
+    ),
+    'sqlite': (
+        [f"{SEARCH_TABLE}.rowid = tasks_task.id", f"{SEARCH_TABLE} MATCH %s"],
+        f"-bm25({SEARCH_TABLE}, 10.0, 4.0, 1.0)",
+    ),
+}
+
+
+def search_terms(query):
+    """The lowercased words of a search query, at most MAX_TERMS of them."""
+    return _WORD_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def _match_expression(vendor, terms):
+    if vendor == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_tasks(queryset, query):
+    """
+    Narrow a Task queryset to the tasks matching query, annotated with
+    ``search_rank`` (higher is more relevant).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor not in SEARCH_VENDORS:
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(project__title__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    match = _match_expression(vendor, terms)
+    where, rank = _SEARCH_SQL[vendor]
+    # A join rather than a pk__in subquery, so each match is ranked in the
+    # same index scan that found it
+    return queryset.extra(
+        select={'search_rank': rank},
+        select_params=[match] if '%s' in rank else [],
+        tables=[SEARCH_TABLE],
+        where=where,
+        params=[match],
+    )
+
+
+def _delete_sql(vendor, count):
+    key = 'task_id' if vendor == 'postgresql' else 'rowid'
+    return f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({', '.join(['%s'] * count)})"
+
+
+def sync_task_search(task_ids):
+    """
+    Reindex the given task IDs from the current task and project data; IDs
+    of deleted tasks are dropped from the index. A fixed number of queries
+    regardless of how many tasks are passed in.
+    """
+    task_ids = list(task_ids)
+    vendor = connection.vendor
+    if not task_ids or vendor not in SEARCH_VENDORS:
+        return
+
+    rows = list(Task.objects.filter(id__in=task_ids).values_list(
+        'id', 'title', 'project__title', 'description'
+    ))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_delete_sql(vendor, len(task_ids)), task_ids)
+        if not rows:
+            return
+        if vendor == 'postgresql':
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (task_id, document) VALUES (%s, {_TSVECTOR_SQL})",
+                rows,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, project_title, description) VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+
+def rebuild_task_search(batch_size=1000):
+    """Rebuild the whole index in batches. Returns the number of tasks processed."""
+    if connection.vendor not in SEARCH_VENDORS:
+        return 0
+    task_ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        for start in range(0, len(task_ids), batch_size):
+            sync_task_search(task_ids[start:start + batch_size])
+    return len(task_ids)
@@ -0,0 +1,107 @@
+"""
+Route sensitivity registry used by the observability sinks.
+
+Each route carries a set of sensitivity classes that decide how its requests
+are logged:
+
+- security: always logged to the security logger, bodies never logged
+- audit_sensitive: access by authenticated users is audit-logged
+- sensitive_operation: audit-logged as a data modification, whatever the method
+- login: POSTs are audit-logged as authentication attempts
+
+Views declare their classes with the ``@sensitive(...)`` decorator. Views we
+don't own (Django auth, the admin site) are registered by URL name or
+namespace in ROUTE_SENSITIVITY, extendable through
+``settings.ROUTE_SENSITIVITY``. RouteClassifier walks the URL resolver once,
+when it is first used or the URLconf changes, and caches the classes of every
+route's view function, so classifying a request is a single dict lookup.
+"""
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+SENSITIVITY_CLASSES = frozenset(['security', 'audit_sensitive', 'sensitive_operation', 'login'])
+
+# URL names ('namespace:name') or whole namespaces/app names
+ROUTE_SENSITIVITY = {
+    'admin': ['security', 'audit_sensitive'],
+    'tasks:password_reset': ['security', 'audit_sensitive'],
+    'tasks:password_reset_confirm': ['security', 'audit_sensitive'],
+    'tasks:password_change': ['security', 'audit_sensitive'],
+}
+
+
+def _validate(classes):
+    unknown = set(classes) - SENSITIVITY_CLASSES
+    if unknown:
+        raise ValueError(f"Unknown sensitivity classes {sorted(unknown)}; expected some of {sorted(SENSITIVITY_CLASSES)}")
+    return frozenset(classes)
+
+
+def sensitive(*classes):
+    """
+    Declare the sensitivity classes of a view function or class-based view.
+
+    Classes accumulate through inheritance and repeated decoration.
+    """
+    declared = _validate(classes)
+
+    def decorator(view):
+        view.sensitivity = getattr(view, 'sensitivity', frozenset()) | declared
+        return view
+    return decorator
+
+
+def view_sensitivity(view_func):
+    """Classes declared on a view function or on the class behind as_view()."""
+    declared = getattr(view_func, 'sensitivity', frozenset())
+    view_class = getattr(view_func, 'view_class', None)
+    if view_class is not None:
+        declared = declared | getattr(view_class, 'sensitivity', frozenset())
+    return declared
+
+
+class RouteClassifier:
+    """Maps resolved view functions to their sensitivity classes."""
+
+    def __init__(self, registry=None):
+        registry = ROUTE_SENSITIVITY if registry is None else registry
+        registry = {**registry, **getattr(settings, 'ROUTE_SENSITIVITY', {})}
+        self.registry = {name: _validate(classes) for name, classes in registry.items()}
+        self._resolver = None
+        self._by_view = {}
+
+    def classify(self, view_func, urlconf=None):
+        resolver = get_resolver(urlconf)
+        if resolver is not self._resolver:
+            # get_resolver() is cached, so a new object means a new URLconf
+            self._by_view = self._build(resolver)
+            self._resolver = resolver
+        classes = self._by_view.get(view_func)
+        if classes is None:
+            # Not reachable through the resolver (e.g. called directly)
+            classes = self._by_view[view_func] = view_sensitivity(view_func)
+        return classes
+
+    def _build(self, resolver):
+        by_view = {}
+        for view_func, names in self._walk(resolver.url_patterns, (), ()):
+            classes = view_sensitivity(view_func)
+            for name in names:
+                classes = classes | self.registry.get(name, frozenset())
+            by_view[view_func] = by_view.get(view_func, frozenset()) | classes
+        return by_view
+
+    def _walk(self, patterns, namespace_path, scopes):
+        """Yield (callback, registry names that apply to it) for every route."""
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                path, scope = namespace_path, scopes
+                if pattern.namespace:
+                    path += (pattern.namespace,)
+                    scope += tuple({pattern.namespace, pattern.app_name or pattern.namespace})
+                yield from self._walk(pattern.url_patterns, path, scope)
+            elif isinstance(pattern, URLPattern):
+                names = list(scopes)
+                if pattern.name:
+                    names.append(':'.join(namespace_path + (pattern.name,)))
+                yield pattern.callback, names
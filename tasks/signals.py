@@ -0,0 +1,193 @@
+"""
+Signal handlers keeping denormalized data in sync with the models.
+"""
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Task, Project, Category, CategoryClosure
+from .visibility import sync_task_visibility, sync_project_visibility
+from .search import sync_task_search
+from .suggest import task_visible_user_ids, update_category_suggestions, update_task_suggestions
+from .category_tree import invalidate_category_hierarchy
+from .utils import invalidate_model_cache, register_view_cache_dependencies
+
+# Models and user relations each TaskManagerContextMixin cached method depends
+# on; changes invalidate only the affected users' entries (see
+# cached_view_data). Declared here rather than on the view methods so that
+# every process, not only those that import the views, invalidates them.
+register_view_cache_dependencies('get_user_projects', {'tasks.Project': ('owner_id', 'members')})
+register_view_cache_dependencies('get_task_stats', {'tasks.Task': ('assigned_to_id', 'created_by_id')})
+
+
+@receiver(post_save, sender=Task, dispatch_uid='task_visibility_on_task_save')
+def update_visibility_on_task_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_task_visibility([instance.pk])
+
+
+@receiver(post_save, sender=Project, dispatch_uid='task_visibility_on_project_save')
+def update_visibility_on_project_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if instance.owner_id != instance._initial_owner_id:
+        sync_project_visibility(instance.pk)
+
+
+@receiver(pre_delete, sender=Project, dispatch_uid='task_visibility_before_project_delete')
+def remember_tasks_before_project_delete(sender, instance, **kwargs):
+    # Tasks survive project deletion (SET_NULL) without emitting post_save
+    instance._visibility_task_ids = list(instance.tasks.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Project, dispatch_uid='task_visibility_after_project_delete')
+def update_visibility_after_project_delete(sender, instance, **kwargs):
+    sync_task_visibility(getattr(instance, '_visibility_task_ids', []))
+
+
+@receiver(m2m_changed, sender=Project.members.through, dispatch_uid='task_visibility_on_membership_change')
+def update_visibility_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # pk_set is not provided for clear(), so capture affected projects up front
+        if reverse:
+            instance._visibility_project_ids = list(instance.member_projects.values_list('id', flat=True))
+        else:
+            instance._visibility_project_ids = [instance.pk]
+        return
+
+    if action == 'post_clear':
+        project_ids = getattr(instance, '_visibility_project_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        project_ids = pk_set if reverse else [instance.pk]
+    else:
+        return
+
+    sync_task_visibility(Task.objects.filter(project_id__in=project_ids).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Task, dispatch_uid='task_search_on_task_save')
+@receiver(post_delete, sender=Task, dispatch_uid='task_search_on_task_delete')
+def update_search_index_for_task(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_task_search([instance.pk])
+
+
+@receiver(post_save, sender=Project, dispatch_uid='task_search_on_project_save')
+def update_search_index_on_project_rename(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if instance.title != instance._initial_title:
+        sync_task_search(instance.tasks.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Project, dispatch_uid='task_search_after_project_delete')
+def update_search_index_after_project_delete(sender, instance, **kwargs):
+    # The project's title leaves the documents of its surviving tasks
+    sync_task_search(getattr(instance, '_visibility_task_ids', []))
+
+
+# Task fields shown in or deciding who sees a typeahead suggestion
+SUGGESTION_FIELDS = ('title', 'created_by_id', 'assigned_to_id', 'project_id')
+
+
+@receiver(post_init, sender=Task, dispatch_uid='suggestions_snapshot_on_task_init')
+def remember_task_suggestion_fields(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields do not trigger queries
+    instance._suggestion_initial = {field: instance.__dict__.get(field) for field in SUGGESTION_FIELDS}
+
+
+@receiver(pre_save, sender=Task, dispatch_uid='suggestions_before_task_save')
+def remember_task_suggestion_users(sender, instance, raw=False, **kwargs):
+    initial = getattr(instance, '_suggestion_initial', {})
+    relations_changed = any(
+        getattr(instance, field) != initial.get(field) for field in SUGGESTION_FIELDS[1:]
+    )
+    # Users who may lose the task once visibility is resynced
+    if instance.pk and relations_changed and not raw:
+        instance._suggestion_user_ids = task_visible_user_ids(instance.pk)
+
+
+@receiver(post_save, sender=Task, dispatch_uid='suggestions_on_task_save')
+def update_suggestions_on_task_save(sender, instance, created, raw=False, **kwargs):
+    initial = getattr(instance, '_suggestion_initial', {})
+    changed = any(getattr(instance, field) != initial.get(field) for field in SUGGESTION_FIELDS)
+    if not raw and (created or changed):
+        # Runs after the visibility handler above, so this is the new audience
+        visible_user_ids = task_visible_user_ids(instance.pk)
+        previous_user_ids = getattr(instance, '_suggestion_user_ids', set())
+        update_task_suggestions(instance, visible_user_ids | previous_user_ids, visible_user_ids)
+    instance._suggestion_user_ids = set()
+    remember_task_suggestion_fields(sender, instance)
+
+
+@receiver(pre_delete, sender=Task, dispatch_uid='suggestions_before_task_delete')
+def remember_task_suggestion_users_before_delete(sender, instance, **kwargs):
+    instance._suggestion_user_ids = task_visible_user_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='suggestions_on_task_delete')
+def update_suggestions_on_task_delete(sender, instance, **kwargs):
+    update_task_suggestions(instance, getattr(instance, '_suggestion_user_ids', set()), set())
+
+
+@receiver(post_save, sender=Category, dispatch_uid='suggestions_on_category_save')
+def update_suggestions_on_category_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_category_suggestions(instance)
+
+
+@receiver(post_delete, sender=Category, dispatch_uid='suggestions_on_category_delete')
+def update_suggestions_on_category_delete(sender, instance, **kwargs):
+    update_category_suggestions(instance, deleted=True)
+
+
+@receiver(post_save, sender=Category, dispatch_uid='category_hierarchy_on_category_save')
+@receiver(post_delete, sender=Category, dispatch_uid='category_hierarchy_on_category_delete')
+@receiver(post_save, sender=Task, dispatch_uid='category_hierarchy_on_task_save')
+@receiver(post_delete, sender=Task, dispatch_uid='category_hierarchy_on_task_delete')
+def invalidate_category_hierarchy_cache(sender, **kwargs):
+    invalidate_category_hierarchy()
+
+
+def _invalidate_category_counts(*category_ids):
+    """Invalidate cached subtree counts of the given categories and all their ancestors."""
+    category_ids = [category_id for category_id in category_ids if category_id]
+    if not category_ids:
+        return
+    ancestor_ids = CategoryClosure.objects.filter(
+        descendant_id__in=category_ids
+    ).values_list('ancestor_id', flat=True)
+    for ancestor_id in set(ancestor_ids) | set(category_ids):
+        invalidate_model_cache(Category, ancestor_id)
+
+
+@receiver(post_init, sender=Task, dispatch_uid='cache_snapshot_on_task_init')
+def remember_task_relations(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields do not trigger queries
+    instance._cache_initial = {
+        field: instance.__dict__.get(field)
+        for field in ('project_id', 'category_id')
+    }
+
+
+@receiver(post_save, sender=Task, dispatch_uid='cache_invalidation_on_task_save')
+@receiver(post_delete, sender=Task, dispatch_uid='cache_invalidation_on_task_delete')
+def invalidate_caches_for_task(sender, instance, **kwargs):
+    initial = getattr(instance, '_cache_initial', {})
+
+    for project_id in {instance.project_id, initial.get('project_id')}:
+        if project_id:
+            invalidate_model_cache(Project, project_id)
+    _invalidate_category_counts(instance.category_id, initial.get('category_id'))
+
+    remember_task_relations(sender, instance)
+
+
+@receiver(post_save, sender=Category, dispatch_uid='cache_invalidation_on_category_save')
+def invalidate_category_caches(sender, instance, created, **kwargs):
+    if created:
+        return
+    # Runs before Category.save() re-links the closure, so the old parent's
+    # ancestors are still reachable; the new parent is outside the moved subtree.
+    _invalidate_category_counts(instance.pk, instance.parent_id, instance._initial_parent_id)
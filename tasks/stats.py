@@ -0,0 +1,96 @@
+"""
+Single-pass task statistics for the dashboard and task list counters.
+
+Every counter is computed with conditional aggregation (``Count`` with
+``filter=``) over the user's own tasks, i.e. tasks they created or are
+assigned to, so a full set of counters costs exactly one query.
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .choices import TaskStatus, TaskPriority
+from .models import Task
+
+ACTIVE_STATUSES = [TaskStatus.TODO, TaskStatus.IN_PROGRESS]
+HIGH_PRIORITIES = [TaskPriority.HIGH, TaskPriority.URGENT]
+UPCOMING_DAYS = 3
+
+
+@dataclass(frozen=True)
+class TaskStats:
+    """Counters over the tasks a user created or is assigned to."""
+    total: int = 0
+    assigned: int = 0
+    created: int = 0
+    due_today: int = 0
+    overdue: int = 0
+    upcoming: int = 0
+    high_priority: int = 0
+    status_counts: dict = field(default_factory=dict)
+    priority_counts: dict = field(default_factory=dict)
+
+    @property
+    def status_chart(self):
+        """Chart data for statuses that have at least one task."""
+        return _chart_data(TaskStatus.CHOICES, self.status_counts)
+
+    @property
+    def priority_chart(self):
+        """Chart data for active tasks by priority."""
+        return _chart_data(TaskPriority.CHOICES, self.priority_counts)
+
+
+def _chart_data(choices, counts):
+    items = [(label, counts[value]) for value, label in choices if counts.get(value)]
+    return {
+        'labels': [label for label, _ in items],
+        'data': [count for _, count in items],
+    }
+
+
+def get_task_stats(user_id):
+    """Compute all task counters for a user with one aggregate query."""
+    now = timezone.now()
+    today = now.date()
+    active = Q(status__in=ACTIVE_STATUSES)
+
+    aggregates = {
+        'total': Count('id'),
+        'assigned': Count('id', filter=Q(assigned_to_id=user_id)),
+        'created': Count('id', filter=Q(created_by_id=user_id)),
+        'due_today': Count('id', filter=active & Q(deadline__date=today)),
+        'overdue': Count('id', filter=active & Q(deadline__lt=now)),
+        'upcoming': Count('id', filter=active & Q(
+            deadline__date__range=[today, today + timedelta(days=UPCOMING_DAYS)]
+        )),
+        'high_priority': Count('id', filter=active & Q(priority__in=HIGH_PRIORITIES)),
+    }
+    for value, _ in TaskStatus.CHOICES:
+        aggregates[f'status_{value}'] = Count('id', filter=Q(status=value))
+    for value, _ in TaskPriority.CHOICES:
+        aggregates[f'priority_{value}'] = Count('id', filter=active & Q(priority=value))
+
+    result = Task.objects.filter(
+        Q(assigned_to_id=user_id) | Q(created_by_id=user_id)
+    ).aggregate(**aggregates)
+
+    return TaskStats(
+        total=result['total'],
+        assigned=result['assigned'],
+        created=result['created'],
+        due_today=result['due_today'],
+        overdue=result['overdue'],
+        upcoming=result['upcoming'],
+        high_priority=result['high_priority'],
+        status_counts={
+            value: result[f'status_{value}'] for value, _ in TaskStatus.CHOICES
+            if result[f'status_{value}']
+        },
+        priority_counts={
+            value: result[f'priority_{value}'] for value, _ in TaskPriority.CHOICES
+            if result[f'priority_{value}']
+        },
+    )
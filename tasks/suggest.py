@@ -0,0 +1,255 @@
+"""
+In-memory prefix indexes behind the search box's typeahead suggestions.
+
+The suggest endpoint answers keystrokes without touching the database:
+
+- each user has a PrefixIndex over the titles of the tasks visible to them
+  and of their projects; category names, which every user sees, share one
+  index
+- a PrefixIndex is a pair of sorted arrays, with a key for every word of
+  every label, so "prod" finds "Deploy to production"; a lookup is a
+  bisection plus a short scan
+- indexes are built lazily on a user's first lookup and kept in a
+  per-process LRU of SUGGEST_INDEX_MAX_USERS users
+- every index is stamped with a cache generation (see tasks.utils). A
+  lookup fetches the current generations in one cache round trip and
+  rebuilds any index whose generation moved, so changes made by other
+  processes are picked up
+- the signal handlers in tasks.signals apply task and category changes to
+  the indexes this process holds and move the generation along with them,
+  so the writing process never rebuilds. Project saves, deletes and
+  membership changes bump the owner's and members' generations through the
+  cached_view_data dependency registry, and their indexes are rebuilt on
+  the next lookup. Writes that bypass signals (``QuerySet.update()``, raw
+  SQL) are not seen until the user's generation moves for another reason.
+- indexes are shared by the threads of a process and changed in place, so
+  each one has a lock held by lookups and changes alike
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import Category, Project, Task, TaskVisibility
+from .utils import (
+    _view_version_name, bump_cache_generation, get_cache_generations,
+    register_view_cache_dependencies,
+)
+
+SUGGESTIONS = 'suggestions'
+CATEGORY_GENERATION = 'suggestions:categories'
+
+# Project changes that alter which tasks and projects a user's index holds
+register_view_cache_dependencies(SUGGESTIONS, {'tasks.Project': ('owner_id', 'members')})
+
+# Suggestion kinds, in the order they are listed for equally good matches
+KINDS = ('task', 'project', 'category')
+
+# Bounds the work per keystroke for very short, very common prefixes
+MAX_SCAN = 500
+
+Entry = namedtuple('Entry', ['kind', 'id', 'label'])
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def _keys(label):
+    """One key per word of the label: the label from that word on."""
+    label = normalize(label)
+    return [label[match.start():] for match in _WORD_RE.finditer(label)]
+
+
+class PrefixIndex:
+    """Entries looked up by the prefix of any word of their label."""
+
+    def __init__(self, entries=()):
+        self._lock = threading.Lock()
+        self._entries = {}
+        pairs = []
+        for entry in entries:
+            self._entries[entry.kind, entry.id] = entry
+            pairs.extend((key, entry.kind, entry.id) for key in _keys(entry.label))
+        pairs.sort()
+        self._keys = [key for key, _, _ in pairs]
+        self._refs = [(kind, entry_id) for _, kind, entry_id in pairs]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        with self._lock:
+            self._remove(entry.kind, entry.id)
+            self._entries[entry.kind, entry.id] = entry
+            for key in _keys(entry.label):
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._refs.insert(position, (entry.kind, entry.id))
+
+    def remove(self, kind, entry_id):
+        with self._lock:
+            self._remove(kind, entry_id)
+
+    def _remove(self, kind, entry_id):
+        entry = self._entries.pop((kind, entry_id), None)
+        if entry is None:
+            return
+        for key in _keys(entry.label):
+            position = bisect_left(self._keys, key)
+            while self._refs[position] != (kind, entry_id):
+                position += 1
+            del self._keys[position]
+            del self._refs[position]
+
+    def search(self, prefix, limit):
+        """Up to limit entries, those whose label starts with prefix first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        with self._lock:
+            position = bisect_left(self._keys, prefix)
+            end = min(len(self._keys), position + MAX_SCAN)
+            while position < end and self._keys[position].startswith(prefix):
+                ref = self._refs[position]
+                found.setdefault(ref, self._entries[ref])
+                position += 1
+        return sorted(found.values(), key=lambda entry: _rank(entry, prefix))[:limit]
+
+
+def _rank(entry, prefix):
+    label = normalize(entry.label)
+    return (not label.startswith(prefix), KINDS.index(entry.kind), len(label), label)
+
+
+class IndexStore:
+    """Per-process LRU of generation-stamped indexes."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, generation, build):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == generation:
+                self._items.move_to_end(key)
+                return item[1]
+        # Built outside the lock: it queries the database
+        index = build()
+        with self._lock:
+            self._items[key] = (generation, index)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return index
+
+    def update(self, key, previous_generation, generation, change):
+        """
+        Apply change to the index if it is exactly one generation behind;
+        otherwise another process changed it too and it is dropped.
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return
+            if item[0] != previous_generation:
+                del self._items[key]
+                return
+            change(item[1])
+            self._items[key] = (generation, item[1])
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_index_store():
+    global _store
+    # One slot more for the shared category index, which every lookup touches
+    max_size = getattr(settings, 'SUGGEST_INDEX_MAX_USERS', 500) + 1
+    with _store_lock:
+        if _store is None or _store.max_size != max_size:
+            _store = IndexStore(max_size)
+        return _store
+
+
+def _user_generation(user_id):
+    return _view_version_name(SUGGESTIONS, user_id)
+
+
+def build_user_index(user_id):
+    tasks = Task.objects.filter(visibility__user_id=user_id).values_list('id', 'title')
+    projects = Project.objects.filter(
+        Q(owner_id=user_id) | Q(members=user_id)
+    ).distinct().values_list('id', 'title')
+    return PrefixIndex(
+        [Entry('task', pk, title) for pk, title in tasks]
+        + [Entry('project', pk, title) for pk, title in projects]
+    )
+
+
+def build_category_index():
+    return PrefixIndex(Entry('category', pk, name) for pk, name in Category.objects.values_list('id', 'name'))
+
+
+def get_suggestions(user, query, limit=None):
+    """The best matches for a typed prefix among the user's tasks, projects and categories."""
+    limit = limit or getattr(settings, 'SUGGEST_LIMIT', 8)
+    user_generation, category_generation = get_cache_generations(
+        _user_generation(user.id), CATEGORY_GENERATION
+    )
+    store = get_index_store()
+    user_index = store.get(('user', user.id), user_generation, lambda: build_user_index(user.id))
+    category_index = store.get('categories', category_generation, build_category_index)
+
+    matches = user_index.search(query, limit) + category_index.search(query, limit)
+    prefix = normalize(query)
+    return sorted(matches, key=lambda entry: _rank(entry, prefix))[:limit]
+
+
+def suggestion_url(entry):
+    if entry.kind == 'task':
+        return reverse('tasks:task_detail', args=[entry.id])
+    if entry.kind == 'project':
+        return reverse('tasks:project_detail', args=[entry.id])
+    return f"{reverse('tasks:task_list')}?category={entry.id}"
+
+
+def _bump(name, key, change):
+    generation = bump_cache_generation(name)
+    get_index_store().update(key, generation - 1, generation, change)
+
+
+def task_visible_user_ids(task_id):
+    return set(TaskVisibility.objects.filter(task_id=task_id).values_list('user_id', flat=True))
+
+
+def update_task_suggestions(task, user_ids, visible_user_ids):
+    """Re-file a task in the indexes of user_ids; it stays only where visible."""
+    entry = Entry('task', task.pk, task.title)
+    for user_id in user_ids:
+        if user_id in visible_user_ids:
+            _bump(_user_generation(user_id), ('user', user_id), lambda index: index.add(entry))
+        else:
+            _bump(_user_generation(user_id), ('user', user_id), lambda index: index.remove('task', task.pk))
+
+
+def update_category_suggestions(category, deleted=False):
+    if deleted:
+        _bump(CATEGORY_GENERATION, 'categories', lambda index: index.remove('category', category.pk))
+    else:
+        entry = Entry('category', category.pk, category.name)
+        _bump(CATEGORY_GENERATION, 'categories', lambda index: index.add(entry))
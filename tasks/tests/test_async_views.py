@@ -0,0 +1,104 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.test import TestCase, AsyncRequestFactory, override_settings
+
+from tasks.async_views import AsyncDashboardPanelView, AsyncDashboardView, AsyncTaskDetailView, AsyncTaskListView
+from tasks.middleware import RequestMemoMiddleware
+from tasks.models import Project, Task, TaskComment
+from tasks.utils import _request_memo
+
+User = get_user_model()
+
+
+class AsyncViewTests(TestCase):
+    """Tests for the native async read views."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.owner = User.objects.create_user(username='asyncowner', password='password123')
+        self.outsider = User.objects.create_user(username='asyncoutsider', password='password123')
+        self.project = Project.objects.create(title="Async Project", owner=self.owner)
+        self.task = Task.objects.create(title="Async Task", project=self.project, created_by=self.owner)
+        TaskComment.objects.create(task=self.task, user=self.owner, text="First comment")
+
+    def make_request(self, user, path='/', data=None):
+        request = self.factory.get(path, data)
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        return request
+
+    async def render(self, response):
+        return await sync_to_async(response.render)()
+
+    async def test_task_detail(self):
+        view = AsyncTaskDetailView.as_view()
+        response = await view(self.make_request(self.owner), pk=self.task.pk)
+        self.assertEqual(response.context_data['task'], self.task)
+        self.assertEqual([c.text for c in response.context_data['comments']], ["First comment"])
+        await self.render(response)
+        self.assertContains(response, "Async Task")
+
+    async def test_task_detail_permission_denied(self):
+        view = AsyncTaskDetailView.as_view()
+        with self.assertRaises(PermissionDenied):
+            await view(self.make_request(self.outsider), pk=self.task.pk)
+
+    async def test_anonymous_user_redirected_to_login(self):
+        response = await AsyncDashboardView.as_view()(self.make_request(AnonymousUser(), '/dashboard/'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('next=/dashboard/', response.url)
+
+    async def test_task_list_paginates(self):
+        for index in range(20):
+            await Task.objects.acreate(title=f"Task {index}", project=self.project, created_by=self.owner)
+        response = await AsyncTaskListView.as_view()(self.make_request(self.owner, '/tasks/', {'page': 2}))
+        context = response.context_data
+        self.assertEqual(context['paginator'].count, 21)
+        self.assertEqual(len(context['tasks']), 6)
+        self.assertTrue(context['is_paginated'])
+        await self.render(response)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(KEYSET_PAGINATION=True)
+    async def test_task_list_cursor_pagination(self):
+        for index in range(20):
+            await Task.objects.acreate(title=f"Task {index}", project=self.project, created_by=self.owner)
+        view = AsyncTaskListView.as_view()
+        response = await view(self.make_request(self.owner, '/tasks/'))
+        cursor = response.context_data['page_obj'].next_cursor
+        response = await view(self.make_request(self.owner, '/tasks/', {'cursor': cursor}))
+        self.assertEqual(len(response.context_data['tasks']), 6)
+        self.assertIsNone(response.context_data['paginator'].count)
+        await self.render(response)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_dashboard(self):
+        response = await AsyncDashboardView.as_view()(self.make_request(self.owner, '/dashboard/'))
+        await self.render(response)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_dashboard_panel(self):
+        view = AsyncDashboardPanelView.as_view()
+        response = await view(self.make_request(self.owner), panel='activity')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async Task")
+        self.assertTrue(response.has_header('ETag'))
+
+    async def test_request_memo_middleware_async(self):
+        async def view(request):
+            self.assertIs(_request_memo.get(), request.memo)
+            request.memo['key'] = 'value'
+            return HttpResponse()
+
+        request = self.make_request(self.owner)
+        await RequestMemoMiddleware(view)(request)
+        self.assertEqual(request.memo, {})
+        self.assertIsNone(_request_memo.get())
@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from tasks.models import Project, Task
+from tasks.choices import TaskStatus
+from tasks.boards import ProjectBoard
+
+User = get_user_model()
+
+
+class ProjectBoardTests(TestCase):
+    """Tests for the project task board."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='boardowner', password='password123')
+        self.project = Project.objects.create(title="Board Project", owner=self.owner)
+        self.members = [
+            User.objects.create_user(username=f'member{i}', password='password123') for i in range(5)
+        ]
+        self.project.members.add(*self.members)
+        for i, member in enumerate(self.members):
+            Task.objects.create(title=f"Todo {i}", project=self.project, created_by=self.owner,
+                                assigned_to=member)
+            Task.objects.create(title=f"Done {i}", project=self.project, created_by=self.owner,
+                                assigned_to=member, status=TaskStatus.COMPLETED)
+        Task.objects.create(title="Review", project=self.project, created_by=self.owner,
+                            status=TaskStatus.REVIEW)
+
+    def test_query_count_independent_of_member_count(self):
+        with self.assertNumQueries(2):
+            board = ProjectBoard.for_project(self.project)
+
+        self.assertEqual(board.column(TaskStatus.TODO).count, 5)
+        self.assertEqual(board.column(TaskStatus.REVIEW).count, 1)
+        self.assertEqual(board.column(TaskStatus.COMPLETED).count, 5)
+        self.assertFalse(board.column(TaskStatus.IN_PROGRESS))
+        self.assertEqual(
+            {(stat.user.username, stat.task_count, stat.completed) for stat in board.member_stats},
+            {(member.username, 2, 1) for member in self.members},
+        )
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('tasks:project_board', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([column['count'] for column in data['columns']], [5, 0, 1, 5])
+        self.assertEqual(len(data['members']), 5)
+
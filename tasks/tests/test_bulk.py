@@ -0,0 +1,113 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import resolve, reverse
+
+from tasks.bulk import MAX_BULK_STATUS_UPDATES
+from tasks.choices import TaskStatus
+from tasks.models import Project, Task
+from tasks.sensitivity import RouteClassifier
+from tasks.views import TaskManagerContextMixin
+
+User = get_user_model()
+
+
+class TaskBulkStatusUpdateTests(TestCase):
+    """Tests for the bulk task status endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='bulkuser', password='password123')
+        self.other = User.objects.create_user(username='bulkother', password='password123')
+        self.project = Project.objects.create(title="Bulk Project", owner=self.user)
+        self.tasks = [
+            Task.objects.create(title=f"Task {index}", project=self.project, created_by=self.user)
+            for index in range(3)
+        ]
+        self.private = Task.objects.create(
+            title="Private", project=Project.objects.create(title="Other", owner=self.other),
+            created_by=self.other,
+        )
+        self.client.force_login(self.user)
+
+    def post(self, changes):
+        return self.client.post(
+            reverse('tasks:task_bulk_update_status'), json.dumps(changes),
+            content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+    def test_updates_batch_in_constant_queries(self):
+        changes = [{'task_id': task.pk, 'status': TaskStatus.IN_PROGRESS} for task in self.tasks]
+        # Session, user, tasks, savepoint, update, savepoint release
+        with self.assertNumQueries(6):
+            response = self.post(changes)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['status'] for result in response.json()['results']], ['success'] * 3
+        )
+        self.assertEqual(
+            set(Task.objects.filter(project=self.project).values_list('status', flat=True)),
+            {TaskStatus.IN_PROGRESS},
+        )
+
+    def test_completed_at(self):
+        task = self.tasks[0]
+        self.post([{'task_id': task.pk, 'status': TaskStatus.COMPLETED}])
+        task.refresh_from_db()
+        self.assertIsNotNone(task.completed_at)
+
+        self.post([{'task_id': task.pk, 'status': TaskStatus.REVIEW}])
+        task.refresh_from_db()
+        self.assertIsNone(task.completed_at)
+
+    def test_per_item_results(self):
+        response = self.post([
+            {'task_id': self.tasks[0].pk, 'status': TaskStatus.REVIEW},
+            {'task_id': self.private.pk, 'status': TaskStatus.REVIEW},
+            {'task_id': 999999, 'status': TaskStatus.REVIEW},
+            {'task_id': self.tasks[1].pk, 'status': 'bogus'},
+            {'status': TaskStatus.REVIEW},
+        ])
+        results = response.json()['results']
+        self.assertEqual(results[0]['status'], 'success')
+        self.assertEqual(results[0]['status_display'], 'Review')
+        self.assertEqual(
+            [result['message'] for result in results[1:]],
+            ['You do not have permission to update this task.', 'Task not found',
+             'Invalid status', 'Invalid task_id'],
+        )
+        self.private.refresh_from_db()
+        self.assertEqual(self.private.status, TaskStatus.TODO)
+
+    def test_invalidates_task_stats(self):
+        mixin = TaskManagerContextMixin()
+        mixin.request = RequestFactory().get('/')
+        mixin.request.user = self.user
+        self.assertEqual(mixin.get_task_stats(self.user.id).status_counts.get(TaskStatus.COMPLETED, 0), 0)
+        self.post([{'task_id': self.tasks[0].pk, 'status': TaskStatus.COMPLETED}])
+        self.assertEqual(mixin.get_task_stats(self.user.id).status_counts[TaskStatus.COMPLETED], 1)
+
+    def test_rejects_malformed_requests(self):
+        self.assertEqual(self.post({'task_id': self.tasks[0].pk}).status_code, 400)
+        too_many = [{'task_id': self.tasks[0].pk, 'status': TaskStatus.TODO}] * (MAX_BULK_STATUS_UPDATES + 1)
+        self.assertEqual(self.post(too_many).status_code, 400)
+        response = self.client.post(reverse('tasks:task_bulk_update_status'), '[]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(
+            reverse('tasks:task_bulk_update_status'),
+            json.dumps([{'task_id': self.tasks[0].pk, 'status': TaskStatus.COMPLETED}]),
+            content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].status, TaskStatus.TODO)
+
+    def test_is_a_sensitive_operation(self):
+        view = resolve(reverse('tasks:task_bulk_update_status')).func
+        self.assertEqual(RouteClassifier().classify(view), {'sensitive_operation'})
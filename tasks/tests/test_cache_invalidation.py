@@ -0,0 +1,172 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
+
+from tasks.models import Project, Task, Category
+from tasks.views import TaskManagerContextMixin
+from tasks.utils import cached_view_data, invalidate_model_cache, invalidate_user_cache
+
+User = get_user_model()
+
+
+class ContextView(TaskManagerContextMixin):
+    def __init__(self, user):
+        self.request = RequestFactory().get('/')
+        self.request.user = user
+
+
+class VersionedCacheTests(TestCase):
+    """Tests for version-key cache invalidation on the default LocMemCache backend."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cacheuser', password='password123')
+        self.member = User.objects.create_user(username='cachemember', password='password123')
+        self.project = Project.objects.create(title="Cached Project", owner=self.user)
+
+    def create_task(self, **kwargs):
+        kwargs.setdefault('project', self.project)
+        kwargs.setdefault('created_by', self.user)
+        return Task.objects.create(title="Task", **kwargs)
+
+    def test_cached_property_invalidated_by_task_changes(self):
+        self.assertEqual(Project.objects.get(pk=self.project.pk).task_count, 0)
+        task = self.create_task()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).task_count, 1)
+
+        other = Project.objects.create(title="Other", owner=self.user)
+        self.assertEqual(Project.objects.get(pk=other.pk).task_count, 0)
+        task.project = other
+        task.save()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).task_count, 0)
+        self.assertEqual(Project.objects.get(pk=other.pk).task_count, 1)
+
+        task.delete()
+        self.assertEqual(Project.objects.get(pk=other.pk).task_count, 0)
+
+    def test_cached_property_hit_and_manual_invalidation(self):
+        project = Project.objects.get(pk=self.project.pk)
+        project.task_count
+        with self.assertNumQueries(0):
+            project.task_count
+        invalidate_model_cache(Project, project.pk)
+        with self.assertNumQueries(1):
+            project.task_count
+
+    def test_category_subtree_counts(self):
+        root = Category.objects.create(name="Root")
+        child = Category.objects.create(name="Child", parent=root)
+        self.assertEqual(Category.objects.get(pk=root.pk).all_tasks_count, 0)
+        self.create_task(category=child)
+        self.assertEqual(Category.objects.get(pk=root.pk).all_tasks_count, 1)
+
+        child.parent = None
+        child.save()
+        self.assertEqual(Category.objects.get(pk=root.pk).all_tasks_count, 0)
+
+    def test_view_data_invalidated_per_user(self):
+        view = ContextView(self.user)
+        self.assertEqual(view.get_task_stats(self.user.id).total, 0)
+        self.create_task()
+        self.assertEqual(view.get_task_stats(self.user.id).total, 1)
+
+        with self.assertNumQueries(0):
+            view.get_task_stats(self.user.id)
+
+    def test_view_data_invalidated_by_membership(self):
+        view = ContextView(self.member)
+        self.assertEqual(view.get_user_projects(self.member.id), [])
+        self.project.members.add(self.member)
+        self.assertEqual(view.get_user_projects(self.member.id), [self.project])
+
+    def test_manual_user_invalidation(self):
+        calls = []
+
+        class Counter:
+            request = ContextView(self.user).request
+
+            @cached_view_data(timeout=60)
+            def compute(self, user_id):
+                calls.append(user_id)
+                return len(calls)
+
+        counter = Counter()
+        self.assertEqual(counter.compute(self.user.id), 1)
+        self.assertEqual(counter.compute(self.user.id), 1)
+        invalidate_user_cache(self.user.id)
+        self.assertEqual(counter.compute(self.user.id), 2)
+
+
+class ViewCacheDependencyTests(TestCase):
+    """Tests for the cached_view_data dependency registry."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='depowner', password='password123')
+        self.assignee = User.objects.create_user(username='depassignee', password='password123')
+        self.bystander = User.objects.create_user(username='depbystander', password='password123')
+        self.project = Project.objects.create(title="Dependency Project", owner=self.owner)
+
+    def test_task_change_invalidates_only_related_users(self):
+        views = {user: ContextView(user) for user in (self.owner, self.assignee, self.bystander)}
+        for user, view in views.items():
+            view.get_task_stats(user.id)
+            view.get_user_projects(user.id)
+
+        task = Task.objects.create(
+            title="Task", project=self.project, created_by=self.owner, assigned_to=self.assignee
+        )
+        self.assertEqual(views[self.assignee].get_task_stats(self.assignee.id).assigned, 1)
+        with self.assertNumQueries(0):
+            # Unrelated user and unrelated method stay cached
+            views[self.bystander].get_task_stats(self.bystander.id)
+            views[self.assignee].get_user_projects(self.assignee.id)
+
+        # Reassigning refreshes both the old and the new assignee
+        task.assigned_to = self.bystander
+        task.save()
+        self.assertEqual(views[self.assignee].get_task_stats(self.assignee.id).assigned, 0)
+        self.assertEqual(views[self.bystander].get_task_stats(self.bystander.id).assigned, 1)
+
+    def test_status_change_refreshes_counters(self):
+        view = ContextView(self.owner)
+        task = Task.objects.create(title="Task", project=self.project, created_by=self.owner)
+        self.assertEqual(view.get_status_counts(self.owner.id), {'todo': 1})
+        task.status = 'completed'
+        task.save()
+        self.assertEqual(view.get_status_counts(self.owner.id), {'completed': 1})
+
+    def test_membership_clear_and_project_delete(self):
+        view = ContextView(self.assignee)
+        self.project.members.add(self.assignee)
+        self.assertEqual(view.get_user_projects(self.assignee.id), [self.project])
+        self.project.members.clear()
+        self.assertEqual(view.get_user_projects(self.assignee.id), [])
+
+        self.assignee.member_projects.add(self.project)
+        self.assertEqual(view.get_user_projects(self.assignee.id), [self.project])
+        self.project.delete()
+        self.assertEqual(view.get_user_projects(self.assignee.id), [])
+
+    def test_registered_without_importing_views(self):
+        # A fresh process that only sets Django up, like a management command
+        # or a worker, must still invalidate view data on task changes
+        script = (
+            "import sys, django; django.setup(); "
+            "from tasks.utils import _view_cache_dependencies; "
+            "print(sorted({name for deps in _view_cache_dependencies.values() for name, _ in deps})); "
+            "print('tasks.views' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'task_manager.settings'},
+        )
+        registered, views_imported = result.stdout.splitlines()[-2:]
+        self.assertIn("'get_task_stats'", registered)
+        self.assertIn("'get_user_projects'", registered)
+        self.assertEqual(views_imported, 'False')
@@ -0,0 +1,123 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks import utils
+from tasks.utils import (
+    CacheEnvelope, get_or_compute, get_cache_stats, reset_cache_stats, get_cache_efficiency_report,
+)
+
+User = get_user_model()
+
+
+class StampedeProtectionTests(TestCase):
+    """Tests for single-flight recomputation in get_or_compute."""
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.calls = []
+
+    def compute(self):
+        self.calls.append(1)
+        return len(self.calls)
+
+    def envelope(self, value, fresh_until=None):
+        now = time.time()
+        return CacheEnvelope(value, now, 0.5, fresh_until if fresh_until is not None else now + 60)
+
+    def test_miss_then_hit(self):
+        self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 1)
+        self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 1)
+        stats = get_cache_stats()['m']
+        self.assertEqual(
+            (stats['hits'], stats['misses'], stats['stale'], stats['recomputes']), (1, 1, 0, 1)
+        )
+
+    def test_expired_entry_recomputed_by_lock_holder(self):
+        cache.set('key', self.envelope('old', fresh_until=time.time() - 1), 60)
+        self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 1)
+        self.assertIsNone(cache.get('lock:key'))
+        self.assertEqual(get_cache_stats()['m']['recomputes'], 1)
+
+    def test_expired_entry_served_stale_while_locked(self):
+        cache.set('key', self.envelope('old', fresh_until=time.time() - 1), 60)
+        cache.add('lock:key', 1, 30)
+        self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 'old')
+        self.assertEqual(self.calls, [])
+        self.assertEqual(get_cache_stats()['m']['stale'], 1)
+
+    def test_cold_miss_waits_for_lock_holder(self):
+        cache.add('lock:key', 1, 30)
+
+        def fill(seconds):
+            cache.set('key', self.envelope('filled'), 60)
+
+        with mock.patch.object(utils.time, 'sleep', side_effect=fill):
+            self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 'filled')
+        self.assertEqual(self.calls, [])
+        stats = get_cache_stats()['m']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 0))
+
+    def test_cold_miss_computes_after_wait_times_out(self):
+        cache.add('lock:key', 1, 30)
+        with mock.patch.object(utils, 'LOCK_WAIT', 0):
+            self.assertEqual(get_or_compute('key', self.compute, 60, name='m'), 1)
+
+    def test_lock_taken_over_after_timeout_is_not_released(self):
+        def slow_compute():
+            # The lock expired mid-computation and another worker took it
+            cache.set('lock:key', 'other-worker', 30)
+            return 'value'
+
+        self.assertEqual(get_or_compute('key', slow_compute, 60, name='m'), 'value')
+        self.assertEqual(cache.get('lock:key'), 'other-worker')
+
+    def test_none_and_empty_results_are_cached(self):
+        for key, result in (('none', None), ('empty', []), ('zero', 0)):
+            calls = []
+
+            def compute():
+                calls.append(1)
+                return result
+
+            self.assertEqual(get_or_compute(key, compute, 60, name=key), result)
+            self.assertEqual(get_or_compute(key, compute, 60, name=key), result)
+            self.assertEqual(len(calls), 1, key)
+
+    def test_envelope_records_metadata(self):
+        get_or_compute('key', lambda: 'value', 60)
+        envelope = cache.get('key')
+        self.assertIsInstance(envelope, CacheEnvelope)
+        self.assertEqual(envelope.value, 'value')
+        self.assertTrue(envelope.is_fresh)
+        self.assertGreaterEqual(envelope.duration, 0)
+
+    def test_legacy_entries_treated_as_absent(self):
+        cache.set('key', (time.time() + 60, 'old'), 60)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 1)
+
+    def test_efficiency_report_ranking(self):
+        cache.set('cold', self.envelope('x', fresh_until=time.time() - 1), 60)
+        cache.set('warm', self.envelope('y'), 60)
+        get_or_compute('cold', self.compute, 60, name='cold')
+        for _ in range(3):
+            get_or_compute('warm', self.compute, 60, name='warm')
+
+        report = get_cache_efficiency_report()
+        self.assertEqual([row['name'] for row in report], ['warm', 'cold'])
+        self.assertEqual(report[0]['hit_rate'], 1.0)
+        self.assertAlmostEqual(report[0]['time_saved'], 1.5)
+        self.assertEqual((report[1]['misses'], report[1]['hit_rate']), (1, 0.0))
+
+    def test_admin_report_page(self):
+        staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        get_or_compute('key', self.compute, 60, name='Project.task_count')
+        self.client.force_login(staff)
+        response = self.client.get(reverse('admin:cache_report'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Project.task_count')
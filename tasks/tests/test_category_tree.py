@@ -0,0 +1,127 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from tasks.models import Category, CategoryClosure, Project, Task
+from tasks.category_tree import rebuild_category_closure, build_category_hierarchy, get_category_hierarchy
+
+User = get_user_model()
+
+
+class CategoryClosureTests(TestCase):
+    """Tests for the category closure table."""
+
+    def setUp(self):
+        self.root = Category.objects.create(name="Root")
+        self.child = Category.objects.create(name="Child", parent=self.root)
+        self.grandchild = Category.objects.create(name="Grandchild", parent=self.child)
+        self.other = Category.objects.create(name="Other")
+
+    def closure(self):
+        return set(CategoryClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def test_insert_maintains_closure(self):
+        self.assertEqual(self.closure(), {
+            (self.root.id, self.root.id, 0),
+            (self.child.id, self.child.id, 0),
+            (self.grandchild.id, self.grandchild.id, 0),
+            (self.other.id, self.other.id, 0),
+            (self.root.id, self.child.id, 1),
+            (self.child.id, self.grandchild.id, 1),
+            (self.root.id, self.grandchild.id, 2),
+        })
+
+    def test_subtree_and_ancestors_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.root.get_all_children(), [self.child, self.grandchild])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.grandchild.get_ancestors(), [self.root, self.child])
+        self.assertTrue(self.grandchild.is_descendant_of(self.root))
+        self.assertFalse(self.root.is_descendant_of(self.grandchild))
+
+    def test_move_subtree(self):
+        self.child.parent = self.other
+        self.child.save()
+        self.assertEqual(self.other.get_all_children(), [self.child, self.grandchild])
+        self.assertEqual(self.root.get_all_children(), [])
+        self.assertEqual(self.grandchild.get_ancestors(), [self.other, self.child])
+
+        self.child.parent = None
+        self.child.save()
+        self.assertEqual(self.grandchild.get_ancestors(), [self.child])
+
+    def test_cycle_prevention(self):
+        self.root.parent = self.grandchild
+        with self.assertNumQueries(1), self.assertRaises(ValidationError):
+            self.root.clean()
+
+        self.root.parent = self.root
+        with self.assertRaises(ValidationError):
+            self.root.save()
+
+    def test_delete_cascades(self):
+        self.child.delete()
+        self.assertFalse(CategoryClosure.objects.filter(descendant_id=self.grandchild.id).exists())
+        self.assertEqual(self.root.get_all_children(), [])
+
+    def test_rebuild(self):
+        expected = self.closure()
+        CategoryClosure.objects.all().delete()
+        self.assertEqual(rebuild_category_closure(), len(expected))
+        self.assertEqual(self.closure(), expected)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_category_tree', nodes=[50], repeat=1, stdout=out)
+        self.assertIn('50 categories', out.getvalue())
+        # Benchmark data is rolled back
+        self.assertEqual(Category.objects.count(), 4)
+
+
+class CategoryHierarchyTests(TestCase):
+    """Tests for the cached category hierarchy used by the category list."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='hierarchy', password='password123')
+        self.project = Project.objects.create(title="Hierarchy Project", owner=self.user)
+        self.root = Category.objects.create(name="Root")
+        self.child = Category.objects.create(name="Child", parent=self.root)
+        self.grandchild = Category.objects.create(name="Grandchild", parent=self.child)
+        for category in (self.root, self.grandchild, self.grandchild):
+            Task.objects.create(title="Task", project=self.project, created_by=self.user, category=category)
+
+    def test_build_from_two_queries(self):
+        with self.assertNumQueries(2):
+            roots = build_category_hierarchy()
+
+        self.assertEqual(len(roots), 1)
+        rows = [(node.category.name, node.depth, node.direct_task_count, node.total_task_count)
+                for node in roots[0].walk()]
+        self.assertEqual(rows, [("Root", 0, 1, 3), ("Child", 1, 0, 2), ("Grandchild", 2, 2, 2)])
+
+    def test_cached_until_generation_changes(self):
+        get_category_hierarchy()
+        with self.assertNumQueries(0):
+            get_category_hierarchy()
+
+        Task.objects.create(title="Another", project=self.project, created_by=self.user, category=self.child)
+        roots = get_category_hierarchy()
+        self.assertEqual(roots[0].total_task_count, 4)
+
+    def test_list_view_constant_query_count(self):
+        self.client.force_login(self.user)
+        url = reverse('tasks:category_list')
+        self.client.get(url)
+        for i in range(10):
+            Category.objects.create(name=f"Extra {i}", parent=self.grandchild)
+
+        # session, user, hierarchy (2); sidebar data is still cached from the first request
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertContains(response, "Extra 9")
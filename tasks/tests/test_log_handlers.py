@@ -0,0 +1,137 @@
+import logging
+
+from django.test import SimpleTestCase
+
+from tasks.log_handlers import AsyncLogPipeline, AsyncLogHandler, get_async_logging_stats
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class AsyncLoggingTests(SimpleTestCase):
+    """Tests for the bounded, batched logging pipeline."""
+
+    def make_logger(self, pipeline, name):
+        target = ListHandler()
+        logger = logging.Logger(name)
+        logger.addHandler(AsyncLogHandler(pipeline, [target]))
+        return logger, target
+
+    def test_records_delivered_by_listener(self):
+        pipeline = AsyncLogPipeline(queue_size=100, flush_interval=0.01)
+        logger, target = self.make_logger(pipeline, 'test.delivered')
+        pipeline.start()
+        args = ['before']
+        logger.info("Value %s", args)
+        args[0] = 'after'
+        pipeline.stop()
+
+        self.assertEqual([record.getMessage() for record in target.records], ["Value ['before']"])
+        self.assertEqual(pipeline.stats()['processed'], 1)
+
+    def test_drop_new_policy(self):
+        pipeline = AsyncLogPipeline(queue_size=2, drop_policy='drop_new')
+        logger, target = self.make_logger(pipeline, 'test.drop_new')
+        for index in range(5):
+            logger.info("Record %d", index)
+        pipeline.start()
+        pipeline.stop()
+
+        self.assertEqual([record.getMessage() for record in target.records], ["Record 0", "Record 1"])
+        self.assertEqual(pipeline.stats()['dropped_by_logger'], {'test.drop_new': 3})
+
+    def test_drop_oldest_policy(self):
+        pipeline = AsyncLogPipeline(queue_size=2, drop_policy='drop_oldest')
+        logger, target = self.make_logger(pipeline, 'test.drop_oldest')
+        for index in range(5):
+            logger.info("Record %d", index)
+        pipeline.start()
+        pipeline.stop()
+
+        self.assertEqual([record.getMessage() for record in target.records], ["Record 3", "Record 4"])
+        self.assertEqual(pipeline.total_dropped, 3)
+
+    def test_drop_oldest_never_evicts_errors(self):
+        pipeline = AsyncLogPipeline(queue_size=2, drop_policy='drop_oldest')
+        errors, error_target = self.make_logger(pipeline, 'test.errors')
+        logger, target = self.make_logger(pipeline, 'test.info')
+        errors.error("e1")
+        logger.info("i1")
+        logger.info("i2")
+        errors.error("e2")  # Queue holds e1, i2: i2 is evicted for it
+        logger.info("i3")   # Only errors queued: i3 itself is dropped
+        pipeline.start()
+        pipeline.stop()
+
+        self.assertEqual([record.getMessage() for record in error_target.records], ["e1", "e2"])
+        self.assertEqual(target.records, [])
+        self.assertEqual(pipeline.stats()['dropped_by_logger'], {'test.info': 3})
+
+    def test_drops_reported(self):
+        report = ListHandler()
+        pipeline = AsyncLogPipeline(queue_size=1, drop_policy='drop_new', report_handlers=[report])
+        logger, _ = self.make_logger(pipeline, 'test.report')
+        logger.info("kept")
+        logger.info("dropped")
+        pipeline.start()
+        pipeline.stop()
+
+        self.assertEqual(len(report.records), 1)
+        self.assertIn("dropped 1 records", report.records[0].getMessage())
+
+    def test_error_written_synchronously_when_queue_stays_full(self):
+        pipeline = AsyncLogPipeline(queue_size=1, error_timeout=0.01)
+        logger, target = self.make_logger(pipeline, 'test.error_full')
+        logger.error("queued")
+        # No listener is running and errors are never evicted, so the queue never drains
+        logger.error("urgent")
+
+        self.assertEqual([record.getMessage() for record in target.records], ["urgent"])
+        pipeline.start()
+        pipeline.stop()
+        self.assertEqual([record.getMessage() for record in target.records], ["urgent", "queued"])
+
+    def test_exception_rendered_before_queueing(self):
+        pipeline = AsyncLogPipeline(queue_size=10)
+        logger, target = self.make_logger(pipeline, 'test.exc_info')
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed")
+        pipeline.start()
+        pipeline.stop()
+
+        record = target.records[0]
+        self.assertIsNone(record.exc_info)
+        self.assertIn("ValueError: boom", logging.Formatter().format(record))
+
+    def test_listener_restarted_after_fork(self):
+        pipeline = AsyncLogPipeline(queue_size=10, flush_interval=0.01)
+        logger, target = self.make_logger(pipeline, 'test.fork')
+        pipeline.start()
+        parent_thread = pipeline._thread
+        pipeline.stop()
+        # A forked child inherits the parent's thread object but not the thread
+        pipeline._thread = parent_thread
+        pipeline.after_fork()
+        self.assertTrue(pipeline._thread.is_alive())
+        logger.info("in child")
+        pipeline.stop()
+
+        self.assertEqual([record.getMessage() for record in target.records], ["in child"])
+
+    def test_unknown_policy_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncLogPipeline(drop_policy='block')
+
+    def test_installed_for_request_loggers(self):
+        self.assertIsNotNone(get_async_logging_stats())
+        handlers = logging.getLogger('tasks.request').handlers
+        self.assertEqual([type(handler) for handler in handlers], [AsyncLogHandler])
+        self.assertFalse(logging.getLogger('tasks.request').propagate)
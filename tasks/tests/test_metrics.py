@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from tasks import metrics
+from tasks.metrics import LatencyHistogram, MetricsRegistry, render_prometheus
+
+User = get_user_model()
+
+
+class LatencyHistogramTests(TestCase):
+    """Tests for the log-linear latency histogram."""
+
+    def test_quantiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.observe(millis / 1000)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.5, delta=0.5 / metrics.SUB_BUCKETS)
+        self.assertAlmostEqual(histogram.quantile(0.99), 0.99, delta=0.99 / metrics.SUB_BUCKETS)
+        self.assertEqual(histogram.count, 1000)
+
+    def test_values_beyond_last_bucket(self):
+        histogram = LatencyHistogram()
+        histogram.observe(1000)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.quantile(1), float('inf'))
+
+
+class MetricsRegistryTests(TestCase):
+    """Tests for per-worker snapshots and their aggregation."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_snapshot(self, worker_id, registry):
+        with open(os.path.join(self.directory, f'worker-{worker_id}.json'), 'w') as snapshot_file:
+            json.dump(registry.snapshot(), snapshot_file)
+
+    def dead_pid(self):
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        return process.pid
+
+    def test_workers_aggregated_through_directory(self):
+        this_worker = MetricsRegistry(self.directory)
+        other_worker = MetricsRegistry()
+        this_worker.observe_request('tasks:task_list', 200, 0.010, db_queries=3)
+        this_worker.observe_request('tasks:task_list', 404, 0.005)
+        other_worker.observe_request('tasks:task_list', 200, 0.020, db_queries=5)
+        # An earlier worker that had the same PID keeps its own file
+        self.write_snapshot(f'{os.getpid()}-0', other_worker)
+
+        snapshots = this_worker.collect()
+        self.assertEqual(len(snapshots), 2)
+
+        output = render_prometheus(snapshots)
+        self.assertIn('taskmanager_requests_total{view="tasks:task_list",status="2xx"} 2', output)
+        self.assertIn('taskmanager_requests_total{view="tasks:task_list",status="4xx"} 1', output)
+        self.assertIn('taskmanager_db_queries_total{view="tasks:task_list",status="2xx"} 8', output)
+        self.assertIn(
+            'taskmanager_request_duration_seconds_bucket{view="tasks:task_list",status="2xx",le="+Inf"} 2',
+            output,
+        )
+
+    def test_dead_workers_archived(self):
+        this_worker = MetricsRegistry(self.directory)
+        dead_worker = MetricsRegistry()
+        dead_worker.observe_request('tasks:task_list', 200, 0.010)
+        self.write_snapshot(f'{self.dead_pid()}-1', dead_worker)
+        self.write_snapshot(f'{self.dead_pid()}-2', dead_worker)
+
+        output = render_prometheus(this_worker.collect())
+        self.assertIn('taskmanager_requests_total{view="tasks:task_list",status="2xx"} 2', output)
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.directory) if name.endswith('.json')),
+            ['archive.json', f'worker-{this_worker.worker_id}.json'],
+        )
+        # Totals survive later collections
+        output = render_prometheus(this_worker.collect())
+        self.assertIn('taskmanager_requests_total{view="tasks:task_list",status="2xx"} 2', output)
+
+    def test_mark_process_dead(self):
+        worker = MetricsRegistry(self.directory)
+        worker.observe_request('tasks:task_list', 200, 0.010)
+        worker.flush()
+        metrics.mark_process_dead(os.getpid(), self.directory)
+        self.assertNotIn(f'worker-{worker.worker_id}.json', os.listdir(self.directory))
+        self.assertIn('archive.json', os.listdir(self.directory))
+
+    def test_flushed_in_background(self):
+        worker = MetricsRegistry(self.directory, flush_interval=0.01)
+        worker.observe_request('tasks:task_list', 200, 0.010)
+        self.assertEqual(os.listdir(self.directory), [])
+
+        worker.start()
+        self.addCleanup(worker.stop)
+        path = os.path.join(self.directory, f'worker-{worker.worker_id}.json')
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(path))
+
+    def test_endpoint_staff_only(self):
+        user = User.objects.create_user(username='metricsstaff', password='password123', is_staff=True)
+        response = self.client.get(reverse('tasks:metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(user)
+        self.client.get(reverse('tasks:dashboard'))
+        response = self.client.get(reverse('tasks:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('view="tasks:dashboard",status="2xx"', response.content.decode())
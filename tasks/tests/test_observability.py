@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+from django.urls import resolve, reverse
+
+from tasks.middleware import ObservabilityMiddleware
+from tasks.models import Project, Task
+from tasks.sensitivity import RouteClassifier, sensitive
+
+User = get_user_model()
+
+
+class ObservabilityMiddlewareTests(TestCase):
+    """Tests for the combined observability middleware and its sinks."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_route_classifier(self):
+        classifier = RouteClassifier()
+        classify = lambda path: classifier.classify(resolve(path).func)
+        # Declared with @sensitive on the view
+        self.assertEqual(classify('/auth/login/'), {'security', 'audit_sensitive', 'login'})
+        self.assertEqual(classify('/tasks/new/'), {'sensitive_operation'})
+        # Registered by URL name and by namespace
+        self.assertEqual(classify('/auth/password_reset/'), {'security', 'audit_sensitive'})
+        self.assertEqual(classify('/admin/'), {'security', 'audit_sensitive'})
+        self.assertEqual(classify('/tasks/1/'), set())
+
+    def test_sensitive_decorator(self):
+        @sensitive('sensitive_operation')
+        def view(request):
+            return HttpResponse()
+
+        self.assertEqual(RouteClassifier().classify(view), {'sensitive_operation'})
+        with self.assertRaises(ValueError):
+            sensitive('secret')
+
+    def test_async_mode(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = ObservabilityMiddleware(view, sinks=['tasks.observability.PerformanceSink'])
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        response = asyncio.run(middleware(self.factory.get('/tasks/')))
+        self.assertIn('X-Processing-Time', response)
+
+    def test_exception_sink_json_response(self):
+        middleware = ObservabilityMiddleware(HttpResponse, sinks=['tasks.observability.ExceptionSink'])
+        request = self.factory.get('/tasks/', HTTP_ACCEPT='application/json')
+        middleware(request)
+        with self.assertLogs('error', level='ERROR'):
+            response = middleware.process_exception(request, ValueError("boom"))
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('error_id', json.loads(response.content))
+
+    def test_exception_sink_html_response(self):
+        middleware = ObservabilityMiddleware(HttpResponse, sinks=['tasks.observability.ExceptionSink'])
+        request = self.factory.get('/tasks/')
+        middleware(request)
+        with self.assertLogs('error', level='ERROR'):
+            response = middleware.process_exception(request, ValueError("boom"))
+        self.assertEqual(response.status_code, 500)
+        self.assertContains(response, 'Error reference', status_code=500)
+
+    def test_permission_denied_is_not_turned_into_500(self):
+        owner = User.objects.create_user(username='obsowner', password='password123')
+        outsider = User.objects.create_user(username='obsoutsider', password='password123')
+        project = Project.objects.create(title="Private", owner=owner)
+        task = Task.objects.create(title="Private task", project=project, created_by=owner)
+
+        self.client.force_login(outsider)
+        response = self.client.get(reverse('tasks:task_detail', kwargs={'pk': task.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_audit_sink_logs_modifications(self):
+        user = User.objects.create_user(username='obsaudit', password='password123')
+        request = self.factory.post('/tasks/new/')
+        request.user = user
+        middleware = ObservabilityMiddleware(HttpResponse, sinks=['tasks.observability.AuditSink'])
+        middleware(request)
+        with self.assertLogs('audit', level='INFO') as logs:
+            middleware.process_view(request, HttpResponse, (), {})
+        self.assertEqual(logs.records[0].event_type, 'data_modification')
+        self.assertEqual(logs.records[0].client_ip, '127.0.0.1')
+
+    def test_malformed_content_length(self):
+        request = self.factory.post('/tasks/new/', CONTENT_LENGTH='abc')
+        request.user = AnonymousUser()
+        middleware = ObservabilityMiddleware(HttpResponse, sinks=['tasks.observability.RequestLogSink'])
+        response = middleware(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request._log_data['body_size'], 0)
+
+    def test_requests_answered_by_common_middleware_are_timed(self):
+        # APPEND_SLASH redirects never reach a view
+        response = self.client.get('/tasks')
+        self.assertEqual(response.status_code, 301)
+        self.assertIn('X-Processing-Time', response)
+
+    def test_request_log_records_authenticated_user(self):
+        user = User.objects.create_user(username='obslogged', password='password123')
+        self.client.force_login(user)
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.wsgi_request._log_data['user']['id'], user.id)
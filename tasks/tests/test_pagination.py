@@ -0,0 +1,170 @@
+from datetime import timedelta
+from unittest import skipUnless
+from urllib.parse import quote
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.choices import TaskPriority
+from tasks.models import Project, Task
+from tasks.pagination import KeysetPaginator, SortKey
+from tasks.views import TASK_LIST_ORDERING, filter_tasks
+
+User = get_user_model()
+
+
+class KeysetPaginatorTests(TestCase):
+    """Tests for cursor pagination over the task list ordering."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='password123')
+        self.project = Project.objects.create(title="Pager Project", owner=self.user)
+        now = timezone.now()
+        priorities = [TaskPriority.LOW, TaskPriority.HIGH, TaskPriority.URGENT, TaskPriority.MEDIUM]
+        for index in range(23):
+            Task.objects.create(
+                title=f"Task {index}", project=self.project, created_by=self.user,
+                priority=priorities[index % 4],
+                # Some share a deadline, some have none
+                deadline=None if index % 5 == 0 else now + timedelta(days=index % 3),
+            )
+        self.queryset = filter_tasks(self.user, {})
+
+    def paginator(self):
+        return KeysetPaginator(self.queryset, 5, TASK_LIST_ORDERING)
+
+    def test_pages_follow_the_list_ordering(self):
+        expected = list(self.queryset)
+        paginator, seen, cursor = self.paginator(), [], None
+        while True:
+            page = paginator.get_page(cursor)
+            seen.extend(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(page), 3)
+
+    def test_previous_cursor_returns_the_same_pages(self):
+        paginator = self.paginator()
+        first = paginator.get_page()
+        self.assertFalse(first.has_previous())
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_deep_pages_cost_one_query(self):
+        paginator = self.paginator()
+        cursor = paginator.get_page().next_cursor
+        cursor = paginator.get_page(cursor).next_cursor
+        with self.assertNumQueries(1):
+            page = paginator.get_page(cursor)
+        self.assertEqual(len(page), 5)
+        self.assertIsNone(paginator.count)
+
+    def test_nulls_ordered_without_nulls_clause(self):
+        for forward in (True, False):
+            queryset = self.queryset.order_by(*(
+                expression for spec in TASK_LIST_ORDERING for expression in SortKey(spec, Task).order_by(forward)
+            ))
+            sql = str(queryset.query)
+            self.assertIn('"deadline" IS NULL', sql)
+            self.assertNotIn('NULLS', sql)
+
+    def test_invalid_cursor_serves_first_page(self):
+        paginator = self.paginator()
+        self.assertEqual(list(paginator.get_page('forged')), list(paginator.get_page()))
+
+
+@override_settings(KEYSET_PAGINATION=True)
+class KeysetPaginationViewTests(TestCase):
+    """Tests for the cursor-paginated task and project lists."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cursoruser', password='password123')
+        self.client.force_login(self.user)
+
+    def test_task_list(self):
+        project = Project.objects.create(title="Cursor Project", owner=self.user)
+        for index in range(20):
+            Task.objects.create(title=f"Task {index}", project=project, created_by=self.user)
+
+        response = self.client.get(reverse('tasks:task_list'), {'status': 'todo'})
+        self.assertTrue(response.context['cursor_pagination'])
+        self.assertEqual(len(response.context['tasks']), 15)
+        page = response.context['page_obj']
+        self.assertContains(response, f"?cursor={quote(page.next_cursor)}&status=todo")
+
+        response = self.client.get(reverse('tasks:task_list'), {'status': 'todo', 'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['tasks']), 5)
+        self.assertFalse(response.context['page_obj'].has_next())
+
+    def test_search_keeps_offset_pagination(self):
+        response = self.client.get(reverse('tasks:task_list'), {'search': 'task'})
+        self.assertFalse(response.context['cursor_pagination'])
+
+    def test_project_list(self):
+        projects = [Project.objects.create(title=f"Project {index}", owner=self.user) for index in range(12)]
+        response = self.client.get(reverse('tasks:project_list'))
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 10)
+
+        response = self.client.get(reverse('tasks:project_list'), {'cursor': page.next_cursor})
+        self.assertEqual(set(response.context['projects']), set(projects[:2]))
+
+
+class TaskPriorityRankTests(TestCase):
+    """Tests for the stored priority rank the task lists sort by."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ranker', password='password123')
+        self.project = Project.objects.create(title="Rank Project", owner=self.user)
+
+    def test_rank_follows_priority(self):
+        task = Task.objects.create(title="Task", project=self.project, created_by=self.user)
+        self.assertEqual(task.priority_rank, 2)
+
+        task.priority = TaskPriority.URGENT
+        task.save(update_fields=['priority'])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 0)
+
+    def test_default_ordering_is_most_urgent_first(self):
+        for priority in (TaskPriority.LOW, TaskPriority.HIGH, TaskPriority.URGENT, TaskPriority.MEDIUM):
+            Task.objects.create(title=priority, project=self.project, created_by=self.user, priority=priority)
+        self.assertEqual(
+            list(Task.objects.values_list('priority', flat=True)),
+            [TaskPriority.URGENT, TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW],
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', "Checks SQLite's query plan")
+    def test_list_sort_served_from_index(self):
+        paginator = KeysetPaginator(Task.objects.all(), 5, TASK_LIST_ORDERING)
+        task = Task.objects.create(title="Task", project=self.project, created_by=self.user)
+        # First page, and pages seeking forward and backward from a cursor
+        values = [getattr(task, key.name) for key in paginator.keys]
+        querysets = [paginator.queryset.order_by(*(
+            expression for key in paginator.keys for expression in key.order_by(True)
+        ))]
+        for forward in (True, False):
+            querysets.append(paginator.queryset.order_by(*(
+                expression for key in paginator.keys for expression in key.order_by(forward)
+            )).filter(paginator._seek(values, forward)))
+        for index, queryset in enumerate(querysets):
+            plan = queryset[:6].explain()
+            self.assertIn('task_list_order_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+            if index:
+                # Seeks into the index rather than scanning up to the cursor
+                self.assertIn('SEARCH', plan)
@@ -0,0 +1,69 @@
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from tasks.middleware import ObservabilityMiddleware
+from tasks.models import Project
+from tasks.profiling import fingerprint, profile_queries
+
+User = get_user_model()
+
+
+class QueryProfilingTests(TestCase):
+    """Tests for per-request SQL profiling."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='profiler', password='password123')
+        for index in range(3):
+            Project.objects.create(title=f"Project {index}", owner=self.user)
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT *  FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+    def test_profiler_records_duplicates_and_slowest(self):
+        with profile_queries(keep_slowest=2) as profiler:
+            for project in Project.objects.all():
+                project.owner.username  # one query per project: an N+1
+        self.assertEqual(profiler.count, 4)
+        self.assertEqual(profiler.duplicate_count, 2)
+        self.assertEqual(len(profiler.slowest), 2)
+        self.assertGreater(profiler.total_time, 0)
+        self.assertEqual(profiler.as_stats()['db_queries'], 4)
+
+    async def test_queries_in_other_threads_are_attributed(self):
+        # The async ORM runs queries on sync_to_async threads with their own connections
+        def select_one():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        with profile_queries() as profiler:
+            await sync_to_async(select_one, thread_sensitive=False)()
+            await Project.objects.acount()
+        self.assertEqual(profiler.count, 2)
+
+    def test_headers_report_query_stats(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:project_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-Performance-Db-Queries']), 0)
+        self.assertTrue(response['X-Performance-Db-Time'].endswith('s'))
+        self.assertIn('X-Performance-Db-Duplicate-Queries', response)
+
+    def test_repeated_queries_logged(self):
+        def view(request):
+            for project in Project.objects.all():
+                project.owner.username
+            return HttpResponse()
+
+        with self.settings(DUPLICATE_QUERY_THRESHOLD=2):
+            middleware = ObservabilityMiddleware(view, sinks=['tasks.observability.PerformanceSink'])
+        with self.assertLogs('performance', level='WARNING') as logs:
+            middleware(RequestFactory().get('/projects/'))
+        self.assertIn("Repeated queries detected", logs.output[0])
+        self.assertEqual(logs.records[0].db_duplicate_queries, 2)
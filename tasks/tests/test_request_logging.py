@@ -0,0 +1,95 @@
+import logging
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from tasks.middleware import ObservabilityMiddleware
+from tasks.observability import BodyLoggingPolicy
+
+REQUEST_LOG_SINKS = ['tasks.observability.RequestLogSink']
+SAMPLE_ALL = {'REQUEST_LOG_SAMPLE_RATE': 1.0}
+BODY_LOGGING = {'max_bytes': 8, 'sample_rate': 1.0, 'paths': ['/api/'], 'content_types': ['application/json']}
+
+
+class BodyLoggingTests(SimpleTestCase):
+    """Tests for the request body logging policy."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_middleware(self, request, read_body=False):
+        def view(request):
+            middleware.process_view(request, view, (), {})
+            # The middleware must not have buffered the body
+            self.assertFalse(hasattr(request, '_body'))
+            if read_body:
+                request.body
+            return HttpResponse()
+
+        middleware = ObservabilityMiddleware(view, sinks=REQUEST_LOG_SINKS)
+        with self.assertLogs('tasks.request', level='INFO') as logs:
+            middleware(request)
+        start, end = logs.records
+        return start.data, end.data
+
+    @override_settings(REQUEST_BODY_LOGGING=BODY_LOGGING, **SAMPLE_ALL)
+    def test_body_read_by_view_is_truncated(self):
+        request = self.factory.post('/api/tasks/', data='{"title": "long title"}', content_type='application/json')
+        start, end = self.run_middleware(request, read_body=True)
+        self.assertEqual(start['body_size'], 23)
+        self.assertEqual(end['body'], '{"title"')
+        self.assertTrue(end['body_truncated'])
+
+    @override_settings(REQUEST_BODY_LOGGING=BODY_LOGGING, **SAMPLE_ALL)
+    def test_unread_body_is_not_read_for_logging(self):
+        request = self.factory.post('/api/tasks/', data='{}', content_type='application/json')
+        _, end = self.run_middleware(request)
+        self.assertEqual(end['body_read'], False)
+        self.assertFalse(hasattr(request, '_body'))
+
+    @override_settings(REQUEST_BODY_LOGGING=BODY_LOGGING)
+    def test_policy_filters(self):
+        policy = BodyLoggingPolicy.from_settings()
+        allowed = self.factory.post('/api/tasks/', data='{}', content_type='application/json')
+        other_path = self.factory.post('/tasks/', data='{}', content_type='application/json')
+        form = self.factory.post('/api/tasks/', data={'a': 'b'})
+        sensitive = self.factory.post('/api/login/', data='{}', content_type='application/json')
+        self.assertTrue(policy.should_log(allowed, frozenset()))
+        self.assertFalse(policy.should_log(other_path))
+        self.assertFalse(policy.should_log(form))
+        self.assertFalse(policy.should_log(sensitive, frozenset(['security'])))
+        self.assertFalse(BodyLoggingPolicy(**dict(BODY_LOGGING, sample_rate=0)).should_log(allowed))
+
+
+class RequestLogSamplingTests(SimpleTestCase):
+    """Tests for tail-based request log sampling."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.records = []
+        handler = logging.Handler()
+        handler.emit = self.records.append
+        logger = logging.getLogger('tasks.request')
+        self.addCleanup(setattr, logger, 'handlers', logger.handlers)
+        logger.handlers = [handler]
+
+    def run_request(self, response, processing_time=0.0):
+        def view(request):
+            request.observability.start -= processing_time
+            return response
+
+        request = self.factory.get('/tasks/')
+        ObservabilityMiddleware(view, sinks=REQUEST_LOG_SINKS)(request)
+        return [record.getMessage().split(' ')[0] for record in self.records], request.log_sampled
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATE=0)
+    def test_fast_success_dropped(self):
+        self.assertEqual(self.run_request(HttpResponse()), ([], False))
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATE=0)
+    def test_errors_kept_with_start_record(self):
+        self.assertEqual(self.run_request(HttpResponse(status=404)), (['Request', 'Error'], True))
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATE=0, SLOW_REQUEST_THRESHOLD=0.5)
+    def test_slow_requests_kept(self):
+        self.assertEqual(self.run_request(HttpResponse(), processing_time=1.0), (['Request', 'Response'], True))
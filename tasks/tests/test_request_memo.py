@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from tasks.models import Project, Task
+from tasks.utils import (
+    check_task_permission, check_project_permission, request_memo_scope, request_memoize,
+)
+
+User = get_user_model()
+
+
+class RequestMemoTests(TestCase):
+    """Tests for the request-scoped memo store."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='memouser', password='password123')
+        self.member = User.objects.create_user(username='memomember', password='password123')
+        self.project = Project.objects.create(title="Memo Project", owner=self.user)
+        self.project.members.add(self.member)
+        self.task = Task.objects.create(title="Memo Task", project=self.project, created_by=self.user)
+
+    def test_memoize_outside_scope_always_computes(self):
+        calls = []
+        request_memoize('key', lambda: calls.append(1))
+        request_memoize('key', lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_permission_checks_memoized_within_scope(self):
+        with request_memo_scope() as store:
+            with self.assertNumQueries(2):
+                for _ in range(3):
+                    self.assertTrue(check_task_permission(self.member, self.task))
+                    self.assertTrue(check_project_permission(self.member, self.project))
+            self.assertEqual(len(store), 2)
+        self.assertEqual(store, {})
+
+    def test_invalidation_clears_memo(self):
+        with request_memo_scope() as store:
+            check_task_permission(self.member, self.task)
+            self.project.members.remove(self.member)
+            self.assertEqual(store, {})
+            self.assertFalse(check_task_permission(self.member, self.task))
+
+    def test_task_detail_fetches_task_once(self):
+        self.client.force_login(self.member)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:task_detail', kwargs={'pk': self.task.pk}))
+        self.assertEqual(response.status_code, 200)
+        task_lookups = [
+            query['sql'] for query in queries
+            if 'FROM "tasks_task" WHERE "tasks_task"."id" =' in query['sql']
+        ]
+        self.assertEqual(len(task_lookups), 1)
+        self.assertEqual(response.wsgi_request.memo, {})
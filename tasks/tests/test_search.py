@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks.models import Project, Task
+from tasks.search import SEARCH_TABLE, rebuild_task_search, search_tasks, search_terms
+from tasks.views import filter_tasks
+
+User = get_user_model()
+
+
+class TaskSearchTests(TestCase):
+    """Tests for the full-text task search index."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='searchowner', password='password123')
+        self.outsider = User.objects.create_user(username='searchoutsider', password='password123')
+        self.project = Project.objects.create(title="Website Relaunch", owner=self.owner)
+        self.deploy = Task.objects.create(
+            title="Deploy to production", description="Roll out the release",
+            project=self.project, created_by=self.owner,
+        )
+        self.docs = Task.objects.create(
+            title="Write documentation", description="Explain how to deploy the site",
+            project=self.project, created_by=self.owner,
+        )
+
+    def search(self, query, user=None):
+        return list(filter_tasks(user or self.owner, {'search': query}))
+
+    def test_search_terms(self):
+        self.assertEqual(search_terms("  Deploy, PROD_env!  "), ['deploy', 'prod', 'env'])
+
+    def test_prefix_matching_requires_every_term(self):
+        self.assertEqual(self.search("dep prod"), [self.deploy])
+        self.assertEqual(self.search("relaunch doc"), [self.docs])
+        self.assertEqual(self.search("deploy nothing"), [])
+
+    def test_title_matches_rank_first(self):
+        # Both mention "deploy"; only one has it in the title
+        self.assertEqual(self.search("deploy"), [self.deploy, self.docs])
+
+    def test_search_respects_visibility(self):
+        self.assertEqual(self.search("deploy", user=self.outsider), [])
+
+    def test_query_without_words_matches_nothing(self):
+        self.assertEqual(list(search_tasks(Task.objects.all(), "!!!")), [])
+
+    def test_index_follows_task_changes(self):
+        self.deploy.title = "Ship release"
+        self.deploy.save()
+        self.assertEqual(self.search("ship"), [self.deploy])
+        self.assertEqual(self.search("production"), [])
+
+        self.deploy.delete()
+        self.assertEqual(self.search("ship"), [])
+
+    def test_index_follows_project_rename(self):
+        self.project.title = "Mobile App"
+        self.project.save()
+        self.assertEqual(len(self.search("mobile")), 2)
+        self.assertEqual(self.search("website"), [])
+
+    def test_project_delete_drops_project_title(self):
+        self.project.delete()
+        self.assertEqual(self.search("website"), [])
+        self.assertEqual(self.search("documentation"), [self.docs])
+
+    def test_rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        self.assertEqual(self.search("deploy"), [])
+
+        self.assertEqual(rebuild_task_search(batch_size=1), 2)
+        self.assertEqual(self.search("deploy"), [self.deploy, self.docs])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search("website"), [self.deploy, self.docs])
+
+    def test_task_list_search(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('tasks:task_list'), {'search': 'docu'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['tasks']), [self.docs])
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from tasks.models import Project, Task
+from tasks.choices import TaskStatus, TaskPriority
+from tasks.stats import get_task_stats
+
+User = get_user_model()
+
+
+class TaskStatsTests(TestCase):
+    """Tests for the single-query dashboard statistics."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='statsuser', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        self.project = Project.objects.create(title="Stats Project", owner=self.user)
+        now = timezone.now()
+
+        Task.objects.create(title="Due today", project=self.project, created_by=self.user,
+                            deadline=now + timedelta(minutes=5), priority=TaskPriority.URGENT)
+        Task.objects.create(title="Overdue", project=self.project, created_by=self.user,
+                            deadline=now - timedelta(days=2), status=TaskStatus.IN_PROGRESS)
+        Task.objects.create(title="Upcoming", project=self.project, created_by=self.other,
+                            assigned_to=self.user, deadline=now + timedelta(days=2))
+        Task.objects.create(title="Done", project=self.project, created_by=self.user,
+                            status=TaskStatus.COMPLETED, priority=TaskPriority.HIGH)
+        # Visible through project ownership but neither created nor assigned
+        Task.objects.create(title="Someone else's", project=self.project, created_by=self.other)
+
+    def test_counters(self):
+        stats = get_task_stats(self.user.id)
+        self.assertEqual(stats.total, 4)
+        self.assertEqual(stats.assigned, 1)
+        self.assertEqual(stats.created, 3)
+        self.assertEqual(stats.due_today, 1)
+        self.assertEqual(stats.overdue, 1)
+        self.assertEqual(stats.upcoming, 2)
+        self.assertEqual(stats.high_priority, 1)
+        self.assertEqual(stats.status_counts, {
+            TaskStatus.TODO: 2, TaskStatus.IN_PROGRESS: 1, TaskStatus.COMPLETED: 1,
+        })
+        self.assertEqual(stats.priority_counts, {TaskPriority.MEDIUM: 2, TaskPriority.URGENT: 1})
+        self.assertEqual(stats.status_chart, {'labels': ['To Do', 'In Progress', 'Completed'], 'data': [2, 1, 1]})
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            get_task_stats(self.user.id)
+
+    def test_dashboard_query_count(self):
+        """Regression guard: dashboard counters must not fan out into per-counter queries."""
+        self.client.force_login(self.user)
+        url = reverse('tasks:dashboard')
+        # session, user, projects (2), stats, sidebar project task count; the
+        # panels are loaded separately (see tasks.widgets.DASHBOARD_PANELS)
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['due_today'], 1)
+        self.assertEqual(response.context['overdue_tasks'], 1)
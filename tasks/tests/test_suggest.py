@@ -0,0 +1,179 @@
+import sys
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Category, Project, Task
+from tasks.suggest import (
+    Entry, PrefixIndex, _user_generation, get_index_store, get_suggestions,
+)
+from tasks.utils import bump_cache_generation, get_cache_generation
+
+User = get_user_model()
+
+
+class PrefixIndexTests(SimpleTestCase):
+    """Tests for the sorted-array prefix index."""
+
+    def setUp(self):
+        self.index = PrefixIndex([
+            Entry('task', 1, "Deploy to production"),
+            Entry('task', 2, "Production database backup"),
+            Entry('project', 1, "Product Launch"),
+        ])
+
+    def labels(self, prefix, limit=10):
+        return [entry.label for entry in self.index.search(prefix, limit)]
+
+    def test_matches_any_word_label_starts_first(self):
+        self.assertEqual(
+            self.labels("prod"),
+            ["Production database backup", "Product Launch", "Deploy to production"],
+        )
+        self.assertEqual(self.labels("to  PROD"), ["Deploy to production"])
+        self.assertEqual(self.labels("launch"), ["Product Launch"])
+        self.assertEqual(self.labels("prod", limit=1), ["Production database backup"])
+        self.assertEqual(self.labels(""), [])
+
+    def test_add_and_remove(self):
+        self.index.add(Entry('task', 1, "Ship release"))
+        self.assertEqual(self.labels("deploy"), [])
+        self.assertEqual(self.labels("rel"), ["Ship release"])
+
+        self.index.remove('task', 1)
+        self.index.remove('task', 99)
+        self.assertEqual(self.labels("ship"), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_lookups_run_safely_alongside_changes(self):
+        errors = []
+
+        def search():
+            try:
+                for _ in range(2000):
+                    self.index.search("ship", 5)
+            except Exception as error:
+                errors.append(error)
+
+        # Switch threads often so a search lands inside a change
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        reader = threading.Thread(target=search)
+        reader.start()
+        for entry_id in range(2000):
+            self.index.add(Entry('task', entry_id, f"Ship build {entry_id}"))
+            self.index.remove('task', entry_id)
+        reader.join()
+        self.assertEqual(errors, [])
+
+
+class SuggestionTests(TestCase):
+    """Tests for building and maintaining the per-user suggestion indexes."""
+
+    def setUp(self):
+        cache.clear()
+        get_index_store().clear()
+        self.owner = User.objects.create_user(username='suggestowner', password='password123')
+        self.member = User.objects.create_user(username='suggestmember', password='password123')
+        self.project = Project.objects.create(title="Website Relaunch", owner=self.owner)
+        self.task = Task.objects.create(title="Deploy website", project=self.project, created_by=self.owner)
+        self.category = Category.objects.create(name="Web Development")
+
+    def labels(self, user, query):
+        return [entry.label for entry in get_suggestions(user, query)]
+
+    def test_lookups_after_the_first_do_not_query(self):
+        self.assertEqual(self.labels(self.owner, "web"), ["Website Relaunch", "Web Development", "Deploy website"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(self.owner, "dep"), ["Deploy website"])
+
+    def test_task_changes_are_applied_in_place(self):
+        self.labels(self.owner, "dep")
+
+        other = Task.objects.create(title="Deploy docs", project=self.project, created_by=self.owner)
+        self.task.title = "Ship website"
+        self.task.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(self.owner, "dep"), ["Deploy docs"])
+            self.assertEqual(self.labels(self.owner, "ship"), ["Ship website"])
+
+        other.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(self.owner, "dep"), [])
+
+    def test_status_change_does_not_touch_indexes(self):
+        name = _user_generation(self.owner.id)
+        generation = get_cache_generation(name)
+        self.task.status = 'completed'
+        self.task.save()
+        self.assertEqual(get_cache_generation(name), generation)
+
+    def test_reassignment_follows_visibility(self):
+        outsider_project = Project.objects.create(title="Private", owner=self.member)
+        self.labels(self.owner, "dep")
+
+        self.task.project = outsider_project
+        self.task.created_by = self.member
+        self.task.save()
+        self.assertEqual(self.labels(self.owner, "dep"), [])
+        self.assertEqual(self.labels(self.member, "dep"), ["Deploy website"])
+
+    def test_membership_change_rebuilds_member_index(self):
+        self.assertEqual(self.labels(self.member, "dep"), [])
+        self.project.members.add(self.member)
+        self.assertEqual(self.labels(self.member, "dep"), ["Deploy website"])
+        self.assertEqual(self.labels(self.member, "relaunch"), ["Website Relaunch"])
+
+    def test_categories_are_shared(self):
+        self.labels(self.owner, "web")
+        self.category.name = "Frontend"
+        self.category.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(self.owner, "front"), ["Frontend"])
+        self.assertEqual(self.labels(self.member, "front"), ["Frontend"])
+
+    def test_changes_from_other_processes_rebuild(self):
+        self.labels(self.owner, "dep")
+        Task.objects.filter(pk=self.task.pk).update(title="Renamed elsewhere")
+        self.assertEqual(self.labels(self.owner, "renamed"), [])
+
+        # Another process saving the task bumps the generation
+        bump_cache_generation(_user_generation(self.owner.id))
+        self.assertEqual(self.labels(self.owner, "renamed"), ["Renamed elsewhere"])
+
+    @override_settings(SUGGEST_INDEX_MAX_USERS=1)
+    def test_least_recently_used_index_is_evicted(self):
+        self.labels(self.owner, "dep")
+        self.labels(self.member, "dep")
+        # Rebuilding the owner's index; the category index stays
+        with self.assertNumQueries(2):
+            self.labels(self.owner, "dep")
+
+
+class TaskSuggestViewTests(TestCase):
+    """Tests for the typeahead suggestion endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        get_index_store().clear()
+        self.user = User.objects.create_user(username='suggestview', password='password123')
+        self.project = Project.objects.create(title="Garden", owner=self.user)
+        self.task = Task.objects.create(title="Plant tomatoes", project=self.project, created_by=self.user)
+
+    def test_suggestions(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:task_suggest'), {'q': 'tom'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'suggestions': [{
+            'type': 'task',
+            'label': "Plant tomatoes",
+            'url': reverse('tasks:task_detail', args=[self.task.pk]),
+        }]})
+
+    def test_requires_login(self):
+        response = self.client.get(reverse('tasks:task_suggest'), {'q': 'tom'})
+        self.assertEqual(response.status_code, 302)
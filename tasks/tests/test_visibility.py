@@ -0,0 +1,73 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from tasks.models import Project, Task, TaskVisibility
+from tasks.utils import check_task_permission
+from tasks.visibility import rebuild_task_visibility
+
+User = get_user_model()
+
+
+class TaskVisibilityTests(TestCase):
+    """Tests for keeping the TaskVisibility index in sync."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='password123')
+        self.member = User.objects.create_user(username='member', password='password123')
+        self.assignee = User.objects.create_user(username='assignee', password='password123')
+        self.outsider = User.objects.create_user(username='outsider', password='password123')
+
+        self.project = Project.objects.create(title="Project", owner=self.owner)
+        self.project.members.add(self.member)
+        self.task = Task.objects.create(title="Task", project=self.project, created_by=self.owner)
+
+    def visible_user_ids(self, task):
+        return set(TaskVisibility.objects.filter(task=task).values_list('user_id', flat=True))
+
+    def test_task_save_indexes_owner_creator_and_members(self):
+        self.assertEqual(self.visible_user_ids(self.task), {self.owner.id, self.member.id})
+
+    def test_assignment_change(self):
+        self.task.assigned_to = self.assignee
+        self.task.save()
+        self.assertIn(self.assignee.id, self.visible_user_ids(self.task))
+
+        self.task.assigned_to = None
+        self.task.save()
+        self.assertNotIn(self.assignee.id, self.visible_user_ids(self.task))
+
+    def test_membership_changes(self):
+        self.project.members.add(self.outsider)
+        self.assertIn(self.outsider.id, self.visible_user_ids(self.task))
+
+        self.project.members.remove(self.outsider)
+        self.assertNotIn(self.outsider.id, self.visible_user_ids(self.task))
+
+        self.outsider.member_projects.add(self.project)
+        self.assertIn(self.outsider.id, self.visible_user_ids(self.task))
+
+        self.project.members.clear()
+        self.assertEqual(self.visible_user_ids(self.task), {self.owner.id})
+
+    def test_ownership_change(self):
+        self.project.owner = self.outsider
+        self.project.save()
+        # The previous owner still sees the task as its creator
+        self.assertEqual(self.visible_user_ids(self.task), {self.owner.id, self.member.id, self.outsider.id})
+
+    def test_project_delete_keeps_creator_visibility(self):
+        self.project.delete()
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.project_id)
+        self.assertEqual(self.visible_user_ids(self.task), {self.owner.id})
+
+    def test_visible_to_and_permission_check(self):
+        self.assertEqual(list(Task.objects.visible_to(self.member)), [self.task])
+        self.assertFalse(Task.objects.visible_to(self.outsider).exists())
+        self.assertTrue(check_task_permission(self.member, self.task))
+        self.assertFalse(check_task_permission(self.outsider, self.task))
+
+    def test_rebuild(self):
+        TaskVisibility.objects.all().delete()
+        self.assertEqual(rebuild_task_visibility(), 1)
+        self.assertEqual(self.visible_user_ids(self.task), {self.owner.id, self.member.id})
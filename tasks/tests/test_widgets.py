@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Project, Task
+from tasks.widgets import DASHBOARD_PANELS, DASHBOARD_WIDGETS, Widget, arun_widgets, run_widgets
+
+User = get_user_model()
+
+
+def fast(view, user):
+    return 'fast'
+
+
+def slow(view, user):
+    time.sleep(0.5)
+    return 'slow'
+
+
+def broken(view, user):
+    raise ValueError("widget bug")
+
+
+WIDGETS = [
+    Widget('fast', fast),
+    Widget('slow', slow, timeout=0.05, placeholder='placeholder'),
+    Widget('broken', broken, placeholder=[]),
+]
+
+
+@override_settings(DASHBOARD_WIDGET_WORKERS=4, DASHBOARD_WIDGET_TIMEOUT=1.0)
+class WidgetRunnerTests(SimpleTestCase):
+    """Tests for concurrent widget execution and degradation."""
+
+    def assertDegraded(self, context):
+        self.assertEqual(context['fast'], 'fast')
+        self.assertEqual(context['slow'], 'placeholder')
+        self.assertEqual(context['broken'], [])
+        self.assertEqual(sorted(context['unavailable_widgets']), ['broken', 'slow'])
+
+    def test_slow_widget_does_not_block_page(self):
+        start_time = time.monotonic()
+        with self.assertLogs('performance', level='WARNING'):
+            context = run_widgets(None, None, WIDGETS)
+        self.assertLess(time.monotonic() - start_time, 0.4)
+        self.assertDegraded(context)
+
+    def test_async_slow_widget_does_not_block_page(self):
+        start_time = time.monotonic()
+        with self.assertLogs('performance', level='WARNING'):
+            context = asyncio.run(arun_widgets(None, None, WIDGETS))
+        self.assertLess(time.monotonic() - start_time, 0.4)
+        self.assertDegraded(context)
+
+    def test_widgets_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        def meet(view, user):
+            # Only returns if both widgets are running at the same time
+            return barrier.wait()
+
+        context = run_widgets(None, None, [Widget('a', meet), Widget('b', meet)])
+        self.assertEqual(context['unavailable_widgets'], [])
+
+    @override_settings(DASHBOARD_WIDGET_WORKERS=0)
+    def test_inline_mode_degrades_failures(self):
+        with self.assertLogs('performance', level='ERROR'):
+            context = run_widgets(None, None, [Widget('fast', fast), Widget('broken', broken, placeholder=[])])
+        self.assertEqual(context['fast'], 'fast')
+        self.assertEqual(context['unavailable_widgets'], ['broken'])
+
+
+class DashboardPanelTests(TestCase):
+    """Tests for the dashboard shell and its lazily loaded panels."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='widgetuser', password='password123')
+        self.project = Project.objects.create(title="Widget Project", owner=self.user)
+        self.task = Task.objects.create(title="Widget Task", project=self.project, created_by=self.user)
+        self.client.force_login(self.user)
+
+    def get_panel(self, panel, **extra):
+        return self.client.get(reverse('tasks:dashboard_panel', args=[panel]), **extra)
+
+    def test_dashboard_is_a_shell(self):
+        response = self.client.get(reverse('tasks:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('recent_tasks', response.context)
+        self.assertNotContains(response, "Widget Task")
+        for panel in DASHBOARD_PANELS:
+            self.assertContains(response, reverse('tasks:dashboard_panel', args=[panel]))
+
+    def test_panels_cover_every_widget(self):
+        names = {name for widgets, template in DASHBOARD_PANELS.values() for name in widgets}
+        self.assertEqual(names, {widget.name for widget in DASHBOARD_WIDGETS})
+
+    def test_html_panel_revalidates_with_etag(self):
+        response = self.get_panel('activity')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Widget Task")
+        self.assertEqual(response.context['recent_tasks'], [self.task])
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.get_panel('activity', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.task.title = "Renamed Task"
+        self.task.save()
+        response = self.get_panel('activity', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed Task")
+
+    def test_charts_panel_is_json(self):
+        response = self.get_panel('charts')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {'status_data', 'priority_data'})
+        self.assertIn('labels', data['status_data'])
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_unknown_panel_is_404(self):
+        self.assertEqual(self.get_panel('nope').status_code, 404)
+
+    def test_panel_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.get_panel('activity').status_code, 302)
+
+    def test_failing_widget_renders_placeholder(self):
+        index = next(i for i, widget in enumerate(DASHBOARD_WIDGETS) if widget.name == 'recent_tasks')
+        original = DASHBOARD_WIDGETS[index]
+        DASHBOARD_WIDGETS[index] = Widget('recent_tasks', broken, placeholder=[])
+        try:
+            with self.assertLogs('performance', level='ERROR'):
+                response = self.get_panel('activity')
+        finally:
+            DASHBOARD_WIDGETS[index] = original
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "temporarily unavailable")
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-store', response['Cache-Control'])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from django.views.generic import RedirectView
 from django.contrib.auth import views as auth_views
@@ -6,6 +7,19 @@ from . import views
 
 app_name = 'tasks'
 
+# Native async read views for ASGI deployments (see tasks.async_views)
+if getattr(settings, 'ASYNC_VIEWS', False):
+    from . import async_views
+    dashboard_view = async_views.AsyncDashboardView.as_view()
+    dashboard_panel_view = async_views.AsyncDashboardPanelView.as_view()
+    task_list_view = async_views.AsyncTaskListView.as_view()
+    task_detail_view = async_views.AsyncTaskDetailView.as_view()
+else:
+    dashboard_view = views.DashboardView.as_view()
+    dashboard_panel_view = views.DashboardPanelView.as_view()
+    task_list_view = views.TaskListView.as_view()
+    task_detail_view = views.TaskDetailView.as_view()
+
 auth_patterns = [
     path('login/', views.CustomLoginView.as_view(), name='login'),
     path('register/', views.RegisterView.as_view(), name='register'),
@@ -53,15 +67,18 @@ project_patterns = [
     path('', views.ProjectListView.as_view(), name='project_list'),
     path('new/', views.ProjectCreateView.as_view(), name='project_create'),
     path('<int:pk>/', views.ProjectDetailView.as_view(), name='project_detail'),
+    path('<int:pk>/board/', views.ProjectBoardView.as_view(), name='project_board'),
     path('<int:pk>/edit/', views.ProjectUpdateView.as_view(), name='project_update'),
     path('<int:pk>/delete/', views.ProjectDeleteView.as_view(), name='project_delete'),
 ]
 
 # Task URLs
 task_patterns = [
-    path('', views.TaskListView.as_view(), name='task_list'),
+    path('', task_list_view, name='task_list'),
     path('new/', views.TaskCreateView.as_view(), name='task_create'),
-    path('<int:pk>/', views.TaskDetailView.as_view(), name='task_detail'),
+    path('suggest/', views.TaskSuggestView.as_view(), name='task_suggest'),
+    path('update-status/', views.TaskBulkStatusUpdateView.as_view(), name='task_bulk_update_status'),
+    path('<int:pk>/', task_detail_view, name='task_detail'),
     path('<int:pk>/edit/', views.TaskUpdateView.as_view(), name='task_update'),
     path('<int:pk>/delete/', views.TaskDeleteView.as_view(), name='task_delete'),
     
@@ -79,7 +96,8 @@ category_patterns = [
 ]
 
 urlpatterns = [
-    path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/', dashboard_view, name='dashboard'),
+    path('dashboard/panels/<slug:panel>/', dashboard_panel_view, name='dashboard_panel'),
     
     path('auth/', include(auth_patterns)),
     
@@ -88,5 +106,7 @@ urlpatterns = [
     path('tasks/', include(task_patterns)),
     
     path('categories/', include(category_patterns)),
+    
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 ]
 
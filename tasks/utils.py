@@ -1,5 +1,9 @@
 import os
+import time
+import threading
 import mimetypes
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
@@ -114,25 +118,270 @@ def custom_ratelimit(key_func, rate, method=None, block=True):
         return wrapped_view
     return decorator
 
-# Permission check helper function
+# Request-scoped memoization: the memo store set by RequestMemoMiddleware for
+# the current request, or None outside a request (commands, shell, tasks)
+_request_memo = ContextVar('request_memo', default=None)
+
+@contextmanager
+def request_memo_scope(store=None):
+    """Activate a memo store for the duration of the block, then clear it."""
+    store = {} if store is None else store
+    token = _request_memo.set(store)
+    try:
+        yield store
+    finally:
+        _request_memo.reset(token)
+        store.clear()
+
+def request_memoize(key, compute):
+    """
+    Return compute() memoized in the current request's memo store.
+    Outside a request scope the value is simply computed.
+    """
+    store = _request_memo.get()
+    if store is None:
+        return compute()
+    try:
+        return store[key]
+    except KeyError:
+        value = store[key] = compute()
+        return value
+
+async def arequest_memoize(key, compute):
+    """request_memoize() for async callers; compute is a coroutine function."""
+    store = _request_memo.get()
+    if store is None:
+        return await compute()
+    try:
+        return store[key]
+    except KeyError:
+        value = store[key] = await compute()
+        return value
+
+def clear_request_memo():
+    """Drop everything memoized so far in the current request."""
+    store = _request_memo.get()
+    if store is not None:
+        store.clear()
+
+# Permission check helper functions
 def check_task_permission(user, task):
-    """Check if a user has permission to view/edit a task."""
-    return (
-        task.project.owner == user or
-        task.created_by == user or
-        (task.assigned_to and task.assigned_to == user) or
-        task.project.members.filter(id=user.id).exists()
+    """
+    Check if a user has permission to view/edit a task.
+    
+    Resolved with a single indexed lookup against the TaskVisibility table,
+    which covers ownership, creation, assignment and project membership.
+    """
+    from .models import TaskVisibility
+    return request_memoize(
+        ('task_permission', user.id, task.id),
+        lambda: TaskVisibility.objects.filter(user_id=user.id, task_id=task.id).exists(),
+    )
+
+def check_project_permission(user, project):
+    """Check if a user owns or is a member of a project."""
+    return request_memoize(
+        ('project_permission', user.id, project.id),
+        lambda: project.owner_id == user.id or project.members.filter(id=user.id).exists(),
+    )
+
+async def acheck_task_permission(user, task):
+    """Async check_task_permission(), sharing its request memo entry."""
+    from .models import TaskVisibility
+    return await arequest_memoize(
+        ('task_permission', user.id, task.id),
+        lambda: TaskVisibility.objects.filter(user_id=user.id, task_id=task.id).aexists(),
     )
 
 # Cache utilities
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from django.apps import apps as django_apps
 from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
 from django.conf import settings
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
 from functools import wraps
 
+# Version counters live longer than any cached value; if one is evicted it is
+# re-seeded from the clock, which simply invalidates the entries it guarded.
+GENERATION_TTL = 60 * 60 * 24
+
+def get_cache_generation(name):
+    """
+    Get the current generation number for a named group of cache entries.
+    Entries keyed with the generation are invalidated all at once by
+    bump_cache_generation(), without scanning or deleting keys.
+    """
+    key = f"generation:{name}"
+    generation = cache.get(key)
+    if generation is None:
+        # Seed with a timestamp so an evicted counter never resurrects old entries
+        cache.add(key, int(time.time() * 1000), GENERATION_TTL)
+        generation = cache.get(key)
+    return generation
+
+def bump_cache_generation(name):
+    """Move a named group of cache entries to a new generation."""
+    # Values memoized earlier in this request may depend on the invalidated data
+    clear_request_memo()
+    key = f"generation:{name}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), GENERATION_TTL)
+        return cache.get(key)
+
+def _instance_version_name(model_name, pk):
+    return f"{model_name}:{pk}"
+
+def _user_version_name(user_id):
+    return f"user:{user_id}"
+
+# Stampede protection: entries stay readable for STALE_GRACE seconds past their
+# timeout. The first worker to see an expired entry takes a short lock and
+# recomputes it while the others keep serving the stale value; on a cold miss
+# the others wait up to LOCK_WAIT seconds for the lock holder's result. The
+# lock stores a token unique to its holder, who alone releases it.
+STALE_GRACE = 60 * 5
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+
+# Returned by cache.get() for absent keys, so cached None/empty values are hits
+_MISSING = object()
+
+@dataclass(frozen=True)
+class CacheEnvelope:
+    """A cached value together with when and how expensively it was computed."""
+    value: object
+    computed_at: float
+    duration: float
+    fresh_until: float
+    
+    @property
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+_cache_stats = defaultdict(lambda: {
+    'hits': 0, 'misses': 0, 'stale': 0, 'recomputes': 0,
+    'compute_time': 0.0, 'time_saved': 0.0,
+})
+_cache_stats_lock = threading.Lock()
+
+def _record_cache_event(name, event, seconds=None):
+    with _cache_stats_lock:
+        stats = _cache_stats[name]
+        stats[event] += 1
+        if seconds is not None:
+            stats['compute_time' if event == 'recomputes' else 'time_saved'] += seconds
+
+def get_cache_stats():
+    """Per-method hit, miss, stale and recompute counters for this process."""
+    with _cache_stats_lock:
+        return {name: dict(counts) for name, counts in _cache_stats.items()}
+
+def reset_cache_stats():
+    with _cache_stats_lock:
+        _cache_stats.clear()
+
+def get_cache_efficiency_report():
+    """
+    Rank cached methods by hit rate, then by compute time saved.
+    Stale serves count as hits; time saved is the recorded compute duration
+    of every entry served from cache.
+    """
+    rows = []
+    for name, stats in get_cache_stats().items():
+        served = stats['hits'] + stats['stale']
+        lookups = served + stats['misses']
+        rows.append({
+            'name': name,
+            'lookups': lookups,
+            'hits': stats['hits'],
+            'stale': stats['stale'],
+            'misses': stats['misses'],
+            'recomputes': stats['recomputes'],
+            'hit_rate': served / lookups if lookups else 0.0,
+            'avg_compute_time': stats['compute_time'] / stats['recomputes'] if stats['recomputes'] else 0.0,
+            'time_saved': stats['time_saved'],
+        })
+    rows.sort(key=lambda row: (row['hit_rate'], row['time_saved']), reverse=True)
+    return rows
+
+def _compute_and_store(cache_key, compute, timeout, name):
+    started = time.time()
+    value = compute()
+    duration = time.time() - started
+    envelope = CacheEnvelope(value, started, duration, started + duration + timeout)
+    cache.set(cache_key, envelope, timeout + STALE_GRACE)
+    _record_cache_event(name, 'recomputes', duration)
+    return value
+
+def _get_envelope(cache_key):
+    entry = cache.get(cache_key, _MISSING)
+    # Anything else (e.g. an entry written by an older release) is treated as absent
+    return entry if isinstance(entry, CacheEnvelope) else _MISSING
+
+def _acquire_lock(lock_key):
+    """Take the recompute lock; returns the token that owns it, or None."""
+    token = uuid.uuid4().hex
+    return token if cache.add(lock_key, token, LOCK_TIMEOUT) else None
+
+def _release_lock(lock_key, token):
+    # A computation outliving LOCK_TIMEOUT may find the lock expired and
+    # taken by another worker; deleting it then would let the stampede back in
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+def get_or_compute(cache_key, compute, timeout=None, name=None):
+    """
+    Return the cached value for cache_key, computing it with compute() when
+    needed. Only the worker holding the key's lock recomputes; concurrent
+    callers get the stale value, or wait briefly for a cold key to be filled.
+    None and empty results are cached like any other value.
+    """
+    timeout = timeout if timeout is not None else getattr(settings, 'CACHE_TTL', 60 * 15)
+    name = name or cache_key
+    lock_key = f"lock:{cache_key}"
+    envelope = _get_envelope(cache_key)
+    
+    if envelope is not _MISSING:
+        if envelope.is_fresh:
+            _record_cache_event(name, 'hits', envelope.duration)
+            return envelope.value
+        token = _acquire_lock(lock_key)
+        if token is None:
+            # Someone else is already refreshing this key
+            _record_cache_event(name, 'stale', envelope.duration)
+            return envelope.value
+    else:
+        token = _acquire_lock(lock_key)
+        if token is None:
+            deadline = time.time() + LOCK_WAIT
+            while time.time() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                envelope = _get_envelope(cache_key)
+                if envelope is not _MISSING:
+                    # Served the lock holder's result without computing it
+                    _record_cache_event(name, 'hits', envelope.duration)
+                    return envelope.value
+            # The lock holder is too slow or died; compute without the lock
+            _record_cache_event(name, 'misses')
+            return _compute_and_store(cache_key, compute, timeout, name)
+    
+    _record_cache_event(name, 'misses')
+    try:
+        return _compute_and_store(cache_key, compute, timeout, name)
+    finally:
+        _release_lock(lock_key, token)
+
 def cached_property(timeout=None):
     """
     Decorator for caching expensive model property methods.
-    Caches the result with a key based on the model's ID and method name.
+    Caches the result with a key based on the model's ID, method name and the
+    instance's cache version, so invalidate_model_cache() works on every backend.
     
     Example:
         @cached_property(timeout=300)
@@ -144,40 +393,60 @@ def cached_property(timeout=None):
         @property
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            # Use class name, method name and ID to create a unique cache key
-            cache_key = f"{self.__class__.__name__}:{self.id}:{func.__name__}"
-            result = cache.get(cache_key)
-            
-            if result is None:
-                result = func(self, *args, **kwargs)
-                # Use the default TTL if timeout is None
-                cache_ttl = timeout if timeout is not None else getattr(settings, 'CACHE_TTL', 60 * 15)
-                cache.set(cache_key, result, cache_ttl)
-                
-            return result
+            # Use class name, method name, ID and version to create a unique cache key
+            model_name = self.__class__.__name__
+            version = get_cache_generation(_instance_version_name(model_name, self.id))
+            cache_key = f"{model_name}:{self.id}:{func.__name__}:v{version}"
+            return get_or_compute(
+                cache_key, lambda: func(self, *args, **kwargs), timeout,
+                name=f"{model_name}.{func.__name__}",
+            )
         return wrapper
     return decorator
 
-def cached_view_data(timeout=None):
+def get_cache_generations(*names):
+    """Fetch several generation counters in one cache round trip."""
+    keys = {f"generation:{name}": name for name in names}
+    found = cache.get_many(list(keys))
+    return [found[key] if key in found else get_cache_generation(name) for key, name in keys.items()]
+
+def cached_view_data(timeout=None, depends_on=None):
     """
     Decorator for caching expensive view methods.
-    Caches based on user ID and optional additional keys.
+    Caches based on user ID, the user's cache version and optional additional keys.
+    
+    ``depends_on`` maps model labels to the user relations on that model whose
+    users see a different result when an instance changes. Each relation is a
+    dotted attribute path resolving to a user ID, a user, or a many-to-many
+    manager of users. Saves, deletes and m2m changes on those models then
+    invalidate exactly the affected users' entries for this method.
     
     Example:
-        @cached_view_data(timeout=300)
+        @cached_view_data(timeout=300, depends_on={
+            'tasks.Task': ('assigned_to_id', 'created_by_id'),
+            'tasks.TaskComment': ('task.assigned_to_id',),
+        })
         def get_expensive_data(self, user_id, *extra_key_parts):
             # complex data processing
             return data
     """
     def decorator(func):
+        if depends_on:
+            register_view_cache_dependencies(func.__name__, depends_on)
+        
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             # Generate a cache key including all args for uniqueness
             parts = [func.__name__]
             
-            # If we have a request with a user, use that as part of the key
+            # If we have a request with a user, use that and the user's versions as part of the key
             if hasattr(self, 'request') and hasattr(self.request, 'user') and self.request.user.is_authenticated:
-                parts.append(f"user:{self.request.user.id}")
+                user_id = self.request.user.id
+                user_version, view_version = get_cache_generations(
+                    _user_version_name(user_id), _view_version_name(func.__name__, user_id)
+                )
+                parts.append(f"user:{user_id}")
+                parts.append(f"v{user_version}.{view_version}")
                 
             # Add any other args as part of the key
             for arg in args:
@@ -189,31 +458,163 @@ def cached_view_data(timeout=None):
                     parts.append(f"{key}:{value}")
             
             cache_key = ":".join(parts)
-            result = cache.get(cache_key)
-            
-            if result is None:
-                result = func(self, *args, **kwargs)
-                # Use the default TTL if timeout is None
-                cache_ttl = timeout if timeout is not None else getattr(settings, 'CACHE_TTL', 60 * 15)
-                cache.set(cache_key, result, cache_ttl)
-                
-            return result
-        return wrapper
+            return get_or_compute(
+                cache_key, lambda: func(self, *args, **kwargs), timeout, name=func.__name__,
+            )
+        
+        @wraps(func)
+        def memoized_wrapper(self, *args, **kwargs):
+            # Repeat calls within one request skip even the cache round trips
+            request = getattr(self, 'request', None)
+            user_id = getattr(getattr(request, 'user', None), 'id', None)
+            memo_key = (
+                'view_data', func.__name__, user_id,
+                tuple(str(arg) for arg in args), tuple(f"{key}:{value}" for key, value in kwargs.items()),
+            )
+            return request_memoize(memo_key, lambda: wrapper(self, *args, **kwargs))
+        return memoized_wrapper
     return decorator
 
-def invalidate_model_cache(instance):
+def _view_version_name(method_name, user_id):
+    return f"view:{method_name}:user:{user_id}"
+
+def invalidate_view_cache(method_name, *user_ids):
+    """Invalidate one cached_view_data method's entries for the given users."""
+    for user_id in set(user_ids):
+        if user_id:
+            bump_cache_generation(_view_version_name(method_name, user_id))
+
+# Dependency registry for cached_view_data: model label -> [(method name, relation paths)]
+_view_cache_dependencies = defaultdict(list)
+
+def register_view_cache_dependencies(method_name, depends_on):
+    """Record which models and user relations a cached view method depends on."""
+    for label, paths in depends_on.items():
+        _view_cache_dependencies[label].append((method_name, tuple(paths)))
+        app_label, model_name = label.split('.')
+        # Connect once the model class is available, even if it is not loaded yet
+        django_apps.lazy_model_operation(_connect_view_cache_signals, (app_label, model_name.lower()))
+
+def _connect_view_cache_signals(model):
+    label = model._meta.label
+    post_init.connect(_snapshot_view_cache_relations, sender=model, weak=False,
+                      dispatch_uid=f"view_cache_init:{label}")
+    post_save.connect(_invalidate_view_cache_dependents, sender=model, weak=False,
+                      dispatch_uid=f"view_cache_save:{label}")
+    pre_delete.connect(_snapshot_view_cache_before_delete, sender=model, weak=False,
+                       dispatch_uid=f"view_cache_pre_delete:{label}")
+    post_delete.connect(_invalidate_view_cache_dependents, sender=model, weak=False,
+                        dispatch_uid=f"view_cache_delete:{label}")
+    for field_name in _m2m_paths(model):
+        through = model._meta.get_field(field_name).remote_field.through
+        m2m_changed.connect(_invalidate_view_cache_m2m, sender=through, weak=False,
+                            dispatch_uid=f"view_cache_m2m:{label}.{field_name}")
+
+def _dependency_paths(model):
+    return {path for _, paths in _view_cache_dependencies[model._meta.label] for path in paths}
+
+def _m2m_paths(model):
+    m2m_names = {field.name for field in model._meta.many_to_many}
+    return {path for path in _dependency_paths(model) if path in m2m_names}
+
+def _resolve_user_ids(instance, path):
+    """Follow a dotted attribute path and return the user IDs it points to."""
+    value = instance
+    for attr in path.split('.'):
+        try:
+            value = getattr(value, attr)
+        except ObjectDoesNotExist:
+            return set()
+        if value is None:
+            return set()
+    if hasattr(value, 'values_list'):
+        return set(value.values_list('pk', flat=True))
+    return {getattr(value, 'pk', value)}
+
+def _snapshot_view_cache_relations(sender, instance, **kwargs):
+    # Only plain local fields, read from __dict__ so nothing is queried or loaded
+    instance._view_cache_initial = {
+        path: instance.__dict__.get(path)
+        for path in _dependency_paths(sender) if '.' not in path
+    }
+
+def _snapshot_view_cache_before_delete(sender, instance, **kwargs):
+    # Related rows (m2m links, cascaded parents) may be gone by post_delete
+    instance._view_cache_deleted = {
+        path: _resolve_user_ids(instance, path) for path in _dependency_paths(sender)
+    }
+
+def _invalidate_view_cache_dependents(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    deleted = getattr(instance, '_view_cache_deleted', None)
+    initial = getattr(instance, '_view_cache_initial', {})
+    resolved = {}
+    
+    for method_name, paths in _view_cache_dependencies[sender._meta.label]:
+        user_ids = set()
+        for path in paths:
+            if path not in resolved:
+                if deleted is not None:
+                    resolved[path] = deleted.get(path, set())
+                else:
+                    resolved[path] = _resolve_user_ids(instance, path) | {initial.get(path)}
+            user_ids |= resolved[path]
+        invalidate_view_cache(method_name, *user_ids)
+    
+    _snapshot_view_cache_relations(sender, instance)
+
+def _invalidate_view_cache_m2m(sender, instance, action, reverse, model, pk_set, **kwargs):
+    owner_model = model if reverse else type(instance)
+    field_names = {
+        field.name for field in owner_model._meta.many_to_many
+        if field.remote_field.through is sender
+    }
+    
+    if action == 'pre_clear' and not reverse:
+        instance._view_cache_cleared = {
+            name: _resolve_user_ids(instance, name) for name in field_names
+        }
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    
+    for method_name, paths in _view_cache_dependencies[owner_model._meta.label]:
+        for name in field_names.intersection(paths):
+            if reverse:
+                # The instance is the related user itself
+                user_ids = {instance.pk}
+            elif action == 'post_clear':
+                user_ids = getattr(instance, '_view_cache_cleared', {}).get(name, set())
+            else:
+                user_ids = pk_set
+            invalidate_view_cache(method_name, *user_ids)
+
+def invalidate_view_cache_dependents(model, instances):
     """
-    Invalidate all cached properties for a model instance.
-    Call this in model save() and delete() methods.
+    Invalidate the cached_view_data entries depending on changed instances of
+    model, for writes that emit no signals such as QuerySet.bulk_update().
     """
-    # Create a pattern that matches all cached properties for this instance
-    pattern = f"{instance.__class__.__name__}:{instance.id}:*"
-    
-    # Get all keys matching the pattern and delete them
-    if hasattr(cache, 'delete_pattern'):
-        # For backends that support pattern deletion (like redis)
-        cache.delete_pattern(pattern)
-    else:
-        # Fallback for backends that don't support pattern deletion
-        # For proper implementation, you'd need to track the keys elsewhere
-        pass
+    user_ids = defaultdict(set)
+    for instance in instances:
+        for method_name, paths in _view_cache_dependencies[model._meta.label]:
+            for path in paths:
+                user_ids[method_name] |= _resolve_user_ids(instance, path)
+    for method_name, ids in user_ids.items():
+        invalidate_view_cache(method_name, *ids)
+
+def invalidate_model_cache(instance, pk=None):
+    """
+    Invalidate all cached properties for a model instance by bumping its version.
+    Accepts either an instance, or a model class plus primary key.
+    Call this in model save() and delete() methods or from signal handlers.
+    """
+    model_name = instance.__name__ if isinstance(instance, type) else instance.__class__.__name__
+    pk = pk if pk is not None else instance.pk
+    bump_cache_generation(_instance_version_name(model_name, pk))
+
+def invalidate_user_cache(*user_ids):
+    """Invalidate all cached_view_data entries for the given users by bumping their versions."""
+    for user_id in set(user_ids):
+        if user_id:
+            bump_cache_generation(_user_version_name(user_id))
@@ -7,11 +7,10 @@ from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import login
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseRedirect
-from django.db.models import Q, Count, Case, When, IntegerField
+from django.http import JsonResponse, HttpResponse, HttpResponseRedirect
+from django.db.models import Q
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -19,15 +18,26 @@ from django.core.paginator import Paginator
 from django.db import transaction
 import json
 import logging
-from datetime import timedelta
 
-from .models import Task, Project, Category, CustomUser, TaskComment, TaskAttachment
+from .models import Task, Project, Category, CustomUser, TaskAttachment
 from .forms import (
     TaskForm, ProjectForm, CategoryForm, CustomUserCreationForm,
     CustomAuthenticationForm, TaskCommentForm, TaskAttachmentForm, TaskFilterForm
 )
-from .choices import TaskStatus, TaskPriority
-from .utils import custom_ratelimit, check_task_permission, cached_view_data
+from .choices import TaskStatus
+from .utils import (
+    custom_ratelimit, check_task_permission, check_project_permission, cached_view_data, request_memoize,
+)
+from .sensitivity import sensitive
+from .stats import get_task_stats
+from .pagination import KeysetPaginationMixin, order_by_keyset
+from .search import search_tasks
+from .suggest import get_suggestions, suggestion_url
+from .widgets import get_panel_widgets, panel_response, run_widgets
+from .boards import ProjectBoard
+from .bulk import MAX_BULK_STATUS_UPDATES, update_task_statuses
+from .category_tree import get_category_hierarchy
+from .metrics import get_registry as get_metrics_registry, render_prometheus
 
 # Configure loggers
 logging.basicConfig(level=logging.INFO)
@@ -53,105 +63,71 @@ class OwnershipRequiredMixin(UserPassesTestMixin):
         obj = self.get_object()
         
         if isinstance(obj, Project):
-            return (obj.owner == self.request.user or 
-                    obj.members.filter(id=self.request.user.id).exists())
+            return check_project_permission(self.request.user, obj)
         
         elif isinstance(obj, Task):
-            return (obj.project.owner == self.request.user or
-                    obj.created_by == self.request.user or
-                    (obj.assigned_to and obj.assigned_to == self.request.user) or
-                    obj.project.members.filter(id=self.request.user.id).exists())
+            return check_task_permission(self.request.user, obj)
         
         return obj.user == self.request.user
+    
+    def get_object(self, queryset=None):
+        """Fetch the object once per request; test_func and the view share it."""
+        if queryset is not None:
+            return super().get_object(queryset)
+        key = ('object', self.__class__.__name__, tuple(sorted(self.kwargs.items())))
+        return request_memoize(key, lambda: super(OwnershipRequiredMixin, self).get_object())
 
 
+# The models each cached context method depends on are registered in
+# tasks.signals, which every process imports
 class TaskManagerContextMixin:
     """Mixin to add common context data to views with performance optimizations."""
     
-    @cached_view_data(timeout=300)  # Cache for 5 minutes
+    @cached_view_data(timeout=60 * 60 * 6)  # Cache for 6 hours
     def get_user_projects(self, user_id):
         """Get user's projects with optimized query and caching."""
         return list(Project.objects.filter(
             Q(owner_id=user_id) | Q(members=user_id)
         ).select_related('owner').prefetch_related('members').distinct())
     
-    @cached_view_data(timeout=60)  # Cache for 1 minute
+    # Due today/overdue also change with the clock, which no signal reports
+    @cached_view_data(timeout=60 * 15)  # Cache for 15 minutes
+    def get_task_stats(self, user_id):
+        """Get all task counters for the user from a single aggregate query."""
+        return get_task_stats(user_id)
+    
     def get_due_today_count(self, user_id):
-        """Get count of tasks due today with caching."""
-        today = timezone.now().date()
-        return Task.objects.filter(
-            Q(assigned_to_id=user_id) | Q(created_by_id=user_id),
-            deadline__date=today,
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).count()
-    
-    @cached_view_data(timeout=60)  # Cache for 1 minute
+        """Get count of tasks due today."""
+        return self.get_task_stats(user_id).due_today
+    
     def get_overdue_tasks_count(self, user_id):
-        """Get count of overdue tasks with caching."""
-        return Task.objects.filter(
-            Q(assigned_to_id=user_id) | Q(created_by_id=user_id),
-            deadline__lt=timezone.now(),
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).count()
-    
-    @cached_view_data(timeout=120)  # Cache for 2 minutes
+        """Get count of overdue tasks."""
+        return self.get_task_stats(user_id).overdue
+    
     def get_status_counts(self, user_id):
-        """Get task status distribution with caching."""
-        status_counts = Task.objects.filter(
-            Q(assigned_to_id=user_id) | Q(created_by_id=user_id)
-        ).values('status').annotate(count=Count('id'))
-        
-        return {item['status']: item['count'] for item in status_counts}
-    
-    @cached_view_data(timeout=300)  # Cache for 5 minutes
-    def get_recent_activities(self, user_id):
-        """Get recent activities for dashboard with optimized query."""
-        # Get user's most recent updated tasks
-        recent_tasks = Task.objects.filter(
-            Q(assigned_to_id=user_id) | Q(created_by_id=user_id)
-        ).select_related(
-            'project', 'category', 'assigned_to', 'created_by'
-        ).order_by('-updated_at')[:5]
-        
-        # Get recent comments on user's tasks
-        user_task_ids = Task.objects.filter(
-            Q(assigned_to_id=user_id) | Q(created_by_id=user_id)
-        ).values_list('id', flat=True)
-        
-        recent_comments = TaskComment.objects.filter(
-            task_id__in=user_task_ids
-        ).select_related(
-            'user', 'task'
-        ).order_by('-created_at')[:5]
-        
+        """Get task status distribution."""
+        return self.get_task_stats(user_id).status_counts
+    
+    def get_shared_context(self, user_id):
+        """Sidebar and counter context shared by all task manager pages."""
+        # Use cached methods for expensive computations
         return {
-            'recent_tasks': list(recent_tasks),
-            'recent_comments': list(recent_comments),
+            'user_projects': self.get_user_projects(user_id),
+            'due_today': self.get_due_today_count(user_id),
+            'overdue_tasks': self.get_overdue_tasks_count(user_id),
+            'status_counts': self.get_status_counts(user_id),
         }
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         if self.request.user.is_authenticated:
-            user_id = self.request.user.id
-            
-            # Use cached methods for expensive computations
-            context['user_projects'] = self.get_user_projects(user_id)
-            context['due_today'] = self.get_due_today_count(user_id)
-            context['overdue_tasks'] = self.get_overdue_tasks_count(user_id)
-            context['status_counts'] = self.get_status_counts(user_id)
-            
-            # Add more context data if this is the dashboard view
-            if getattr(self, 'template_name', '') == 'tasks/dashboard.html':
-                activities = self.get_recent_activities(user_id)
-                context.update({
-                    'recent_tasks': activities['recent_tasks'],
-                    'recent_comments': activities['recent_comments'],
-                })
+            context.update(self.get_shared_context(self.request.user.id))
         
         return context
 
 
+@sensitive('security', 'audit_sensitive', 'login')
 class CustomLoginView(LoginView):
     form_class = CustomAuthenticationForm
     template_name = 'tasks/auth/login.html'
@@ -165,6 +141,7 @@ class CustomLoginView(LoginView):
         return super().form_valid(form)
 
 
+@sensitive('security', 'audit_sensitive')
 class RegisterView(FormView):
     template_name = 'tasks/auth/register.html'
     form_class = CustomUserCreationForm
@@ -192,67 +169,31 @@ class CustomLogoutView(LogoutView):
 
 
 class DashboardView(LoginRequiredMixin, TaskManagerContextMixin, TemplateView):
+    """The dashboard shell; main.js loads its panels from DashboardPanelView."""
     template_name = 'tasks/dashboard.html'
+
+
+class DashboardPanelView(LoginRequiredMixin, TaskManagerContextMixin, View):
+    """One dashboard panel as an HTML fragment or JSON, fetched by main.js."""
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        user = self.request.user
-        today = timezone.now().date()
-        
-        context['recent_projects'] = Project.objects.filter(
-            Q(owner=user) | Q(members=user)
-        ).order_by('-updated_at')[:5]
-        
-        soon = today + timedelta(days=3)
-        context['upcoming_tasks'] = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user),
-            deadline__date__range=[today, soon],
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).order_by('deadline')[:10]
-        
-        context['recent_tasks'] = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user) | Q(project__owner=user)
-        ).order_by('-updated_at')[:10]
-        
-        context['priority_tasks'] = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user),
-            priority__in=[TaskPriority.HIGH, TaskPriority.URGENT],
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).order_by('-priority', 'deadline')[:5]
-        
-        tasks_by_status = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user)
-        ).values('status').annotate(count=Count('id'))
-        
-        context['status_data'] = {
-            'labels': [dict(TaskStatus.CHOICES)[status['status']] for status in tasks_by_status],
-            'data': [status['count'] for status in tasks_by_status],
-        }
-        
-        tasks_by_priority = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user),
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).values('priority').annotate(count=Count('id'))
-        
-        context['priority_data'] = {
-            'labels': [dict(TaskPriority.CHOICES)[priority['priority']] for priority in tasks_by_priority],
-            'data': [priority['count'] for priority in tasks_by_priority],
-        }
-        
-        return context
+    def get(self, request, panel):
+        # The panel's widgets run concurrently; a slow or failing one renders
+        # as a placeholder (see tasks.widgets)
+        context = run_widgets(self, request.user, get_panel_widgets(panel))
+        return panel_response(request, panel, context)
 
 
-class ProjectListView(LoginRequiredMixin, TaskManagerContextMixin, ListView):
+class ProjectListView(LoginRequiredMixin, KeysetPaginationMixin, TaskManagerContextMixin, ListView):
     model = Project
     template_name = 'tasks/project/project_list.html'
     context_object_name = 'projects'
     paginate_by = 10
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         return Project.objects.filter(
             Q(owner=self.request.user) | Q(members=self.request.user)
-        ).distinct().order_by('-created_at')
+        ).distinct().order_by('-created_at', '-id')
 
 
 class ProjectDetailView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerContextMixin, DetailView):
@@ -262,31 +203,19 @@ class ProjectDetailView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerC
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        project = self.get_object()
-        
-        tasks = project.tasks.all()
-        
-        context['todo_tasks'] = tasks.filter(status=TaskStatus.TODO)
-        context['in_progress_tasks'] = tasks.filter(status=TaskStatus.IN_PROGRESS)
-        context['review_tasks'] = tasks.filter(status=TaskStatus.REVIEW)
-        context['completed_tasks'] = tasks.filter(status=TaskStatus.COMPLETED)
-        
-        members = project.members.all()
-        member_stats = []
-        
-        for member in members:
-            member_tasks = tasks.filter(assigned_to=member)
-            member_stats.append({
-                'user': member,
-                'task_count': member_tasks.count(),
-                'completed': member_tasks.filter(status=TaskStatus.COMPLETED).count()
-            })
-        
-        context['member_stats'] = member_stats
-        
+        context.update(ProjectBoard.for_project(self.object).get_context())
         return context
 
 
+class ProjectBoardView(LoginRequiredMixin, OwnershipRequiredMixin, DetailView):
+    """JSON representation of a project's task board and member statistics."""
+    model = Project
+    
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(ProjectBoard.for_project(self.object).as_dict())
+
+
+@sensitive('sensitive_operation')
 class ProjectCreateView(LoginRequiredMixin, TaskManagerContextMixin, CreateView):
     model = Project
     form_class = ProjectForm
@@ -302,6 +231,7 @@ class ProjectCreateView(LoginRequiredMixin, TaskManagerContextMixin, CreateView)
         return reverse_lazy('tasks:project_detail', kwargs={'pk': self.object.pk})
 
 
+@sensitive('sensitive_operation')
 class ProjectUpdateView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerContextMixin, UpdateView):
     model = Project
     form_class = ProjectForm
@@ -317,6 +247,7 @@ class ProjectUpdateView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerC
         return reverse_lazy('tasks:project_detail', kwargs={'pk': self.object.pk})
 
 
+@sensitive('sensitive_operation')
 class ProjectDeleteView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerContextMixin, DeleteView):
     model = Project
     template_name = 'tasks/project/project_confirm_delete.html'
@@ -328,86 +259,86 @@ class ProjectDeleteView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerC
         return super().delete(request, *args, **kwargs)
 
 
-class TaskListView(LoginRequiredMixin, TaskManagerContextMixin, ListView):
+# Sort key of the task lists: urgent first, then by deadline (none last),
+# newest first; id makes it total for keyset pagination. KeysetPaginator
+# orders it as task_list_order_idx on Task is defined.
+TASK_LIST_ORDERING = ('priority_rank', 'deadline', '-created_at', 'id')
+
+
+def filter_tasks(user, params):
+    """Tasks visible to the user, filtered by TaskFilterForm params and sorted by priority."""
+    queryset = Task.objects.visible_to(user)
+    leading = []
+    
+    form = TaskFilterForm(params)
+    if form.is_valid():
+        status_filters = form.cleaned_data.get('status')
+        if status_filters:
+            queryset = queryset.filter(status__in=status_filters)
+        
+        priority_filters = form.cleaned_data.get('priority')
+        if priority_filters:
+            queryset = queryset.filter(priority__in=priority_filters)
+        
+        categories = form.cleaned_data.get('category')
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+        
+        assigned_to = form.cleaned_data.get('assigned_to')
+        if assigned_to:
+            queryset = queryset.filter(assigned_to=assigned_to)
+        
+        deadline_from = form.cleaned_data.get('deadline_from')
+        deadline_to = form.cleaned_data.get('deadline_to')
+        
+        if deadline_from:
+            queryset = queryset.filter(deadline__date__gte=deadline_from)
+        if deadline_to:
+            queryset = queryset.filter(deadline__date__lte=deadline_to)
+        
+        search_query = form.cleaned_data.get('search')
+        if search_query:
+            # Full-text index lookup, best matches first (see tasks.search)
+            queryset = search_tasks(queryset, search_query)
+            leading.append('-search_rank')
+    
+    return order_by_keyset(queryset, TASK_LIST_ORDERING, *leading)
+
+
+class TaskSuggestView(LoginRequiredMixin, View):
+    """Typeahead suggestions for the task search box, served from memory (see tasks.suggest)."""
+    
+    def get(self, request):
+        query = request.GET.get('q', '')
+        return JsonResponse({'suggestions': [
+            {'type': entry.kind, 'label': entry.label, 'url': suggestion_url(entry)}
+            for entry in get_suggestions(request.user, query)
+        ]})
+
+
+class TaskListView(LoginRequiredMixin, KeysetPaginationMixin, TaskManagerContextMixin, ListView):
     model = Task
     template_name = 'tasks/task/task_list.html'
     context_object_name = 'tasks'
     paginate_by = 15
+    keyset_ordering = TASK_LIST_ORDERING
     
     def get_queryset(self):
-        user = self.request.user
-        
-        queryset = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user) | 
-            Q(project__owner=user) | Q(project__members=user)
-        ).distinct()
-        
-        form = TaskFilterForm(self.request.GET)
-        if form.is_valid():
-            status_filters = form.cleaned_data.get('status')
-            if status_filters:
-                queryset = queryset.filter(status__in=status_filters)
-            
-            priority_filters = form.cleaned_data.get('priority')
-            if priority_filters:
-                queryset = queryset.filter(priority__in=priority_filters)
-            
-            categories = form.cleaned_data.get('category')
-            if categories:
-                queryset = queryset.filter(category__in=categories)
-            
-            assigned_to = form.cleaned_data.get('assigned_to')
-            if assigned_to:
-                queryset = queryset.filter(assigned_to=assigned_to)
-            
-            deadline_from = form.cleaned_data.get('deadline_from')
-            deadline_to = form.cleaned_data.get('deadline_to')
-            
-            if deadline_from:
-                queryset = queryset.filter(deadline__date__gte=deadline_from)
-            if deadline_to:
-                queryset = queryset.filter(deadline__date__lte=deadline_to)
-            
-            search_query = form.cleaned_data.get('search')
-            if search_query:
-                queryset = queryset.filter(
-                    Q(title__icontains=search_query) |
-                    Q(description__icontains=search_query) |
-                    Q(project__title__icontains=search_query)
-                )
-        
-        return queryset.order_by(
-            Case(
-                When(priority=TaskPriority.URGENT, then=0),
-                When(priority=TaskPriority.HIGH, then=1),
-                When(priority=TaskPriority.MEDIUM, then=2),
-                When(priority=TaskPriority.LOW, then=3),
-                default=4,
-                output_field=IntegerField(),
-            ),
-            'deadline',
-            '-created_at'
-        )
+        return filter_tasks(self.request.user, self.request.GET)
+    
+    def use_keyset_pagination(self):
+        # Search results are ordered by relevance first, which is not a keyset
+        return super().use_keyset_pagination() and not self.request.GET.get('search')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = TaskFilterForm(self.request.GET)
         
-        user = self.request.user
-        today = timezone.now().date()
-        
-        context['my_tasks_count'] = Task.objects.filter(assigned_to=user).count()
-        context['created_tasks_count'] = Task.objects.filter(created_by=user).count()
-        context['due_today_count'] = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user),
-            deadline__date=today,
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).count()
-        context['overdue_count'] = Task.objects.filter(
-            Q(assigned_to=user) | Q(created_by=user),
-            deadline__lt=timezone.now(),
-            status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]
-        ).count()
+        stats = self.get_task_stats(self.request.user.id)
+        context['my_tasks_count'] = stats.assigned
+        context['created_tasks_count'] = stats.created
+        context['due_today_count'] = stats.due_today
+        context['overdue_count'] = stats.overdue
         
         return context
 
@@ -439,6 +370,7 @@ class TaskDetailView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerCont
         return context
 
 
+@sensitive('sensitive_operation')
 class TaskCreateView(LoginRequiredMixin, TaskManagerContextMixin, CreateView):
     model = Task
     form_class = TaskForm
@@ -480,6 +412,7 @@ class TaskUpdateView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerCont
         return reverse_lazy('tasks:task_detail', kwargs={'pk': self.object.pk})
 
 
+@sensitive('sensitive_operation')
 class TaskDeleteView(LoginRequiredMixin, OwnershipRequiredMixin, TaskManagerContextMixin, DeleteView):
     model = Task
     template_name = 'tasks/task/task_confirm_delete.html'
@@ -555,10 +488,7 @@ class TaskAttachmentCreateView(LoginRequiredMixin, FormView):
         task = get_object_or_404(Task, pk=task_id)
         
         user = self.request.user
-        if not (task.project.owner == user or 
-                task.created_by == user or 
-                task.assigned_to == user or
-                task.project.members.filter(id=user.id).exists()):
+        if not check_task_permission(user, task):
             messages.error(self.request, "You do not have permission to add attachments to this task.")
             return redirect('tasks:task_detail', pk=task_id)
         
@@ -576,6 +506,7 @@ class TaskAttachmentCreateView(LoginRequiredMixin, FormView):
         return redirect('tasks:task_detail', pk=task_id)
 
 
+@sensitive('sensitive_operation')
 @method_decorator(csrf_exempt, name='dispatch')
 class TaskStatusUpdateView(LoginRequiredMixin, View):
     
@@ -589,10 +520,7 @@ class TaskStatusUpdateView(LoginRequiredMixin, View):
             return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
         
         user = request.user
-        if not (task.project.owner == user or 
-                task.created_by == user or 
-                task.assigned_to == user or
-                task.project.members.filter(id=user.id).exists()):
+        if not check_task_permission(user, task):
             return JsonResponse({
                 'status': 'error',
                 'message': 'You do not have permission to update this task.'
@@ -605,14 +533,7 @@ class TaskStatusUpdateView(LoginRequiredMixin, View):
             if new_status not in dict(TaskStatus.CHOICES):
                 return JsonResponse({'status': 'error', 'message': 'Invalid status'}, status=400)
             
-            old_status = task.status
-            task.status = new_status
-            
-            if new_status == TaskStatus.COMPLETED and old_status != TaskStatus.COMPLETED:
-                task.completed_at = timezone.now()
-            elif new_status != TaskStatus.COMPLETED and old_status == TaskStatus.COMPLETED:
-                task.completed_at = None
-                
+            task.set_status(new_status)
             task.save()
 
             status_display = dict(TaskStatus.CHOICES)[new_status]
@@ -631,6 +552,31 @@ class TaskStatusUpdateView(LoginRequiredMixin, View):
             return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
 
+@sensitive('sensitive_operation')
+class TaskBulkStatusUpdateView(LoginRequiredMixin, View):
+    """Change the status of many tasks at once; the body is a list of {task_id, status}."""
+    
+    def post(self, request):
+        if not request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
+        
+        try:
+            changes = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+        
+        if not isinstance(changes, list):
+            return JsonResponse({'status': 'error', 'message': 'Expected a list of changes'}, status=400)
+        if len(changes) > MAX_BULK_STATUS_UPDATES:
+            return JsonResponse({
+                'status': 'error',
+                'message': f"At most {MAX_BULK_STATUS_UPDATES} changes per request"
+            }, status=400)
+        
+        results = update_task_statuses(request.user, changes)
+        return JsonResponse({'status': 'success', 'results': results})
+
+
 class CategoryListView(LoginRequiredMixin, TaskManagerContextMixin, ListView):
     model = Category
     template_name = 'tasks/category/category_list.html'
@@ -638,20 +584,10 @@ class CategoryListView(LoginRequiredMixin, TaskManagerContextMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        categories = self.get_queryset()
-        
-        root_categories = categories.filter(parent=None)
-        
-        hierarchy = []
-        for category in root_categories:
-            children = categories.filter(parent=category)
-            hierarchy.append({
-                'category': category,
-                'children': children,
-                'task_count': category.task_count
-            })
+        hierarchy = get_category_hierarchy()
         
         context['category_hierarchy'] = hierarchy
+        context['category_rows'] = [node for root in hierarchy for node in root.walk()]
         return context
 
 
@@ -683,3 +619,17 @@ class CategoryDeleteView(LoginRequiredMixin, TaskManagerContextMixin, DeleteView
     success_url = reverse_lazy('tasks:category_list')
     
     
+
+
+class MetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Prometheus text-format metrics aggregated across all workers (staff only)."""
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get(self, request, *args, **kwargs):
+        registry = get_metrics_registry()
+        return HttpResponse(
+            render_prometheus(registry.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
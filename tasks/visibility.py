@@ -0,0 +1,82 @@
+"""
+Maintenance of the TaskVisibility access index.
+
+The index stores one row per (user, task) pair where the user created the task,
+is assigned to it, or owns or is a member of the task's project. Views resolve
+visibility with ``Task.objects.visible_to(user)`` instead of the four-way
+OR/DISTINCT query, so every change to those relationships must resync the
+affected tasks. The signal handlers in tasks.signals take care of that for
+model saves, deletes and membership changes; code that bypasses signals
+(``QuerySet.update()``, raw SQL) must call ``sync_task_visibility`` itself.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Task, Project, TaskVisibility
+
+
+def _desired_pairs(task_ids):
+    """Compute the (user_id, task_id) pairs that should exist for the given tasks."""
+    rows = list(Task.objects.filter(id__in=task_ids).values_list(
+        'id', 'created_by_id', 'assigned_to_id', 'project_id', 'project__owner_id'
+    ))
+
+    project_ids = {project_id for _, _, _, project_id, _ in rows if project_id}
+    members = defaultdict(set)
+    if project_ids:
+        memberships = Project.members.through.objects.filter(
+            project_id__in=project_ids
+        ).values_list('project_id', 'customuser_id')
+        for project_id, user_id in memberships:
+            members[project_id].add(user_id)
+
+    pairs = set()
+    for task_id, created_by_id, assigned_to_id, project_id, owner_id in rows:
+        user_ids = {created_by_id, assigned_to_id, owner_id} | members[project_id]
+        pairs.update((user_id, task_id) for user_id in user_ids if user_id)
+    return pairs
+
+
+def sync_task_visibility(task_ids):
+    """
+    Bring the visibility rows for the given task IDs in line with the current
+    task, project and membership data. Costs a fixed number of queries
+    regardless of how many tasks are passed in.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+
+    with transaction.atomic():
+        desired = _desired_pairs(task_ids)
+        existing = {
+            (user_id, task_id): pk
+            for pk, user_id, task_id in TaskVisibility.objects.filter(
+                task_id__in=task_ids
+            ).values_list('id', 'user_id', 'task_id')
+        }
+
+        stale_ids = [pk for pair, pk in existing.items() if pair not in desired]
+        if stale_ids:
+            TaskVisibility.objects.filter(id__in=stale_ids).delete()
+
+        missing = [
+            TaskVisibility(user_id=user_id, task_id=task_id)
+            for user_id, task_id in desired if (user_id, task_id) not in existing
+        ]
+        if missing:
+            TaskVisibility.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def sync_project_visibility(project_id):
+    """Resync every task of a project, e.g. after an ownership or membership change."""
+    sync_task_visibility(Task.objects.filter(project_id=project_id).values_list('id', flat=True))
+
+
+def rebuild_task_visibility(batch_size=1000):
+    """Rebuild the whole index in batches. Returns the number of tasks processed."""
+    task_ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(task_ids), batch_size):
+        sync_task_visibility(task_ids[start:start + batch_size])
+    return len(task_ids)
@@ -0,0 +1,269 @@
+"""
+Dashboard widgets: independently computed panels with per-widget timeouts.
+
+Each dashboard panel is a widget declared with ``@dashboard_widget``: a
+function of the view and the user that returns one context entry. Widgets
+run concurrently and each has its own timeout; a widget that times out or
+fails is rendered from its placeholder and listed in ``unavailable_widgets``
+instead of holding up or breaking the page.
+
+run_widgets() serves DashboardView from a bounded thread pool of
+DASHBOARD_WIDGET_WORKERS threads. Pool threads use their own database
+connections, recycled between widgets like request connections
+(CONN_MAX_AGE). arun_widgets() serves AsyncDashboardView: asyncio.gather
+over the same pool, each widget under asyncio.wait_for. With 0 workers (the
+default on SQLite, whose readers don't run in parallel) widgets run one
+after another on the request's own thread and connection.
+
+A thread cannot be interrupted, so a timed-out widget finishes in the
+background and its result is discarded; keep the pool larger than the number
+of widgets expected to be slow at once.
+
+The dashboard page itself is only a shell: each of its DASHBOARD_PANELS is
+fetched separately by main.js from the dashboard_panel endpoint, which
+computes just that panel's widgets and returns an HTML fragment (or JSON for
+the charts) with an ETag, so the shell's time to first byte no longer depends
+on the slowest panel and unchanged panels revalidate with a 304.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import (
+    add_never_cache_headers, get_conditional_response, patch_cache_control, set_response_etag,
+)
+
+from .models import Project, Task
+from .stats import ACTIVE_STATUSES, HIGH_PRIORITIES, UPCOMING_DAYS
+
+performance_logger = logging.getLogger('performance')
+
+
+@dataclass(frozen=True)
+class Widget:
+    """A dashboard panel: compute(view, user) produces context[name]."""
+    name: str
+    compute: Callable
+    # Seconds; None means settings.DASHBOARD_WIDGET_TIMEOUT
+    timeout: Optional[float] = None
+    placeholder: Any = None
+
+
+DASHBOARD_WIDGETS = []
+
+
+def dashboard_widget(name, timeout=None, placeholder=None):
+    """Register a function(view, user) as the dashboard widget producing context[name]."""
+    def decorator(func):
+        DASHBOARD_WIDGETS.append(Widget(name, func, timeout, placeholder))
+        return func
+    return decorator
+
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers):
+    """The shared widget pool, or None to run widgets inline."""
+    global _executor, _executor_workers
+    if not max_workers:
+        return None
+    with _executor_lock:
+        if _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard-widget')
+            _executor_workers = max_workers
+        return _executor
+
+
+def _compute_in_thread(widget, view, user):
+    close_old_connections()
+    try:
+        return widget.compute(view, user)
+    finally:
+        close_old_connections()
+
+
+def _widget_timeout(widget):
+    return widget.timeout if widget.timeout is not None else getattr(settings, 'DASHBOARD_WIDGET_TIMEOUT', 2.0)
+
+
+def _collect(outcomes):
+    """Build the context from (widget, value, error) outcomes, degrading failures."""
+    context = {'unavailable_widgets': []}
+    for widget, value, error in outcomes:
+        if error is None:
+            context[widget.name] = value
+            continue
+        if isinstance(error, (TimeoutError, FutureTimeoutError)):
+            performance_logger.warning(
+                f"Dashboard widget {widget.name} timed out after {_widget_timeout(widget)}s",
+                extra={'widget': widget.name},
+            )
+        else:
+            performance_logger.error(
+                f"Dashboard widget {widget.name} failed: {error}",
+                exc_info=error, extra={'widget': widget.name},
+            )
+        context[widget.name] = widget.placeholder
+        context['unavailable_widgets'].append(widget.name)
+    return context
+
+
+def run_widgets(view, user, widgets=None):
+    """Compute the widgets for a sync view; returns their context entries."""
+    widgets = DASHBOARD_WIDGETS if widgets is None else widgets
+    executor = _get_executor(getattr(settings, 'DASHBOARD_WIDGET_WORKERS', 0))
+    outcomes = []
+
+    if executor is None:
+        for widget in widgets:
+            try:
+                outcomes.append((widget, widget.compute(view, user), None))
+            except Exception as error:
+                outcomes.append((widget, None, error))
+        return _collect(outcomes)
+
+    start_time = time.monotonic()
+    # Each widget gets its own copy of the request context (memo store, query profiler)
+    futures = [
+        (widget, executor.submit(contextvars.copy_context().run, _compute_in_thread, widget, view, user))
+        for widget in widgets
+    ]
+    for widget, future in futures:
+        remaining = max(0, start_time + _widget_timeout(widget) - time.monotonic())
+        try:
+            outcomes.append((widget, future.result(timeout=remaining), None))
+        except Exception as error:
+            future.cancel()
+            outcomes.append((widget, None, error))
+    return _collect(outcomes)
+
+
+async def arun_widgets(view, user, widgets=None):
+    """Compute the widgets for an async view with asyncio.gather."""
+    widgets = DASHBOARD_WIDGETS if widgets is None else widgets
+    executor = _get_executor(getattr(settings, 'DASHBOARD_WIDGET_WORKERS', 0))
+
+    async def run(widget):
+        if executor is None:
+            compute = sync_to_async(widget.compute)(view, user)
+        else:
+            compute = sync_to_async(_compute_in_thread, thread_sensitive=False, executor=executor)(
+                widget, view, user
+            )
+        return await asyncio.wait_for(compute, _widget_timeout(widget))
+
+    results = await asyncio.gather(*(run(widget) for widget in widgets), return_exceptions=True)
+    return _collect([
+        (widget, None, result) if isinstance(result, Exception) else (widget, result, None)
+        for widget, result in zip(widgets, results)
+    ])
+
+
+# Dashboard panels
+
+def _own_tasks(user):
+    return Q(assigned_to=user) | Q(created_by=user)
+
+
+@dashboard_widget('recent_projects', placeholder=[])
+def recent_projects(view, user):
+    return list(Project.objects.filter(
+        Q(owner=user) | Q(members=user)
+    ).order_by('-updated_at')[:5])
+
+
+@dashboard_widget('upcoming_tasks', placeholder=[])
+def upcoming_tasks(view, user):
+    today = timezone.now().date()
+    return list(Task.objects.filter(
+        _own_tasks(user),
+        deadline__date__range=[today, today + timedelta(days=UPCOMING_DAYS)],
+        status__in=ACTIVE_STATUSES
+    ).select_related('project').order_by('deadline')[:10])
+
+
+@dashboard_widget('recent_tasks', placeholder=[])
+def recent_tasks(view, user):
+    return list(Task.objects.visible_to(user).select_related(
+        'assigned_to'
+    ).order_by('-updated_at')[:10])
+
+
+@dashboard_widget('priority_tasks', placeholder=[])
+def priority_tasks(view, user):
+    return list(Task.objects.filter(
+        _own_tasks(user),
+        priority__in=HIGH_PRIORITIES,
+        status__in=ACTIVE_STATUSES
+    ).select_related('project').order_by('priority_rank', 'deadline')[:5])
+
+
+EMPTY_CHART = {'labels': [], 'data': []}
+
+
+@dashboard_widget('status_data', placeholder=EMPTY_CHART)
+def status_data(view, user):
+    return view.get_task_stats(user.id).status_chart
+
+
+@dashboard_widget('priority_data', placeholder=EMPTY_CHART)
+def priority_data(view, user):
+    return view.get_task_stats(user.id).priority_chart
+
+
+# Panel name: (widgets it renders, fragment template, or None for JSON)
+DASHBOARD_PANELS = {
+    'recent_projects': (('recent_projects',), 'tasks/dashboard/recent_projects.html'),
+    'upcoming_tasks': (('upcoming_tasks',), 'tasks/dashboard/upcoming_tasks.html'),
+    'priority_tasks': (('priority_tasks',), 'tasks/dashboard/priority_tasks.html'),
+    'activity': (('recent_tasks',), 'tasks/dashboard/activity.html'),
+    'charts': (('status_data', 'priority_data'), None),
+}
+
+
+def get_panel_widgets(panel):
+    """The widgets making up a dashboard panel; unknown panels are a 404."""
+    try:
+        names = DASHBOARD_PANELS[panel][0]
+    except KeyError:
+        raise Http404(f"No dashboard panel named {panel}")
+    return [widget for widget in DASHBOARD_WIDGETS if widget.name in names]
+
+
+def panel_response(request, panel, context):
+    """
+    Render a computed panel as an HTML fragment or JSON, with an ETag.
+
+    Degraded panels are never cached, so the next load retries them.
+    """
+    names, template_name = DASHBOARD_PANELS[panel]
+    if template_name is None:
+        response = JsonResponse({name: context[name] for name in names})
+    else:
+        response = HttpResponse(render_to_string(template_name, context, request))
+
+    if context['unavailable_widgets']:
+        add_never_cache_headers(response)
+        return response
+    # Per-user data: the browser may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)